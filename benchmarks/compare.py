@@ -0,0 +1,61 @@
+"""Compare two benchmark reports written by ``benchmarks/load.py``.
+
+    uv run python benchmarks/compare.py baseline.json results.json --threshold 10
+
+Prints the change in throughput and p99 latency for every scenario and size
+present in both reports, and exits with status 1 if any of them got worse by
+more than ``--threshold`` percent.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load_results(path: Path) -> dict[tuple[str, int], dict]:
+    report = json.loads(path.read_text(encoding="utf-8"))
+    return {(row["scenario"], row["size"]): row for row in report["results"]}
+
+
+def change(before: float, after: float) -> float:
+    """Return the relative change from ``before`` to ``after`` in percent."""
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def compare(
+    baseline: dict[tuple[str, int], dict],
+    current: dict[tuple[str, int], dict],
+    threshold: float,
+) -> list[str]:
+    """Print a comparison table and return the regressed rows."""
+    regressions = []
+    print(f"{'scenario':<24} {'size':>9} {'rps Δ%':>8} {'p99 Δ%':>8}")
+    for key in sorted(baseline.keys() & current.keys(), key=lambda k: (k[1], k[0])):
+        old, new = baseline[key], current[key]
+        throughput = change(old["throughput_rps"], new["throughput_rps"])
+        p99 = change(old["p99_ms"], new["p99_ms"])
+        regressed = throughput < -threshold or p99 > threshold
+        marker = "  <- regression" if regressed else ""
+        print(f"{key[0]:<24} {key[1]:>9} {throughput:>+8.1f} {p99:>+8.1f}{marker}")
+        if regressed:
+            regressions.append(f"{key[0]} @ {key[1]}")
+    return regressions
+
+
+def cli(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args(argv)
+    regressions = compare(
+        load_results(args.baseline), load_results(args.current), args.threshold
+    )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
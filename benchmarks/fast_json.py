@@ -0,0 +1,49 @@
+"""Measure what the fast JSON path saves on large item responses.
+
+Run with ``uv run python benchmarks/fast_json.py``. Each size fills the list,
+then times ``GET /items`` (both orders, so two arrays of ``n`` names) with
+response_model validation and with ``RANDOMIZER_FAST_JSON``'s direct
+serialization. The last column is the time saved per item in the response.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+import main
+
+SIZES = (1_000, 10_000, 100_000)
+# Total names served per measurement, so small lists get more repeats
+NAMES_PER_RUN = 2_000_000
+
+
+def _time_requests(client: TestClient, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        client.get("/items", headers={"Accept-Encoding": "identity"})
+    return (time.perf_counter() - start) / repeat
+
+
+def main_() -> None:
+    client = TestClient(main.app)
+    print(f"{'n':>8} {'default ms':>11} {'fast ms':>9} {'saved µs/item':>14}")
+    for size in SIZES:
+        main.items_db.clear()
+        main.items_db.extend(f"item-{index}" for index in range(size))
+        results = []
+        for enabled in (False, True):
+            main.FAST_JSON = enabled
+            _time_requests(client, 2)  # warm up
+            results.append(_time_requests(client, max(5, NAMES_PER_RUN // size)))
+        default, fast = results
+        saved = (default - fast) / (2 * size) * 1e6
+        print(f"{size:>8} {default * 1e3:>11.2f} {fast * 1e3:>9.2f} {saved:>14.3f}")
+    main.items_db.clear()
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,248 @@
+"""In-process load driver for the API endpoints.
+
+Requests go straight to the ASGI app through ``httpx.ASGITransport``, so no
+server or network is involved and results only reflect the application.
+Every scenario runs against lists of each requested size and reports
+throughput and latency percentiles as JSON:
+
+    uv run python benchmarks/load.py --output results.json
+    uv run python benchmarks/compare.py baseline.json results.json
+
+Environment variables such as ``RANDOMIZER_STORAGE`` or
+``RANDOMIZER_FAST_JSON`` apply as they do for the server, so one backend or
+mode can be compared against another.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+import main
+
+DEFAULT_SIZES = (10, 10_000, 1_000_000)
+BULK_SIZE = 100
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    # Builds (method, url, json body) for the i-th request of a run
+    request: Callable[[int], tuple[str, str, dict | None]]
+
+
+# Mutating scenarios address their own names, so every request succeeds.
+SCENARIOS = (
+    Scenario("GET /random/{max_value}", lambda i: ("GET", "/random/100", None)),
+    Scenario(
+        "GET /random-between",
+        lambda i: ("GET", "/random-between?min_value=1&max_value=1000", None),
+    ),
+    Scenario("POST /items", lambda i: ("POST", "/items", {"name": f"new-{i}"})),
+    Scenario(
+        "POST /items/bulk",
+        lambda i: (
+            "POST",
+            "/items/bulk",
+            {"names": [f"bulk-{i}-{j}" for j in range(BULK_SIZE)]},
+        ),
+    ),
+    Scenario("GET /items", lambda i: ("GET", "/items", None)),
+    Scenario("GET /items/list", lambda i: ("GET", "/items/list", None)),
+    Scenario(
+        "PUT /items/{item}",
+        lambda i: ("PUT", f"/items/item-{i}", {"name": f"renamed-{i}"}),
+    ),
+    Scenario("DELETE /items/{item}", lambda i: ("DELETE", f"/items/item-{i}", None)),
+)
+
+
+@dataclass
+class Result:
+    scenario: str
+    size: int
+    requests: int
+    errors: int
+    seconds: float
+    throughput_rps: float
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of ``values`` (0 < fraction <= 1)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * fraction))
+    return ordered[rank - 1]
+
+
+def reset_list(size: int) -> None:
+    main.items_db.clear()
+    main.item_weights.clear()
+    main.items_db.extend(f"item-{index}" for index in range(size))
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    size: int,
+    requests: int,
+    concurrency: int,
+    max_seconds: float,
+) -> Result:
+    """Send up to ``requests`` requests from ``concurrency`` workers.
+
+    Stops early once ``max_seconds`` have passed, so slow scenarios on large
+    lists still finish; PUT and DELETE never ask for more items than exist.
+    """
+    if scenario.name.startswith(("PUT", "DELETE")):
+        requests = min(requests, size)
+    counter = itertools.count()
+    latencies: list[float] = []
+    errors = 0
+    start = time.perf_counter()
+    deadline = start + max_seconds
+
+    async def worker() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            index = next(counter)
+            if index >= requests:
+                return
+            method, url, body = scenario.request(index)
+            sent = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - sent)
+            if response.status_code >= 400:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return Result(
+        scenario=scenario.name,
+        size=size,
+        requests=len(latencies),
+        errors=errors,
+        seconds=round(elapsed, 4),
+        throughput_rps=round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        mean_ms=round(sum(latencies) / len(latencies) * 1e3, 4) if latencies else 0.0,
+        p50_ms=round(percentile(latencies, 0.5) * 1e3, 4),
+        p99_ms=round(percentile(latencies, 0.99) * 1e3, 4),
+    )
+
+
+async def run(
+    sizes: tuple[int, ...],
+    scenarios: tuple[Scenario, ...] = SCENARIOS,
+    requests: int = 200,
+    concurrency: int = 8,
+    max_seconds: float = 10.0,
+) -> list[Result]:
+    """Run every scenario against a freshly filled list of each size."""
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with (
+        main.app.router.lifespan_context(main.app),
+        httpx.AsyncClient(transport=transport, base_url="http://bench") as client,
+    ):
+        for size in sizes:
+            for scenario in scenarios:
+                reset_list(size)
+                results.append(
+                    await run_scenario(
+                        client, scenario, size, requests, concurrency, max_seconds
+                    )
+                )
+    main.items_db.clear()
+    return results
+
+
+def environment() -> dict:
+    """Describe the commit and machine the results came from."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "storage": type(main.items_db).__name__,
+        "fast_json": main.FAST_JSON,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        help="Only run scenarios whose name contains this text (repeatable)",
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-seconds", type=float, default=10.0)
+    parser.add_argument("--output", type=Path, help="Write JSON here, not stdout")
+    return parser.parse_args(argv)
+
+
+def cli(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    scenarios = SCENARIOS
+    if args.scenario:
+        scenarios = tuple(
+            scenario
+            for scenario in SCENARIOS
+            if any(text in scenario.name for text in args.scenario)
+        )
+    results = asyncio.run(
+        run(
+            tuple(args.sizes),
+            scenarios,
+            args.requests,
+            args.concurrency,
+            args.max_seconds,
+        )
+    )
+    report = {
+        "environment": environment(),
+        "settings": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "max_seconds": args.max_seconds,
+        },
+        "results": [asdict(result) for result in results],
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,74 @@
+"""Compare the memory held by ``ItemStore`` and ``CompactItemStore``.
+
+Run with ``uv run python benchmarks/memory.py`` (add ``--sizes 10000000`` for
+the 10M-item case, which takes a few minutes). Each store is filled in
+batches, the way ``POST /items/import`` does it, and ``tracemalloc`` reports
+what it still holds afterwards, including the name strings themselves. Fill
+times come from a separate run without tracing, which would skew them.
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compact_store import CompactItemStore
+from store import ItemStore
+
+DEFAULT_SIZES = (100_000, 1_000_000)
+BATCH_SIZE = 10_000
+
+
+def fill(store_class: type, size: int):
+    store = store_class()
+    for batch_start in range(0, size, BATCH_SIZE):
+        batch_end = min(batch_start + BATCH_SIZE, size)
+        store.extend(f"item-{index}" for index in range(batch_start, batch_end))
+    return store
+
+
+def measure(store_class: type, size: int) -> tuple[int, int, float]:
+    """Return (bytes held, peak bytes, fill seconds) for one filled store."""
+    gc.collect()
+    start = time.perf_counter()
+    store = fill(store_class, size)
+    seconds = time.perf_counter() - start
+    del store
+
+    gc.collect()
+    tracemalloc.start()
+    store = fill(store_class, size)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(store) == size
+    return current, peak, seconds
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'n':>10} {'store':>17} {'MiB':>9} {'peak MiB':>9} "
+        f"{'B/item':>7} {'fill s':>7}"
+    )
+    for size in args.sizes:
+        held = {}
+        for store_class in (ItemStore, CompactItemStore):
+            current, peak, seconds = measure(store_class, size)
+            held[store_class] = current
+            print(
+                f"{size:>10} {store_class.__name__:>17} {current / 2**20:>9.1f} "
+                f"{peak / 2**20:>9.1f} {current / size:>7.1f} {seconds:>7.2f}"
+            )
+        ratio = held[CompactItemStore] / held[ItemStore]
+        print(f"{'':>10} {'compact / plain':>17} {ratio:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Compare the stdlib and NumPy shuffle engines.
+
+Run with ``uv run python benchmarks/shuffle.py`` (NumPy comes from
+``uv sync --extra numpy``; without it only the stdlib engine is timed). Each
+row shuffles a tuple of ``n`` names, either in full or only the first
+``limit`` of them, the way ``GET /items?limit=...`` does.
+"""
+
+import sys
+import timeit
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shuffle import SHUFFLE_ENGINES, np
+
+SIZES = (10_000, 1_000_000)
+LIMITS = (None, 100)
+REPEAT = 5
+
+
+def main() -> None:
+    engines = [
+        engine
+        for engine in SHUFFLE_ENGINES.values()
+        if engine.name != "numpy" or np is not None
+    ]
+    print(f"{'n':>10} {'limit':>6} {'engine':>7} {'ms':>10}")
+    for size in SIZES:
+        names = tuple(f"item-{index}" for index in range(size))
+        for limit in LIMITS:
+            for engine in engines:
+                shuffled = partial(engine().shuffled, names, limit)
+                seconds = min(timeit.repeat(shuffled, number=1, repeat=REPEAT))
+                print(
+                    f"{size:>10} {limit or 'all':>6} {engine.name:>7} "
+                    f"{seconds * 1e3:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare alias-table weighted picks with ``random.choices(weights=...)``.
+
+Run with ``uv run python benchmarks/weighted_pick.py``. Each request draws
+``k`` items from a list of ``n`` weighted items; ``random.choices`` has to
+scan the weights on every call, while the alias table is built once and then
+answers each draw in constant time.
+"""
+
+import random
+import sys
+import timeit
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from store import ItemStore
+from weights import ItemWeights
+
+SIZES = (100, 10_000, 100_000)
+DRAWS = (1, 100)
+REPEAT = 200
+
+
+def main() -> None:
+    print(f"{'n':>8} {'k':>5} {'choices µs':>12} {'alias µs':>10} {'speedup':>8}")
+    for size in SIZES:
+        names = [f"item-{index}" for index in range(size)]
+        store = ItemStore(names)
+        item_weights = ItemWeights()
+        for name in names:
+            item_weights.set(name, random.uniform(0.1, 10))
+        weight_list = [item_weights.get(name) for name in names]
+        item_weights.pick(store, 1)  # build the table outside the timing
+
+        for k in DRAWS:
+            choices = timeit.timeit(
+                partial(random.choices, names, weights=weight_list, k=k),
+                number=REPEAT,
+            )
+            alias = timeit.timeit(partial(item_weights.pick, store, k), number=REPEAT)
+            print(
+                f"{size:>8} {k:>5} {choices / REPEAT * 1e6:>12.1f} "
+                f"{alias / REPEAT * 1e6:>10.1f} {choices / alias:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
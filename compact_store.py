@@ -0,0 +1,408 @@
+"""Item storage packed into one UTF-8 buffer for very large lists."""
+
+import random
+import threading
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+
+# Hash table markers; every other entry is a slot number.
+EMPTY = -1
+DELETED = -2
+
+# Names decoded per lock acquisition while iterating
+ITER_CHUNK = 1024
+
+
+class CompactItemStore:
+    """Insertion-ordered set of item names without a Python object per name.
+
+    Names are stored back to back as UTF-8 in a single ``bytearray``; slot
+    ``i`` spans ``starts[i]`` to ``starts[i] + lengths[i]``, and a length of
+    zero marks a deleted slot. An open-addressing hash table of slot numbers
+    (an ``array('i')``) finds names. That is roughly 15 bytes of overhead per
+    name on top of its UTF-8 bytes, against well over 100 for a ``str`` held
+    in a list and a dict.
+
+    Renames write the new name at the end of the buffer and repoint the
+    slot, so positions are kept. Deleted slots and orphaned bytes are
+    compacted away once they make up more than half of the store, which
+    keeps deletes amortized O(1) while preserving insertion order.
+
+    Choices and samples draw slot numbers and decode only the names they
+    return. Iteration decodes names in chunks and reflects changes made
+    while it runs. :meth:`snapshot` builds a new tuple of every name on each
+    call rather than keeping one, so whole-list reads cost O(n) time and
+    transient memory; paging, streaming, and export avoid that.
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._lock = threading.RLock()
+        self._reset()
+        self._version = 0
+        self.extend(names)
+
+    def _reset(self) -> None:
+        # Fresh containers, so iterators still reading the old ones are
+        # unaffected.
+        self._data = bytearray()
+        self._starts = array("I")
+        self._lengths = array("H")
+        self._table = array("i", [EMPTY]) * 8
+        self._count = 0
+        self._filled = 0
+        self._tombstones = 0
+        self._garbage = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate bytes held by the buffer, slot arrays, and hash table."""
+        return (
+            len(self._data)
+            + len(self._starts) * self._starts.itemsize
+            + len(self._lengths) * self._lengths.itemsize
+            + len(self._table) * self._table.itemsize
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        key = name.encode()
+        key_hash = hash(key)
+        with self._lock:
+            return self._find(key, key_hash) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        # Compaction and clear() swap in new containers, so holding on to
+        # these keeps slot numbers stable for the rest of the iteration.
+        with self._lock:
+            data, starts, lengths = self._data, self._starts, self._lengths
+        slot = 0
+        while True:
+            with self._lock:
+                end = min(slot + ITER_CHUNK, len(starts))
+                chunk = [
+                    data[starts[index] : starts[index] + lengths[index]].decode()
+                    for index in range(slot, end)
+                    if lengths[index]
+                ]
+            if not chunk and end <= slot:
+                return
+            yield from chunk
+            slot = end
+
+    def __getitem__(self, position: int) -> str:
+        with self._lock:
+            self._compact()
+            return self._decode(range(len(self._starts))[position])
+
+    def __repr__(self) -> str:
+        return f"CompactItemStore({list(self)!r})"
+
+    def _decode(self, slot: int) -> str:
+        start = self._starts[slot]
+        return self._data[start : start + self._lengths[slot]].decode()
+
+    def _find(self, key: bytes, key_hash: int) -> int:
+        """Return the table position holding ``key``, or -1."""
+        table, data, starts, lengths = (
+            self._table,
+            self._data,
+            self._starts,
+            self._lengths,
+        )
+        size = len(key)
+        mask = len(table) - 1
+        position = key_hash & mask
+        while True:
+            slot = table[position]
+            if slot == EMPTY:
+                return -1
+            if (
+                slot >= 0
+                and lengths[slot] == size
+                and data.startswith(key, starts[slot])
+            ):
+                return position
+            position = (position + 1) & mask
+
+    def _insert(self, key_hash: int, slot: int) -> None:
+        table = self._table
+        mask = len(table) - 1
+        position = key_hash & mask
+        while table[position] >= 0:
+            position = (position + 1) & mask
+        if table[position] == EMPTY:
+            self._filled += 1
+        table[position] = slot
+
+    def _grow(self, extra: int) -> None:
+        # Keep the table at most half full, counting deleted markers, so
+        # linear probing stays short.
+        if (self._filled + extra) * 2 < len(self._table):
+            return
+        self._rebuild_table(self._count + extra)
+
+    def _rebuild_table(self, capacity: int) -> None:
+        size = 8
+        while size < capacity * 2 + 1:
+            size *= 2
+        self._table = array("i", [EMPTY]) * size
+        self._filled = 0
+        with memoryview(self._data) as view:
+            for slot, (start, length) in enumerate(
+                zip(self._starts, self._lengths, strict=True)
+            ):
+                if length:
+                    self._insert(hash(bytes(view[start : start + length])), slot)
+
+    def _append(self, key: bytes, key_hash: int) -> None:
+        if len(key) > 0xFFFF:
+            raise ValueError("Item names are limited to 65535 bytes")
+        if len(self._data) + len(key) > 0xFFFFFFFF:
+            raise MemoryError("Compact store buffer is limited to 4 GiB")
+        slot = len(self._starts)
+        self._starts.append(len(self._data))
+        self._lengths.append(len(key))
+        self._data += key
+        self._insert(key_hash, slot)
+        self._count += 1
+
+    def _delete(self, position: int) -> int:
+        """Drop the name at table ``position``; return its slot."""
+        slot = self._table[position]
+        self._table[position] = DELETED
+        self._count -= 1
+        return slot
+
+    def snapshot(self) -> tuple[str, ...]:
+        """Return the names in insertion order as a new immutable tuple."""
+        with self._lock:
+            data, starts, lengths = self._data, self._starts, self._lengths
+            return tuple(
+                data[start : start + length].decode()
+                for start, length in zip(starts, lengths, strict=True)
+                if length
+            )
+
+    def add(self, name: str) -> None:
+        """Append ``name`` to the end of the list."""
+        key = name.encode()
+        key_hash = hash(key)
+        with self._lock:
+            if self._find(key, key_hash) >= 0:
+                raise KeyError(name)
+            self._grow(1)
+            self._append(key, key_hash)
+            self._version += 1
+
+    def extend(self, names: Iterable[str]) -> None:
+        """Append every name in ``names``, in order.
+
+        Either every name is added or, if any is already present or repeated,
+        none are.
+        """
+        names = list(names)
+        keys = [name.encode() for name in names]
+        with self._lock:
+            seen: set[bytes] = set()
+            for name, key in zip(names, keys, strict=True):
+                if key in seen or self._find(key, hash(key)) >= 0:
+                    raise KeyError(name)
+                if len(key) > 0xFFFF:
+                    raise ValueError("Item names are limited to 65535 bytes")
+                seen.add(key)
+            if not keys:
+                return
+            if len(self._data) + sum(map(len, keys)) > 0xFFFFFFFF:
+                raise MemoryError("Compact store buffer is limited to 4 GiB")
+            self._grow(len(keys))
+            table, starts = self._table, self._starts
+            mask = len(table) - 1
+            slot, offset = len(starts), len(self._data)
+            for key in keys:
+                starts.append(offset)
+                offset += len(key)
+                position = hash(key) & mask
+                # New table entries only fill empty or deleted positions.
+                while table[position] >= 0:
+                    position = (position + 1) & mask
+                if table[position] == EMPTY:
+                    self._filled += 1
+                table[position] = slot
+                slot += 1
+            self._lengths.extend(map(len, keys))
+            self._data += b"".join(keys)
+            self._count += len(keys)
+            self._version += 1
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        """Replace ``old_name`` with ``new_name`` at the same position."""
+        with self._lock:
+            if old_name == new_name:
+                if old_name not in self:
+                    raise KeyError(old_name)
+                return
+            self.rename_many([(old_name, new_name)])
+
+    def rename_many(self, renames: Iterable[tuple[str, str]]) -> None:
+        """Apply every ``(old_name, new_name)`` pair, keeping positions.
+
+        New names are checked against the list as it will be once the whole
+        batch is applied, so swaps and chains are allowed. Either every pair
+        is applied or, if an old name is missing or repeated or a new name
+        would collide, none are.
+        """
+        renames = list(renames)
+        with self._lock:
+            old_keys: set[bytes] = set()
+            positions = []
+            for old_name, _ in renames:
+                key = old_name.encode()
+                position = self._find(key, hash(key))
+                if position < 0 or key in old_keys:
+                    raise KeyError(old_name)
+                old_keys.add(key)
+                positions.append(position)
+            new_keys: dict[bytes, None] = {}
+            for _, new_name in renames:
+                key = new_name.encode()
+                if key in new_keys or (
+                    key not in old_keys and self._find(key, hash(key)) >= 0
+                ):
+                    raise KeyError(new_name)
+                if len(key) > 0xFFFF:
+                    raise ValueError("Item names are limited to 65535 bytes")
+                new_keys[key] = None
+            if not renames:
+                return
+            slots = [self._delete(position) for position in positions]
+            self._grow(len(slots))
+            for slot, key in zip(slots, new_keys, strict=True):
+                self._garbage += self._lengths[slot]
+                self._starts[slot] = len(self._data)
+                self._lengths[slot] = len(key)
+                self._data += key
+                self._insert(hash(key), slot)
+                self._count += 1
+            self._maybe_compact()
+            self._version += 1
+
+    def remove(self, name: str) -> None:
+        """Delete ``name`` from the list."""
+        self.remove_many([name])
+
+    def remove_many(self, names: Iterable[str]) -> None:
+        """Delete every name in ``names`` with at most one compaction.
+
+        Either every name is removed or, if any is missing or repeated, none
+        are.
+        """
+        names = list(names)
+        with self._lock:
+            seen: set[bytes] = set()
+            positions = []
+            for name in names:
+                key = name.encode()
+                position = self._find(key, hash(key))
+                if position < 0 or key in seen:
+                    raise KeyError(name)
+                seen.add(key)
+                positions.append(position)
+            if not names:
+                return
+            for position in positions:
+                slot = self._delete(position)
+                self._garbage += self._lengths[slot]
+                self._lengths[slot] = 0
+                self._tombstones += 1
+            self._maybe_compact()
+            self._version += 1
+
+    def clear(self) -> None:
+        """Remove every item."""
+        with self._lock:
+            self._reset()
+            self._version += 1
+
+    def compact(self) -> None:
+        """Drop deleted slots and orphaned bytes, and rebuild the index."""
+        with self._lock:
+            self._compact()
+
+    def _maybe_compact(self) -> None:
+        if self._tombstones * 2 > len(self._starts) or self._garbage * 2 > len(
+            self._data
+        ):
+            self._compact()
+
+    def _compact(self) -> None:
+        if not self._tombstones and not self._garbage:
+            return
+        data = bytearray()
+        starts = array("I")
+        lengths = array("H")
+        old_data = self._data
+        for start, length in zip(self._starts, self._lengths, strict=True):
+            if length:
+                starts.append(len(data))
+                lengths.append(length)
+                data += old_data[start : start + length]
+        self._data, self._starts, self._lengths = data, starts, lengths
+        self._tombstones = 0
+        self._garbage = 0
+        self._rebuild_table(self._count)
+
+    def choice(self) -> str:
+        """Return one uniformly random name, decoding only that one."""
+        with self._lock:
+            if not self._count:
+                raise IndexError("Cannot choose from an empty store")
+            # Deleted slots never exceed half the slots, so this needs fewer
+            # than two draws on average.
+            while True:
+                slot = random.randrange(len(self._starts))
+                if self._lengths[slot]:
+                    return self._decode(slot)
+
+    def sample(self, k: int) -> list[str]:
+        """Return ``k`` distinct random names, decoding only those."""
+        with self._lock:
+            if not 0 <= k <= self._count:
+                raise ValueError("Sample larger than population or is negative")
+            if self._tombstones and k * 2 > self._count:
+                self._compact()
+            if not self._tombstones:
+                slots = random.sample(range(len(self._starts)), k)
+            else:
+                picked: dict[int, None] = {}
+                while len(picked) < k:
+                    slot = random.randrange(len(self._starts))
+                    if self._lengths[slot]:
+                        picked[slot] = None
+                slots = list(picked)
+            return [self._decode(slot) for slot in slots]
+
+    def page(self, offset: int, limit: int) -> list[str]:
+        """Return up to ``limit`` names starting at position ``offset``."""
+        with self._lock:
+            self._compact()
+            end = min(offset + limit, len(self._starts))
+            return [self._decode(slot) for slot in range(offset, end)]
+
+    def take(self, positions: Sequence[int]) -> list[str]:
+        """Return the names at each of ``positions``, in that order."""
+        with self._lock:
+            self._compact()
+            slots = range(len(self._starts))
+            return [self._decode(slots[position]) for position in positions]
+
+    def to_list(self) -> list[str]:
+        """Return the names in insertion order as a new list."""
+        return list(self.snapshot())
@@ -0,0 +1,165 @@
+"""Change events for the item list: live fan-out and a log for catching up."""
+
+import asyncio
+import json
+from collections import deque
+
+# Journal operations and the change event each one becomes
+EVENT_TYPES = {
+    "add": "added",
+    "rename": "updated",
+    "rename_many": "updated",
+    "remove": "deleted",
+    "clear": "cleared",
+}
+
+
+def change_event(op: str, version: int, **fields) -> dict:
+    """Describe a journaled mutation as a change event.
+
+    ``added`` and ``deleted`` events list ``names``; ``updated`` events list
+    ``renames`` as ``{"old_name", "new_name"}`` objects; ``cleared`` events
+    carry only the version.
+    """
+    event: dict = {"type": EVENT_TYPES[op], "version": version}
+    if op == "rename":
+        event["renames"] = [{"old_name": fields["old"], "new_name": fields["new"]}]
+    elif op == "rename_many":
+        event["renames"] = [
+            {"old_name": old, "new_name": new} for old, new in fields["pairs"]
+        ]
+    elif op != "clear":
+        event["names"] = list(fields["names"])
+    return event
+
+
+def format_sse(event: str, data: dict, event_id: int | None = None) -> str:
+    """Encode one Server-Sent Events message."""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """Pending events for one subscriber, at most ``limit`` of them.
+
+    A subscriber that falls ``limit`` events behind is marked as overflowed
+    and its backlog is dropped; it has to reload the list rather than hold
+    up publishers or grow without bound.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.overflowed = False
+        self.closed = False
+        self._events: deque[dict] = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, event: dict) -> None:
+        if self.overflowed or self.closed:
+            return
+        if len(self._events) >= self.limit:
+            self.overflowed = True
+            self._events.clear()
+        else:
+            self._events.append(event)
+        self._ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+    async def get(self, timeout: float | None = None) -> dict | None:
+        """Return the next event, or ``None`` on timeout, overflow, or close."""
+        if not self._events and not (self.overflowed or self.closed):
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except TimeoutError:
+                return None
+        if self._events:
+            return self._events.popleft()
+        return None
+
+
+class ChangeBroadcaster:
+    """Fans change events out to every open subscription.
+
+    Publishing appends to each subscriber's bounded backlog without
+    awaiting anything, so writers never wait for readers. Everything runs
+    on the event loop thread.
+    """
+
+    def __init__(self, queue_limit: int = 1000) -> None:
+        self.queue_limit = queue_limit
+        self._subscriptions: set[Subscription] = set()
+        self.overflows = 0
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.queue_limit)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event: dict) -> None:
+        for subscription in list(self._subscriptions):
+            subscription.push(event)
+            if subscription.overflowed:
+                self._subscriptions.discard(subscription)
+                self.overflows += 1
+
+    def close(self) -> None:
+        """End every subscription, e.g. on shutdown."""
+        for subscription in self._subscriptions:
+            subscription.close()
+        self._subscriptions.clear()
+
+
+class ChangeLog:
+    """The most recent change events, for clients catching up by version.
+
+    Holds at most ``limit`` events. :meth:`since` can answer for any version
+    from ``base`` (the version just before the oldest event still held) up
+    to ``latest``; older versions have aged out.
+    """
+
+    def __init__(self, limit: int = 10000) -> None:
+        self._events: deque[dict] = deque(maxlen=limit)
+        self.base = 0
+        self.latest = 0
+        # Changes applied to the store but not yet logged
+        self.pending = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def reset(self, version: int) -> None:
+        """Forget every event and start over from ``version``."""
+        self._events.clear()
+        self.base = self.latest = version
+
+    def append(self, event: dict) -> None:
+        if len(self._events) == self._events.maxlen:
+            self.base = self._events[0]["version"]
+        self._events.append(event)
+        self.latest = event["version"]
+
+    def since(self, version: int) -> list[dict] | None:
+        """Return events after ``version``, or ``None`` if they aren't all held."""
+        if not self.base <= version <= self.latest:
+            return None
+        newer = []
+        # Scan from the newest end; callers are usually only a few changes behind.
+        for event in reversed(self._events):
+            if event["version"] <= version:
+                break
+            newer.append(event)
+        newer.reverse()
+        return newer
@@ -0,0 +1,38 @@
+"""JSON responses serialized straight to bytes, skipping model validation."""
+
+import json
+import os
+from typing import Any
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def fast_json_enabled() -> bool:
+    """Return whether ``$RANDOMIZER_FAST_JSON`` turns the fast path on."""
+    return os.environ.get("RANDOMIZER_FAST_JSON", "") not in ("", "0", "false")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize ``content`` to compact UTF-8 JSON, with orjson if installed."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response for data that is already known to match its schema.
+
+    Route handlers that return a :class:`fastapi.Response` skip the
+    ``response_model`` round trip (dump, validate, dump again), while the
+    declared model still documents the response in the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
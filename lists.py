@@ -0,0 +1,112 @@
+"""Registry of named item lists with LRU eviction to disk."""
+
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from store import ItemStore
+
+
+class ListRegistry:
+    """Named :class:`store.ItemStore` instances, at most ``max_resident`` in memory.
+
+    Lists are kept in least-recently-used order. When a new list would push
+    the resident count over the limit, the coldest list is written to
+    ``directory`` as a JSON array and dropped from memory; the next access
+    loads it back. :meth:`flush` writes every resident list, so lists also
+    survive a restart when ``directory`` is persistent.
+    """
+
+    def __init__(self, directory: str | Path, max_resident: int = 1000) -> None:
+        self.directory = Path(directory)
+        self.max_resident = max_resident
+        self._resident: OrderedDict[str, ItemStore] = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.loads = 0
+
+    def _path(self, list_id: str) -> Path:
+        return self.directory / f"{list_id}.json"
+
+    def __contains__(self, list_id: str) -> bool:
+        with self._lock:
+            return list_id in self._resident or self._path(list_id).exists()
+
+    def __len__(self) -> int:
+        with self._lock:
+            on_disk = {path.stem for path in self.directory.glob("*.json")}
+            return len(on_disk | set(self._resident))
+
+    @property
+    def resident_count(self) -> int:
+        return len(self._resident)
+
+    def get(self, list_id: str, create: bool = False) -> ItemStore | None:
+        """Return the list called ``list_id``, loading it from disk if needed.
+
+        Returns ``None`` for unknown lists unless ``create`` is true.
+        """
+        with self._lock:
+            store = self._resident.get(list_id)
+            if store is not None:
+                self._resident.move_to_end(list_id)
+                return store
+            path = self._path(list_id)
+            if path.exists():
+                store = ItemStore(json.loads(path.read_text(encoding="utf-8")))
+                self.loads += 1
+            elif create:
+                store = ItemStore()
+            else:
+                return None
+            self._resident[list_id] = store
+            self._evict()
+            return store
+
+    def add(self, list_id: str, store: ItemStore) -> None:
+        """Keep ``store`` as the list called ``list_id``."""
+        with self._lock:
+            self._resident[list_id] = store
+            self._resident.move_to_end(list_id)
+            self._evict()
+
+    def delete(self, list_id: str) -> bool:
+        """Drop a list from memory and disk; return whether it existed."""
+        with self._lock:
+            existed = self._resident.pop(list_id, None) is not None
+            path = self._path(list_id)
+            if path.exists():
+                path.unlink()
+                existed = True
+            return existed
+
+    def _evict(self) -> None:
+        while len(self._resident) > self.max_resident:
+            list_id, store = self._resident.popitem(last=False)
+            self._write(list_id, store)
+            self.evictions += 1
+
+    def _write(self, list_id: str, store: ItemStore) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(list_id)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(store.to_list()), encoding="utf-8")
+        os.replace(temporary, path)
+
+    def flush(self) -> None:
+        """Write every resident list to disk."""
+        with self._lock:
+            for list_id, store in self._resident.items():
+                self._write(list_id, store)
+
+
+def create_registry() -> ListRegistry:
+    """Build a registry in ``$RANDOMIZER_LISTS_DIR`` (a temp dir by default)."""
+    directory = os.environ.get("RANDOMIZER_LISTS_DIR") or Path(
+        tempfile.gettempdir(), "randomizer-lists"
+    )
+    max_resident = int(os.environ.get("RANDOMIZER_MAX_RESIDENT_LISTS", "1000"))
+    return ListRegistry(directory, max_resident)
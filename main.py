@@ -1,12 +1,51 @@
-import random
-from typing import Annotated
+import asyncio
+import contextvars
+import hashlib
+import json
+import os
+import secrets
+import signal
+import threading
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Annotated, Any, Literal
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Path, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
+from compact_store import CompactItemStore
+from events import ChangeBroadcaster, ChangeLog, change_event, format_sse
+from fast_json import FastJSONResponse, dumps, fast_json_enabled
+from lists import ListRegistry, create_registry
+from metrics import Metrics, MetricsMiddleware, create_sampler
+from permutation import FeistelPermutation
+from persistence import create_journal
+from ratelimit import RateLimitMiddleware, create_rate_limits
+from rng import create_pool, create_rng
+from shuffle import create_shuffler
+from sqlite_store import SQLiteItemStore
+from store import ItemStorage, ItemStore, create_store
+from timing import (
+    ServerTimingMiddleware,
+    TimedRoute,
+    phase,
+    profile_rate,
+    timing_mode,
+)
+from transfer import (
+    EXPORT_MEDIA_TYPES,
+    choose_encoding,
+    compress_chunks,
+    encode_names,
+    iter_name_batches,
+)
+from weights import ItemWeights
+
 # Tags metadata for API documentation
 tags_metadata = [
     {
@@ -17,14 +56,130 @@ tags_metadata = [
         "name": "Random Items Management",
         "description": "Create, shuffle, read, update and delete items",
     },
+    {
+        "name": "Named Lists",
+        "description": "Keep separate item lists, each under its own id",
+    },
 ]
 
+# Random number generator backend, selected with $RANDOMIZER_RNG
+rng = create_rng()
+
+# Optional pool of pre-drawn numbers, sized with $RANDOMIZER_RNG_POOL
+rng_pool = create_pool(rng)
+
+# Shuffle engine for GET /items, selected with $RANDOMIZER_SHUFFLE; NumPy
+# when it is installed
+shuffler = create_shuffler()
+
+# Item storage, in memory unless $RANDOMIZER_STORAGE selects SQLite
+items_db = create_store()
+
+# Optional write-ahead log for the in-memory stores, kept in $RANDOMIZER_DATA_DIR
+journal = (
+    create_journal(items_db)
+    if isinstance(items_db, ItemStore | CompactItemStore)
+    else None
+)
+
+# SQLite writes from this worker run one at a time on this thread, so they
+# come back to the event loop, and are logged, in the order they committed
+sqlite_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+
+# Per-item weights for /items/weighted-pick, kept in memory
+item_weights = ItemWeights()
+
+# Serve item reads straight from store data with $RANDOMIZER_FAST_JSON
+FAST_JSON = fast_json_enabled()
+
+# Live change feed for /items/events; a subscriber that falls this many
+# events behind is told to resync instead of holding up writers
+EVENT_QUEUE_LIMIT = 1000
+EVENT_KEEPALIVE_SECONDS = 15.0
+item_events = ChangeBroadcaster(EVENT_QUEUE_LIMIT)
+
+# Recent changes for /items/changes; clients further behind must resync
+CHANGE_LOG_LIMIT = 10000
+change_log = ChangeLog(CHANGE_LOG_LIMIT)
+
+# Request, shuffle, and RNG metrics served at /metrics
+metrics = Metrics()
+metrics.gauge("randomizer_items", "Items in the main list.", lambda: len(items_db))
+
+# Named lists; cold ones are written to $RANDOMIZER_LISTS_DIR and unloaded
+list_registry = create_registry()
+MAX_LIST_ITEMS = 10000
+
+
+def _end_streams_on_exit() -> None:
+    # Uvicorn runs lifespan shutdown only once open connections finish,
+    # which event streams never do. Chain onto its signal handlers so the
+    # streams end as soon as a graceful stop begins.
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(signum)
+        if not callable(previous):
+            continue
+
+        def handle_exit(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(item_events.close)
+            previous(signum, frame)
+
+        signal.signal(signum, handle_exit)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _end_streams_on_exit()
+    if journal is not None:
+        journal.load()
+        journal.start()
+    change_log.reset(items_db.version)
+    if rng_pool is not None:
+        rng_pool.start()
+    yield
+    item_events.close()
+    if rng_pool is not None:
+        await rng_pool.stop()
+    if journal is not None:
+        await journal.stop()
+    list_registry.flush()
+
+
 app = FastAPI(
     title="Randomizer API",
     description="Shuffle lists, pick random items, and generate random numbers.",
     version="1.0.0",
     openapi_tags=tags_metadata,
+    lifespan=lifespan,
 )
+# Marks handler start and end so Server-Timing can split out validation
+app.router.route_class = TimedRoute
+
+# Write throttling per client and route with $RANDOMIZER_RATE_LIMIT, and load
+# shedding with $RANDOMIZER_MAX_CONCURRENT_WRITES; added before CORS so
+# rejections still carry CORS headers
+rate_buckets, write_admission = create_rate_limits()
+app.add_middleware(
+    RateLimitMiddleware,
+    router=app.router,
+    buckets=rate_buckets,
+    admission=write_admission,
+)
+if rate_buckets is not None:
+    metrics.gauge(
+        "randomizer_rate_limit_buckets",
+        "Client rate limit buckets being tracked.",
+        lambda: len(rate_buckets),
+    )
+if write_admission is not None:
+    metrics.gauge(
+        "randomizer_writes_in_flight",
+        "Write requests being handled.",
+        lambda: write_admission.in_flight,
+    )
 
 # CORS configuration
 app.add_middleware(
@@ -40,17 +195,56 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics; $RANDOMIZER_SLOW_REQUEST_MS also profiles slow requests
+app.add_middleware(MetricsMiddleware, metrics=metrics, sampler=create_sampler())
+
+# Server-Timing with $RANDOMIZER_SERVER_TIMING; cProfile dumps of a sampled
+# fraction of requests with $RANDOMIZER_PROFILE_SAMPLE_RATE
+app.add_middleware(
+    ServerTimingMiddleware,
+    mode=timing_mode(),
+    profile_rate=profile_rate(),
+    profile_dir=os.environ.get("RANDOMIZER_PROFILE_DIR", "profiles"),
+)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# In-memory database
-items_db = []
-items_db_set = set()
+# Number of NDJSON lines sent per chunk when streaming items
+STREAM_CHUNK_SIZE = 1000
+
+# Number of parsed names checked and added together during an import
+IMPORT_BATCH_SIZE = 10000
+
+
+@dataclass(frozen=True)
+class CachedItems:
+    store: ItemStorage
+    # None if writes kept landing while the body was built, so no version
+    # is known to match it
+    version: int | None
+    # None for the compact store, which would otherwise keep a str per name
+    # alive and lose the memory it exists to save
+    names: tuple[str, ...] | None
+    body: bytes
+    etag: str
+
+
+# Serialized GET /items/list body for the store version it was built from
+items_cache: CachedItems | None = None
+# Tries at reading the names without a write landing in between
+SNAPSHOT_ATTEMPTS = 3
 
 
 # Pydantic models
 class Item(BaseModel):
     name: str = Field(min_length=1, max_length=100, description="The item name")
+    weight: float | None = Field(
+        default=None,
+        gt=0,
+        le=1_000_000,
+        description="Relative weight for weighted picks; 1 if omitted",
+    )
 
 
 class BulkItemsRequest(BaseModel):
@@ -70,6 +264,55 @@ class ItemListResponse(BaseModel):
     count: int
 
 
+class ItemNamesResponse(BaseModel):
+    items: list[str]
+    count: int
+
+
+class ItemPageResponse(BaseModel):
+    items: list[str]
+    count: int
+    next_cursor: int | None
+
+
+class ShuffleSessionRequest(BaseModel):
+    seed: int | None = Field(
+        default=None,
+        ge=0,
+        lt=2**63,
+        description="Seed to replay a previous shuffle; random if omitted",
+    )
+
+
+class ShuffleSessionResponse(BaseModel):
+    session_id: str
+    seed: int
+    count: int
+
+
+class ShufflePageResponse(BaseModel):
+    session_id: str
+    items: list[str]
+    offset: int
+    count: int
+    next_offset: int | None
+
+
+class RandomItemResponse(BaseModel):
+    item: str
+    count: int
+
+
+class SampleItemsResponse(BaseModel):
+    items: list[str]
+    count: int
+
+
+class WeightedPickResponse(BaseModel):
+    items: list[str]
+    count: int
+
+
 class ItemUpdateResponse(BaseModel):
     message: str
     old_item: str
@@ -90,21 +333,198 @@ class BulkItemsAddResponse(BaseModel):
     count_skipped: int
 
 
+class ImportChunkResponse(BaseModel):
+    chunk: int
+    lines: int
+    added: int
+    skipped_duplicates: int
+    skipped_invalid: int
+
+
+class ImportResponse(BaseModel):
+    message: str
+    count_added: int
+    count_skipped_duplicates: int
+    count_skipped_invalid: int
+    count: int
+    chunks: list[ImportChunkResponse]
+
+
 class BulkItemsDeleteResponse(BaseModel):
     message: str
     deleted_count: int
     remaining_items_count: int
 
 
+class BulkDeleteRequest(BaseModel):
+    names: list[str] = Field(
+        min_length=1, max_length=5000, description="Names of the items to delete"
+    )
+
+
+class BulkDeleteResult(BaseModel):
+    item: str
+    status: Literal["deleted", "not_found", "duplicate"]
+
+
+class BulkDeleteResponse(BaseModel):
+    message: str
+    deleted_count: int
+    skipped_count: int
+    remaining_items_count: int
+    results: list[BulkDeleteResult]
+
+
+class RenamePair(BaseModel):
+    old_name: str = Field(description="The current item name")
+    new_name: str = Field(min_length=1, max_length=100, description="The new name")
+
+
+class ItemChange(BaseModel):
+    type: Literal["added", "updated", "deleted", "cleared"]
+    version: int
+    names: list[str] | None = None
+    renames: list[RenamePair] | None = None
+
+
+class ItemChangesResponse(BaseModel):
+    since: int
+    version: int
+    resync: bool
+    changes: list[ItemChange]
+
+
+class BulkRenameRequest(BaseModel):
+    renames: list[RenamePair] = Field(
+        min_length=1, max_length=5000, description="Renames to apply together"
+    )
+
+
+class BulkRenameResult(BaseModel):
+    old_name: str
+    new_name: str
+    status: Literal["renamed", "unchanged", "not_found", "duplicate", "conflict"]
+
+
+class BulkRenameResponse(BaseModel):
+    message: str
+    renamed_count: int
+    results: list[BulkRenameResult]
+
+
 # Endpoints
 @app.get("/", tags=["Random Playground"])
 async def home():
     return FileResponse("static/index.html")
 
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def _respond(model: type[BaseModel], **fields):
+    # Store names were validated on the way in, so the fast path serializes
+    # them as they are; the route's response_model still documents them.
+    with phase("serialization"):
+        if FAST_JSON:
+            return FastJSONResponse(fields)
+        return model(**fields)
+
+
+async def _call_store(func: Callable[..., Any], /, *args: Any) -> Any:
+    # SQLite reads go to disk, so they run in a thread instead of stalling
+    # the loop; writes go through _write_store.
+    if isinstance(items_db, SQLiteItemStore):
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+async def _write_store(func: Callable[..., Any], /, *args: Any) -> tuple[Any, int]:
+    """Run a store write; return its result and the version it produced.
+
+    The version is only meaningful if ``func`` changed the list.
+    """
+    store = items_db
+    if not isinstance(store, SQLiteItemStore):
+        return func(*args), store.version
+
+    # The version is read in the writer thread, from the write's own
+    # transaction; by the time the loop resumes another worker may have
+    # moved the shared one on.
+    def write() -> tuple[Any, int]:
+        return func(*args), store.written_version
+
+    change_log.pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            sqlite_writer, contextvars.copy_context().run, write
+        )
+    finally:
+        change_log.pending -= 1
+
+
+async def _record_change(op: str, version: int, **fields) -> None:
+    # Subscribers hear about the change only once it is durable.
+    change_log.pending += 1
+    try:
+        if journal is not None:
+            with phase("store"):
+                journal.record(op, **fields)
+                await journal.sync()
+    finally:
+        change_log.pending -= 1
+    event = change_event(op, version, **fields)
+    change_log.append(event)
+    item_events.publish(event)
+
+
+def _draw_randint(low: int, high: int) -> int:
+    with phase("rng"):
+        if rng_pool is not None:
+            metrics.count_draws("pool")
+            return rng_pool.randint(low, high)
+        metrics.count_draws("rng")
+        return rng.randint(low, high)
+
+
+def _draw_randints(low: int, high: int, count: int) -> list[int]:
+    metrics.count_draws("rng", count)
+    with phase("rng"):
+        return rng.randints(low, high, count)
+
+
+CountQuery = Annotated[
+    int | None,
+    Query(
+        title="Count",
+        description="Return this many random numbers from one batched draw",
+        ge=1,
+        le=10000,
+    ),
+]
+
+
+@app.get("/random-pool/stats", tags=["Random Playground"])
+async def get_random_pool_stats():
+    if rng_pool is None:
+        return {"enabled": False}
+
+    return {"enabled": True, **rng_pool.stats()}
+
+
 @app.get("/random/{max_value}", tags=["Random Playground"])
-async def get_random_number(max_value: int):
-    return {"max": max_value, "random_number": random.randint(1, max_value)}
+async def get_random_number(max_value: int, count: CountQuery = None):
+    if count is not None:
+        return {
+            "max": max_value,
+            "count": count,
+            "random_numbers": _draw_randints(1, max_value, count),
+        }
+
+    return {"max": max_value, "random_number": _draw_randint(1, max_value)}
 
 
 @app.get("/random-between", tags=["Random Playground"])
@@ -127,38 +547,63 @@ async def get_random_number_between(
             le=1000000,
         ),
     ] = 99,
+    count: CountQuery = None,
 ):
     if min_value > max_value:
         raise HTTPException(
             status_code=400, detail="min_value can't be greater than max_value"
         )
 
+    if count is not None:
+        return {
+            "min": min_value,
+            "max": max_value,
+            "count": count,
+            "random_numbers": _draw_randints(min_value, max_value, count),
+        }
+
     return {
         "min": min_value,
         "max": max_value,
-        "random_number": random.randint(min_value, max_value),
+        "random_number": _draw_randint(min_value, max_value),
     }
 
 
-@app.post("/items", response_model=ItemResponse, tags=["Random Items Management"])
-async def add_item(item: Item):
+def _check_capacity(store: ItemStorage, adding: int, max_items: int | None) -> None:
+    if max_items is not None and len(store) + adding > max_items:
+        raise HTTPException(
+            status_code=400, detail=f"List can't hold more than {max_items} items"
+        )
+
+
+def _add_item_to(store: ItemStorage, item: Item, max_items: int | None = None) -> str:
     name = item.name.strip()
     if not name:
         raise HTTPException(
             status_code=422, detail="Item name cannot be empty or whitespace"
         )
-    if name in items_db_set:
+    if name in store:
         raise HTTPException(status_code=400, detail="Item already exists")
+    _check_capacity(store, 1, max_items)
+    try:
+        store.add(name)
+    except KeyError:
+        raise HTTPException(status_code=400, detail="Item already exists") from None
+    return name
 
-    items_db.append(name)
-    items_db_set.add(name)
+
+@app.post("/items", response_model=ItemResponse, tags=["Random Items Management"])
+async def add_item(item: Item):
+    name, version = await _write_store(_add_item_to, items_db, item)
+    if item.weight is not None:
+        item_weights.set(name, item.weight)
+    await _record_change("add", version, names=[name])
     return ItemResponse(message="Item added successfully", item=name)
 
 
-@app.post(
-    "/items/bulk", response_model=BulkItemsAddResponse, tags=["Random Items Management"]
-)
-async def add_items_bulk(payload: BulkItemsRequest):
+def _add_items_bulk_to(
+    store: ItemStorage, payload: BulkItemsRequest, max_items: int | None = None
+) -> BulkItemsAddResponse:
     # First pass: validate and determine which items will be added,
     # without mutating the underlying storage. This avoids partially
     # applied bulk operations if a later element is invalid.
@@ -169,7 +614,7 @@ async def add_items_bulk(payload: BulkItemsRequest):
     # Track names that will be newly added in this request so we
     # correctly treat duplicates within the same payload as duplicates,
     # matching the behavior of the previous implementation which updated
-    # items_db_set incrementally.
+    # the store incrementally.
     pending_additions: list[str] = []
     pending_additions_set: set[str] = set()
 
@@ -185,20 +630,28 @@ async def add_items_bulk(payload: BulkItemsRequest):
                 detail=f"Item '{name[:20]}...' exceeds max length of 100",
             )
 
-        # Treat as duplicate if it already exists in the global set or
+        # Treat as duplicate if it already exists in the store or
         # has been scheduled for addition earlier in this payload.
-        if name in items_db_set or name in pending_additions_set:
+        if name in store or name in pending_additions_set:
             skipped_duplicates.append(name)
             continue
 
         pending_additions.append(name)
         pending_additions_set.add(name)
 
+    _check_capacity(store, len(pending_additions), max_items)
+
     # Second pass: apply the validated additions.
-    for name in pending_additions:
-        items_db.append(name)
-        items_db_set.add(name)
-        added_items.append(name)
+    # The store applies the whole batch or nothing, so a concurrent writer
+    # adding one of these names can't leave a partial bulk add behind.
+    try:
+        with phase("store"):
+            store.extend(pending_additions)
+    except KeyError:
+        raise HTTPException(
+            status_code=409, detail="Items changed during bulk add, please retry"
+        ) from None
+    added_items.extend(pending_additions)
 
     return BulkItemsAddResponse(
         message="Bulk add completed",
@@ -209,69 +662,912 @@ async def add_items_bulk(payload: BulkItemsRequest):
     )
 
 
+@app.post(
+    "/items/bulk", response_model=BulkItemsAddResponse, tags=["Random Items Management"]
+)
+async def add_items_bulk(payload: BulkItemsRequest):
+    response, version = await _write_store(_add_items_bulk_to, items_db, payload)
+    if response.added_items:
+        await _record_change("add", version, names=response.added_items)
+    return response
+
+
+def _import_batch(store: ItemStorage, names: list[str]) -> list[str]:
+    # dict.fromkeys drops repeats within the batch and keeps their order.
+    fresh = list(dict.fromkeys(name for name in names if name not in store))
+    try:
+        store.extend(fresh)
+    except KeyError:
+        # Another writer added one of these names since the check; fall back
+        # to adding them one at a time.
+        added = []
+        for name in fresh:
+            try:
+                store.add(name)
+            except KeyError:
+                continue
+            added.append(name)
+        return added
+    return fresh
+
+
+@app.post(
+    "/items/import",
+    response_model=ImportResponse,
+    tags=["Random Items Management"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                media_type: {"schema": {"type": "string"}}
+                for media_type in ("text/plain", "application/x-ndjson", "text/csv")
+            },
+        }
+    },
+)
+async def import_items(
+    request: Request,
+    format: Annotated[
+        Literal["lines", "ndjson", "csv"],
+        Query(
+            title="Format",
+            description='One name per line, NDJSON strings or {"name"} objects, '
+            "or CSV with the name in the first column",
+        ),
+    ] = "lines",
+    header: Annotated[
+        bool,
+        Query(title="Header", description="Skip the first line of a CSV upload"),
+    ] = False,
+):
+    chunks: list[ImportChunkResponse] = []
+    batches = iter_name_batches(
+        request.stream(), format, IMPORT_BATCH_SIZE, header=header and format == "csv"
+    )
+    try:
+        async for batch in batches:
+            added, version = await _write_store(_import_batch, items_db, batch.names)
+            if added:
+                await _record_change("add", version, names=added)
+            chunks.append(
+                ImportChunkResponse(
+                    chunk=len(chunks),
+                    lines=batch.lines,
+                    added=len(added),
+                    skipped_duplicates=len(batch.names) - len(added),
+                    skipped_invalid=batch.invalid,
+                )
+            )
+    except ValueError as exc:
+        # Earlier chunks are already committed; say how far the import got.
+        raise HTTPException(
+            status_code=413,
+            detail=f"{exc}; {sum(chunk.added for chunk in chunks)} items were "
+            "imported before it",
+        ) from None
+
+    return ImportResponse(
+        message="Import completed",
+        count_added=sum(chunk.added for chunk in chunks),
+        count_skipped_duplicates=sum(chunk.skipped_duplicates for chunk in chunks),
+        count_skipped_invalid=sum(chunk.skipped_invalid for chunk in chunks),
+        count=await _call_store(len, items_db),
+        chunks=chunks,
+    )
+
+
+ShuffleLimitQuery = Annotated[
+    int | None,
+    Query(
+        title="Limit",
+        description="Return only this many shuffled items; all of them if omitted",
+        ge=1,
+    ),
+]
+
+
+def _shuffle_items(
+    store: ItemStorage, limit: int | None = None
+) -> ItemListResponse | Response:
+    # One immutable snapshot keeps both orders consistent with each other
+    # even if a writer runs while the response is being built.
+    with phase("store"):
+        snapshot = store.snapshot()
+    with metrics.time_shuffle(), phase("shuffle"):
+        randomized = shuffler.shuffled(snapshot, limit)
+
+    return _respond(
+        ItemListResponse,
+        original_order=snapshot,
+        randomized_order=randomized,
+        count=len(snapshot),
+    )
+
+
+def _versioned_snapshot(
+    store: ItemStorage, version: int
+) -> tuple[tuple[str, ...], int | None]:
+    # Another worker can write between reading the version and the names.
+    # Labelling them with the older version would replay that write to the
+    # client, so retry until both agree, and give up with None.
+    for _ in range(SNAPSHOT_ATTEMPTS):
+        names = store.snapshot()
+        latest = store.version
+        if latest == version:
+            return names, version
+        version = latest
+    return names, None
+
+
+def _cached_items() -> CachedItems:
+    global items_cache
+    version = items_db.version
+    cached = items_cache
+    if cached is None or cached.store is not items_db or cached.version != version:
+        names, version = _versioned_snapshot(items_db, version)
+        if FAST_JSON:
+            body = dumps({"items": names, "count": len(names)})
+        else:
+            response = ItemNamesResponse(items=names, count=len(names))
+            body = response.model_dump_json().encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        if isinstance(items_db, CompactItemStore):
+            names = None
+        cached = CachedItems(items_db, version, names, body, etag)
+        if version is not None:
+            items_cache = cached
+    return cached
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored.
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"}
+    )
+
+
 @app.get("/items", response_model=ItemListResponse, tags=["Random Items Management"])
-async def get_randomized_items():
-    randomized = items_db.copy()
-    random.shuffle(randomized)
+async def get_randomized_items(
+    request: Request, response: Response, limit: ShuffleLimitQuery = None
+):
+    with phase("store"):
+        cached = await _call_store(_cached_items)
+    # The shuffle differs on every call, so the tag is weak: a match means
+    # the list itself hasn't changed since the client's copy.
+    etag = f"W/{cached.etag}"
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return _not_modified(etag)
 
-    return ItemListResponse(
-        original_order=items_db, randomized_order=randomized, count=len(items_db)
+    names = cached.names
+    if names is None:
+        # Decoded for this response only and dropped once it is sent
+        with phase("store"):
+            names = cached.store.snapshot()
+    with metrics.time_shuffle(), phase("shuffle"):
+        randomized = shuffler.shuffled(names, limit)
+    result = _respond(
+        ItemListResponse,
+        original_order=names,
+        randomized_order=randomized,
+        count=len(names),
     )
+    headers = result.headers if isinstance(result, Response) else response.headers
+    headers["ETag"] = etag
+    headers["Cache-Control"] = "no-cache"
+    return result
 
 
-@app.put(
-    "/items/{update_item_name}",
-    response_model=ItemUpdateResponse,
+@app.get(
+    "/items/list", response_model=ItemNamesResponse, tags=["Random Items Management"]
+)
+async def get_items_list(request: Request):
+    with phase("store"):
+        cached = await _call_store(_cached_items)
+    if _etag_matches(request.headers.get("if-none-match"), cached.etag):
+        response = _not_modified(cached.etag)
+    else:
+        response = Response(
+            content=cached.body,
+            media_type="application/json",
+            headers={"ETag": cached.etag, "Cache-Control": "no-cache"},
+        )
+    # The version lets clients follow up with /items/changes?since=...
+    if cached.version is not None:
+        response.headers["X-Items-Version"] = str(cached.version)
+    return response
+
+
+def _page_items(
+    store: ItemStorage, cursor: int, limit: int
+) -> ItemPageResponse | Response:
+    items = store.page(cursor, limit)
+    count = len(store)
+    next_cursor = cursor + len(items)
+
+    return _respond(
+        ItemPageResponse,
+        items=items,
+        count=count,
+        next_cursor=next_cursor if next_cursor < count else None,
+    )
+
+
+@app.get(
+    "/items/page", response_model=ItemPageResponse, tags=["Random Items Management"]
+)
+async def get_items_page(
+    limit: Annotated[
+        int,
+        Query(
+            title="Page Size",
+            description="The maximum number of items to return",
+            ge=1,
+            le=1000,
+        ),
+    ] = 100,
+    cursor: Annotated[
+        int,
+        Query(
+            title="Cursor",
+            description="The position to start from, as returned in next_cursor",
+            ge=0,
+        ),
+    ] = 0,
+):
+    return await _call_store(_page_items, items_db, cursor, limit)
+
+
+def _stream_items() -> Iterator[str]:
+    # A plain generator, so StreamingResponse reads the store in a thread
+    chunk: list[str] = []
+    for name in items_db:
+        chunk.append(json.dumps({"item": name}) + "\n")
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk.clear()
+    if chunk:
+        yield "".join(chunk)
+
+
+@app.get(
+    "/items/stream",
+    response_class=StreamingResponse,
     tags=["Random Items Management"],
 )
-async def update_item(update_item_name: str, item: Item):
-    if update_item_name not in items_db_set:
-        raise HTTPException(status_code=404, detail="Item not found")
+async def stream_items():
+    return StreamingResponse(_stream_items(), media_type="application/x-ndjson")
 
-    if item.name in items_db_set and item.name != update_item_name:
-        raise HTTPException(
-            status_code=409, detail="An item with that name already exists"
+
+@app.get(
+    "/items/export",
+    response_class=StreamingResponse,
+    tags=["Random Items Management"],
+)
+async def export_items(
+    request: Request,
+    format: Annotated[
+        Literal["ndjson", "csv", "json"],
+        Query(title="Format", description="The file format to download"),
+    ] = "ndjson",
+    order: Annotated[
+        Literal["original", "shuffled"],
+        Query(title="Order", description="Export in original or shuffled order"),
+    ] = "original",
+    seed: Annotated[
+        int | None,
+        Query(
+            title="Seed",
+            description="Seed to replay a previous shuffled export; random if omitted",
+            ge=0,
+            lt=2**63,
+        ),
+    ] = None,
+):
+    headers = {
+        "Content-Disposition": f'attachment; filename="items.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if order == "shuffled":
+        if seed is None:
+            seed = secrets.randbelow(2**63)
+        snapshot = await _call_store(items_db.snapshot)
+        permutation = FeistelPermutation(len(snapshot), seed)
+        names = (snapshot[permutation[index]] for index in range(len(snapshot)))
+        headers["X-Shuffle-Seed"] = str(seed)
+    else:
+        names = iter(items_db)
+
+    body = (chunk.encode() for chunk in encode_names(names, format, STREAM_CHUNK_SIZE))
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is not None:
+        body = compress_chunks(body, encoding)
+        headers["Content-Encoding"] = encoding
+
+    return StreamingResponse(
+        body, media_type=EXPORT_MEDIA_TYPES[format], headers=headers
+    )
+
+
+async def _item_events() -> AsyncIterator[str]:
+    # Subscribe before taking the snapshot so no change falls in between;
+    # clients skip events whose version the snapshot already includes.
+    subscription = item_events.subscribe()
+    try:
+        names, version = await _call_store(
+            _versioned_snapshot, items_db, items_db.version
+        )
+        if version is None:
+            # Writes kept landing; the client reconnects for a fresh snapshot
+            yield format_sse("resync", {"version": items_db.version})
+            return
+        yield format_sse(
+            "snapshot",
+            {"version": version, "items": list(names), "count": len(names)},
+            version,
+        )
+        while True:
+            event = await subscription.get(EVENT_KEEPALIVE_SECONDS)
+            if event is not None:
+                yield format_sse(event["type"], event, event["version"])
+            elif subscription.overflowed:
+                yield format_sse("resync", {"version": items_db.version})
+                return
+            elif subscription.closed:
+                return
+            else:
+                # Comment line that keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+    finally:
+        item_events.unsubscribe(subscription)
+
+
+@app.get(
+    "/items/events",
+    response_class=StreamingResponse,
+    tags=["Random Items Management"],
+)
+async def stream_item_events():
+    return StreamingResponse(
+        _item_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get(
+    "/items/changes",
+    response_model=ItemChangesResponse,
+    response_model_exclude_none=True,
+    tags=["Random Items Management"],
+)
+async def get_item_changes(
+    since: Annotated[
+        int,
+        Query(
+            title="Since",
+            description="The store version the client already has",
+            ge=0,
+        ),
+    ],
+):
+    changes = change_log.since(since)
+    # A store version the log hasn't caught up with means changes it never
+    # saw, e.g. from another worker, unless one of ours is still being logged.
+    missed = items_db.version != change_log.latest and not change_log.pending
+    if changes is None or missed:
+        return ItemChangesResponse(
+            since=since, version=items_db.version, resync=True, changes=[]
         )
 
-    index = items_db.index(update_item_name)
-    items_db[index] = item.name
-    items_db_set.discard(update_item_name)
-    items_db_set.add(item.name)
+    return ItemChangesResponse(
+        since=since,
+        version=change_log.latest,
+        resync=False,
+        changes=[ItemChange(**change) for change in changes],
+    )
+
+
+def _shuffle_session_id(seed: int, version: int) -> str:
+    # The id carries everything a page needs, so any worker can serve it
+    # without keeping sessions around.
+    return f"{seed:x}-{version:x}"
+
+
+def _parse_shuffle_session_id(session_id: str) -> tuple[int, int] | None:
+    try:
+        seed, version = (int(part, 16) for part in session_id.split("-"))
+    except ValueError:
+        return None
+    if not (0 <= seed < 2**63 and version >= 0):
+        return None
+    return seed, version
+
+
+@app.post(
+    "/items/shuffles",
+    response_model=ShuffleSessionResponse,
+    tags=["Random Items Management"],
+)
+async def create_shuffle_session(payload: ShuffleSessionRequest | None = None):
+    seed = payload.seed if payload else None
+    if seed is None:
+        seed = secrets.randbelow(2**63)
+
+    # Read the version first: a write before len() only makes the session
+    # stale sooner.
+    version = items_db.version
+    count = await _call_store(len, items_db)
+    return ShuffleSessionResponse(
+        session_id=_shuffle_session_id(seed, version), seed=seed, count=count
+    )
+
+
+def _shuffle_page(
+    store: ItemStorage,
+    session_id: str,
+    seed: int,
+    version: int,
+    offset: int,
+    limit: int,
+) -> ShufflePageResponse | Response:
+    changed = HTTPException(
+        status_code=409, detail="The list has changed since the shuffle started"
+    )
+    # Any change, including a rename or a delete plus an add, moves the
+    # version; checking it again afterwards catches writes made meanwhile.
+    if store.version != version:
+        raise changed
+    count = len(store)
+    permutation = FeistelPermutation(count, seed)
+    end = min(offset + limit, count)
+    # One read for the whole page rather than one per position
+    items = store.take([permutation[index] for index in range(offset, end)])
+    if store.version != version:
+        raise changed
+
+    return _respond(
+        ShufflePageResponse,
+        session_id=session_id,
+        items=items,
+        offset=offset,
+        count=count,
+        next_offset=end if end < count else None,
+    )
+
+
+@app.get(
+    "/items/shuffles/{session_id}",
+    response_model=ShufflePageResponse,
+    tags=["Random Items Management"],
+)
+async def get_shuffle_page(
+    session_id: str,
+    offset: Annotated[
+        int,
+        Query(
+            title="Offset",
+            description="The position in the shuffled order to start from",
+            ge=0,
+        ),
+    ] = 0,
+    limit: Annotated[
+        int,
+        Query(
+            title="Page Size",
+            description="The maximum number of items to return",
+            ge=1,
+            le=1000,
+        ),
+    ] = 100,
+):
+    session = _parse_shuffle_session_id(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Shuffle session not found")
+    return await _call_store(
+        _shuffle_page, items_db, session_id, *session, offset, limit
+    )
+
+
+def _pick_random_item(store: ItemStorage) -> RandomItemResponse | Response:
+    try:
+        item = store.choice()
+    except IndexError:
+        raise HTTPException(status_code=404, detail="No items available") from None
+
+    return _respond(RandomItemResponse, item=item, count=len(store))
+
+
+def _sample_items(store: ItemStorage, k: int) -> SampleItemsResponse | Response:
+    try:
+        items = store.sample(k)
+    except ValueError:
+        raise HTTPException(
+            status_code=400, detail="k can't be greater than the number of items"
+        ) from None
+
+    return _respond(SampleItemsResponse, items=items, count=len(store))
+
+
+SampleSizeQuery = Annotated[
+    int,
+    Query(
+        title="Sample Size",
+        description="The number of distinct items to pick",
+        ge=1,
+        le=500,
+    ),
+]
+
+
+@app.get(
+    "/items/random",
+    response_model=RandomItemResponse,
+    tags=["Random Items Management"],
+)
+async def get_random_item():
+    response = await _call_store(_pick_random_item, items_db)
+    # Counted here, on the event loop, rather than in the store thread
+    metrics.count_draws("item")
+    return response
+
+
+@app.get(
+    "/items/sample",
+    response_model=SampleItemsResponse,
+    tags=["Random Items Management"],
+)
+async def get_random_sample(k: SampleSizeQuery = 1):
+    response = await _call_store(_sample_items, items_db, k)
+    metrics.count_draws("item", k)
+    return response
+
+
+@app.get(
+    "/items/weighted-pick",
+    response_model=WeightedPickResponse,
+    tags=["Random Items Management"],
+)
+async def get_weighted_pick(
+    k: Annotated[
+        int,
+        Query(
+            title="Draws",
+            description="The number of weighted draws, with replacement",
+            ge=1,
+            le=10000,
+        ),
+    ] = 1,
+):
+    try:
+        items = await _call_store(item_weights.pick, items_db, k)
+    except IndexError:
+        raise HTTPException(status_code=404, detail="No items available") from None
+    metrics.count_draws("weighted", k)
+
+    return _respond(
+        WeightedPickResponse, items=items, count=await _call_store(len, items_db)
+    )
+
+
+def _rename_item(store: ItemStorage, old_name: str, item: Item) -> ItemUpdateResponse:
+    try:
+        store.rename(old_name, item.name)
+    except KeyError as exc:
+        if exc.args[0] == old_name:
+            raise HTTPException(status_code=404, detail="Item not found") from None
+        raise HTTPException(
+            status_code=409, detail="An item with that name already exists"
+        ) from None
 
     return ItemUpdateResponse(
         message="Item updated successfully",
-        old_item=update_item_name,
+        old_item=old_name,
         new_item=item.name,
     )
 
 
-@app.delete(
-    "/items/{item}", response_model=ItemDeleteResponse, tags=["Random Items Management"]
-)
-async def delete_item(item: str):
-    if item not in items_db_set:
-        raise HTTPException(status_code=404, detail="Item not found")
-
-    items_db.remove(item)
-    items_db_set.remove(item)
+def _remove_item(store: ItemStorage, name: str) -> ItemDeleteResponse:
+    try:
+        store.remove(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Item not found") from None
 
     return ItemDeleteResponse(
         message="Item deleted successfully",
-        deleted_item=item,
-        remaining_items_count=len(items_db),
+        deleted_item=name,
+        remaining_items_count=len(store),
     )
 
 
-@app.delete(
-    "/items", response_model=BulkItemsDeleteResponse, tags=["Random Items Management"]
-)
-async def delete_all_items():
-    deleted_count = len(items_db)
-    items_db.clear()
-    items_db_set.clear()
+def _clear_items(store: ItemStorage) -> BulkItemsDeleteResponse:
+    deleted_count = len(store)
+    store.clear()
 
     return BulkItemsDeleteResponse(
         message="All items deleted successfully",
         deleted_count=deleted_count,
         remaining_items_count=0,
     )
+
+
+@app.put(
+    "/items/{update_item_name}",
+    response_model=ItemUpdateResponse,
+    tags=["Random Items Management"],
+)
+async def update_item(update_item_name: str, item: Item):
+    response, version = await _write_store(
+        _rename_item, items_db, update_item_name, item
+    )
+    item_weights.rename(update_item_name, item.name)
+    if item.weight is not None:
+        item_weights.set(item.name, item.weight)
+    if item.name != update_item_name:
+        await _record_change("rename", version, old=update_item_name, new=item.name)
+    return response
+
+
+@app.delete(
+    "/items/{item}", response_model=ItemDeleteResponse, tags=["Random Items Management"]
+)
+async def delete_item(item: str):
+    response, version = await _write_store(_remove_item, items_db, item)
+    item_weights.discard(item)
+    await _record_change("remove", version, names=[item])
+    return response
+
+
+@app.delete(
+    "/items", response_model=BulkItemsDeleteResponse, tags=["Random Items Management"]
+)
+async def delete_all_items():
+    response, version = await _write_store(_clear_items, items_db)
+    item_weights.clear()
+    await _record_change("clear", version)
+    return response
+
+
+def _bulk_delete_from(
+    store: ItemStorage, payload: BulkDeleteRequest
+) -> BulkDeleteResponse:
+    results: list[BulkDeleteResult] = []
+    to_delete: list[str] = []
+    seen: set[str] = set()
+    for name in payload.names:
+        if name in seen:
+            status = "duplicate"
+        elif name not in store:
+            status = "not_found"
+        else:
+            status = "deleted"
+            to_delete.append(name)
+        seen.add(name)
+        results.append(BulkDeleteResult(item=name, status=status))
+
+    # All found names are removed together, with at most one compaction.
+    try:
+        store.remove_many(to_delete)
+    except KeyError:
+        raise HTTPException(
+            status_code=409, detail="Items changed during bulk delete, please retry"
+        ) from None
+
+    return BulkDeleteResponse(
+        message="Bulk delete completed",
+        deleted_count=len(to_delete),
+        skipped_count=len(results) - len(to_delete),
+        remaining_items_count=len(store),
+        results=results,
+    )
+
+
+def _bulk_rename_in(
+    store: ItemStorage, payload: BulkRenameRequest
+) -> BulkRenameResponse:
+    # Mirrors the store's own check: new names may reuse names that this
+    # batch renames away, so swaps and chains are allowed.
+    renamed_away = {pair.old_name for pair in payload.renames}
+    results: list[BulkRenameResult] = []
+    renames: list[tuple[str, str]] = []
+    old_names: set[str] = set()
+    new_names: set[str] = set()
+    for pair in payload.renames:
+        if pair.old_name in old_names:
+            status = "duplicate"
+        elif pair.old_name not in store:
+            status = "not_found"
+        elif pair.new_name in new_names or (
+            pair.new_name in store and pair.new_name not in renamed_away
+        ):
+            status = "conflict"
+        elif pair.old_name == pair.new_name:
+            status = "unchanged"
+        else:
+            status = "renamed"
+            renames.append((pair.old_name, pair.new_name))
+        old_names.add(pair.old_name)
+        new_names.add(pair.new_name)
+        results.append(
+            BulkRenameResult(
+                old_name=pair.old_name, new_name=pair.new_name, status=status
+            )
+        )
+
+    if any(result.status not in ("renamed", "unchanged") for result in results):
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "message": "No items were renamed",
+                "results": [result.model_dump() for result in results],
+            },
+        )
+    try:
+        store.rename_many(renames)
+    except KeyError:
+        raise HTTPException(
+            status_code=409, detail="Items changed during bulk rename, please retry"
+        ) from None
+
+    return BulkRenameResponse(
+        message="Bulk rename completed", renamed_count=len(renames), results=results
+    )
+
+
+@app.post(
+    "/items/bulk-delete",
+    response_model=BulkDeleteResponse,
+    tags=["Random Items Management"],
+)
+async def delete_items_bulk(payload: BulkDeleteRequest):
+    response, version = await _write_store(_bulk_delete_from, items_db, payload)
+    deleted = [result.item for result in response.results if result.status == "deleted"]
+    if deleted:
+        item_weights.discard_many(deleted)
+        await _record_change("remove", version, names=deleted)
+    return response
+
+
+@app.post(
+    "/items/bulk-rename",
+    response_model=BulkRenameResponse,
+    tags=["Random Items Management"],
+)
+async def rename_items_bulk(payload: BulkRenameRequest):
+    response, version = await _write_store(_bulk_rename_in, items_db, payload)
+    renames = [
+        (result.old_name, result.new_name)
+        for result in response.results
+        if result.status == "renamed"
+    ]
+    if renames:
+        item_weights.rename_many(renames)
+        await _record_change("rename_many", version, pairs=renames)
+    return response
+
+
+# Named lists
+ListIdPath = Annotated[
+    str,
+    Path(
+        title="List ID",
+        description="Letters, digits, '-' and '_' only",
+        pattern=r"^[A-Za-z0-9_-]{1,64}$",
+    ),
+]
+
+
+class ListDeleteResponse(BaseModel):
+    message: str
+    list_id: str
+
+
+def _get_list(registry: ListRegistry, list_id: str) -> ItemStorage:
+    store = registry.get(list_id)
+    if store is None:
+        raise HTTPException(status_code=404, detail="List not found")
+    return store
+
+
+def _add_to_list(list_id: str, add: Callable[..., Any], /, *args: Any) -> Any:
+    store = list_registry.get(list_id)
+    if store is not None:
+        return add(store, *args)
+    # A new list is registered only once something is in it, so a rejected
+    # add doesn't leave an empty list behind.
+    store = ItemStore()
+    result = add(store, *args)
+    if len(store):
+        list_registry.add(list_id, store)
+    return result
+
+
+@app.post("/lists/{list_id}/items", response_model=ItemResponse, tags=["Named Lists"])
+async def add_list_item(list_id: ListIdPath, item: Item):
+    name = _add_to_list(list_id, _add_item_to, item, MAX_LIST_ITEMS)
+    return ItemResponse(message="Item added successfully", item=name)
+
+
+@app.post(
+    "/lists/{list_id}/items/bulk",
+    response_model=BulkItemsAddResponse,
+    tags=["Named Lists"],
+)
+async def add_list_items_bulk(list_id: ListIdPath, payload: BulkItemsRequest):
+    return _add_to_list(list_id, _add_items_bulk_to, payload, MAX_LIST_ITEMS)
+
+
+@app.get(
+    "/lists/{list_id}/items", response_model=ItemListResponse, tags=["Named Lists"]
+)
+async def get_randomized_list_items(
+    list_id: ListIdPath, limit: ShuffleLimitQuery = None
+):
+    return _shuffle_items(_get_list(list_registry, list_id), limit)
+
+
+@app.get(
+    "/lists/{list_id}/items/random",
+    response_model=RandomItemResponse,
+    tags=["Named Lists"],
+)
+async def get_random_list_item(list_id: ListIdPath):
+    response = _pick_random_item(_get_list(list_registry, list_id))
+    metrics.count_draws("item")
+    return response
+
+
+@app.get(
+    "/lists/{list_id}/items/sample",
+    response_model=SampleItemsResponse,
+    tags=["Named Lists"],
+)
+async def get_random_list_sample(list_id: ListIdPath, k: SampleSizeQuery = 1):
+    response = _sample_items(_get_list(list_registry, list_id), k)
+    metrics.count_draws("item", k)
+    return response
+
+
+@app.put(
+    "/lists/{list_id}/items/{update_item_name}",
+    response_model=ItemUpdateResponse,
+    tags=["Named Lists"],
+)
+async def update_list_item(list_id: ListIdPath, update_item_name: str, item: Item):
+    return _rename_item(_get_list(list_registry, list_id), update_item_name, item)
+
+
+@app.delete(
+    "/lists/{list_id}/items/{item}",
+    response_model=ItemDeleteResponse,
+    tags=["Named Lists"],
+)
+async def delete_list_item(list_id: ListIdPath, item: str):
+    return _remove_item(_get_list(list_registry, list_id), item)
+
+
+@app.delete(
+    "/lists/{list_id}/items",
+    response_model=BulkItemsDeleteResponse,
+    tags=["Named Lists"],
+)
+async def delete_all_list_items(list_id: ListIdPath):
+    return _clear_items(_get_list(list_registry, list_id))
+
+
+@app.delete("/lists/{list_id}", response_model=ListDeleteResponse, tags=["Named Lists"])
+async def delete_list(list_id: ListIdPath):
+    if not list_registry.delete(list_id):
+        raise HTTPException(status_code=404, detail="List not found")
+
+    return ListDeleteResponse(message="List deleted successfully", list_id=list_id)
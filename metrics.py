@@ -0,0 +1,321 @@
+"""Prometheus-style metrics, request instrumentation, and slow-request sampling."""
+
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)  # fmt: skip
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``observe`` is one bisect and two additions."""
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # One slot per bucket plus +Inf, allocated up front.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[tuple[str, int]]:
+        """Yield ``(le, count)`` pairs in Prometheus order."""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts, strict=False):
+            total += count
+            yield _format_value(bound), total
+        yield "+Inf", total + self.counts[-1]
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}" if pairs else ""
+
+
+class Metrics:
+    """Registry of the service's counters, histograms, and gauges.
+
+    Everything is updated from the event loop thread, where handlers and
+    middleware run, so updates are plain integer additions with no locks.
+    Histograms for each label set are created on first use with all their
+    buckets allocated, and gauges are read from callbacks only when the
+    metrics are rendered.
+    """
+
+    def __init__(self) -> None:
+        self.requests: Counter[tuple[str, str, str]] = Counter()
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.response_size: dict[tuple[str, str], Histogram] = {}
+        self.shuffle = Histogram(LATENCY_BUCKETS)
+        self.rng_draws: Counter[str] = Counter()
+        self.gauges: dict[str, tuple[str, Callable[[], float]]] = {}
+
+    def observe_request(
+        self, method: str, route: str, status: int, seconds: float, size: int
+    ) -> None:
+        key = (method, route)
+        self.requests[(method, route, str(status))] += 1
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.response_size[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(seconds)
+        self.response_size[key].observe(size)
+
+    def observe_stream(self, method: str, route: str, status: int) -> None:
+        """Count a streaming response, whose duration is a connection lifetime."""
+        self.requests[(method, route, str(status))] += 1
+
+    def count_draws(self, source: str, count: int = 1) -> None:
+        self.rng_draws[source] += count
+
+    @contextmanager
+    def time_shuffle(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.shuffle.observe(time.perf_counter() - start)
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Register a gauge whose value is read when metrics are rendered."""
+        self.gauges[name] = (help_text, read)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = [
+            "# HELP randomizer_http_requests_total HTTP requests by route and status.",
+            "# TYPE randomizer_http_requests_total counter",
+        ]
+        names = ("method", "route", "status")
+        for labels, value in sorted(self.requests.items()):
+            lines.append(
+                f"randomizer_http_requests_total{_labels(names, labels)} {value}"
+            )
+        self._render_histograms(
+            lines,
+            "randomizer_http_request_duration_seconds",
+            "Time spent handling HTTP requests.",
+            ("method", "route"),
+            self.latency,
+        )
+        self._render_histograms(
+            lines,
+            "randomizer_http_response_size_bytes",
+            "Size of HTTP response bodies.",
+            ("method", "route"),
+            self.response_size,
+        )
+        self._render_histograms(
+            lines,
+            "randomizer_shuffle_duration_seconds",
+            "Time spent shuffling item lists.",
+            (),
+            {(): self.shuffle},
+        )
+        lines += [
+            "# HELP randomizer_rng_draws_total Random numbers drawn, by source.",
+            "# TYPE randomizer_rng_draws_total counter",
+        ]
+        for source, value in sorted(self.rng_draws.items()):
+            lines.append(
+                f"randomizer_rng_draws_total{_labels(('source',), (source,))} {value}"
+            )
+        for name, (help_text, read) in sorted(self.gauges.items()):
+            lines += [
+                f"# HELP {name} {help_text}",
+                f"# TYPE {name} gauge",
+                f"{name} {_format_value(read())}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def _render_histograms(
+        self,
+        lines: list[str],
+        name: str,
+        help_text: str,
+        names: tuple[str, ...],
+        histograms: dict[tuple, Histogram],
+    ) -> None:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, histogram in sorted(histograms.items()):
+            for bound, count in histogram.cumulative():
+                bucket_labels = _labels((*names, "le"), (*labels, bound))
+                lines.append(f"{name}_bucket{bucket_labels} {count}")
+            base = _labels(names, labels)
+            lines.append(f"{name}_sum{base} {histogram.sum!r}")
+            lines.append(f"{name}_count{base} {histogram.count}")
+
+
+class StackSampler:
+    """Samples one thread's stack in the background for slow-request profiles.
+
+    While at least one request is in flight, a daemon thread records the
+    target thread's stack every ``interval`` seconds into a bounded buffer.
+    When a request turns out slower than the threshold, the samples taken
+    during it are written as collapsed stacks (one ``frame;frame;... count``
+    line per distinct stack), which flamegraph.pl and speedscope read
+    directly. Samples from requests that overlapped it are included too.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        threshold: float,
+        interval: float = 0.005,
+        max_samples: int = 100_000,
+    ) -> None:
+        self.directory = Path(directory)
+        self.threshold = threshold
+        self.interval = interval
+        self._samples: deque[tuple[float, str]] = deque(maxlen=max_samples)
+        self._active = 0
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._target: int | None = None
+        self.dumps = 0
+
+    def begin(self) -> float:
+        """Mark a request as started; returns its start time."""
+        if self._thread is None:
+            self._target = threading.get_ident()
+            self._thread = threading.Thread(
+                target=self._run, name="stack-sampler", daemon=True
+            )
+            self._thread.start()
+        self._active += 1
+        self._wake.set()
+        return time.perf_counter()
+
+    def cancel(self) -> None:
+        """Mark a request as no longer sampled, without dumping anything."""
+        self._active -= 1
+        if not self._active:
+            self._wake.clear()
+
+    def end(self, start: float, label: str) -> Path | None:
+        """Mark a request as finished and dump its samples if it was slow."""
+        self.cancel()
+        end = time.perf_counter()
+        if end - start < self.threshold:
+            return None
+        stacks = Counter(stack for at, stack in list(self._samples) if at >= start)
+        if not stacks:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        safe_label = "".join(c if c.isalnum() else "_" for c in label).strip("_")
+        path = self.directory / f"{time.time_ns()}-{safe_label}.folded"
+        path.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in stacks.items()),
+            encoding="utf-8",
+        )
+        self.dumps += 1
+        return path
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self._samples.append((time.perf_counter(), _collapse(frame)))
+            time.sleep(self.interval)
+
+
+def _collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records every HTTP request in :class:`Metrics`.
+
+    Requests are labelled with the matched route's path template, so
+    ``/items/{item}`` is one series however many items there are;
+    unmatched paths share one ``unmatched`` label. ``text/event-stream``
+    responses are only counted: they stay open for as long as the client
+    listens, so they are left out of the latency and size histograms and
+    stop being sampled once their headers are sent.
+    """
+
+    def __init__(
+        self, app, metrics: Metrics, sampler: StackSampler | None = None
+    ) -> None:
+        self.app = app
+        self.metrics = metrics
+        self.sampler = sampler
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+        streaming = False
+
+        async def send_wrapper(message) -> None:
+            nonlocal status, size, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = dict(message.get("headers", ()))
+                content_type = headers.get(b"content-type", b"")
+                if content_type.startswith(b"text/event-stream"):
+                    streaming = True
+                    if sampler is not None:
+                        sampler.cancel()
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        sampler = self.sampler
+        start = sampler.begin() if sampler is not None else time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            label = getattr(route, "path", "unmatched")
+            if streaming:
+                self.metrics.observe_stream(scope["method"], label, status)
+            else:
+                self.metrics.observe_request(
+                    scope["method"], label, status, elapsed, size
+                )
+                if sampler is not None:
+                    sampler.end(start, f"{scope['method']} {label}")
+
+
+def create_sampler() -> StackSampler | None:
+    """Build a sampler from ``$RANDOMIZER_SLOW_REQUEST_MS``, or ``None`` if unset."""
+    threshold_ms = float(os.environ.get("RANDOMIZER_SLOW_REQUEST_MS", "0"))
+    if threshold_ms <= 0:
+        return None
+    directory = os.environ.get("RANDOMIZER_PROFILE_DIR", "profiles")
+    return StackSampler(directory, threshold_ms / 1000)
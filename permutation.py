@@ -0,0 +1,55 @@
+"""Seeded pseudo-random permutations computed one index at a time."""
+
+import hashlib
+
+
+class FeistelPermutation:
+    """Bijection over ``range(size)`` derived from a seed.
+
+    Indices are mixed with a balanced Feistel network over the smallest
+    even-bit power-of-two domain covering ``size``; results that land outside
+    ``range(size)`` are fed back through the network (cycle walking) until
+    they fall inside. Any position of the permutation can be computed in
+    O(1) without materializing the rest of it.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, size: int, seed: int) -> None:
+        if size < 0:
+            raise ValueError("size must be non-negative")
+        self.size = size
+        self.seed = seed
+        bits = max(2, (size - 1).bit_length())
+        bits += bits % 2
+        self._half_bits = bits // 2
+        self._half_mask = (1 << self._half_bits) - 1
+        seed_bytes = seed.to_bytes(16, "big", signed=True)
+        self._keys = [
+            seed_bytes + round_index.to_bytes(1, "big")
+            for round_index in range(self.ROUNDS)
+        ]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self.size:
+            raise IndexError("permutation index out of range")
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+    def _round(self, key: bytes, value: int) -> int:
+        digest = hashlib.blake2b(
+            value.to_bytes(8, "big"), key=key, digest_size=8
+        ).digest()
+        return int.from_bytes(digest, "big") & self._half_mask
+
+    def _encrypt(self, value: int) -> int:
+        left = value >> self._half_bits
+        right = value & self._half_mask
+        for key in self._keys:
+            left, right = right, left ^ self._round(key, right)
+        return (left << self._half_bits) | right
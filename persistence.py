@@ -0,0 +1,213 @@
+"""Write-ahead log and snapshots for the item store."""
+
+import asyncio
+import json
+import mmap
+import os
+import threading
+from pathlib import Path
+
+from store import ItemStorage
+
+
+def apply_record(store: ItemStorage, record: dict) -> None:
+    """Replay one logged mutation against ``store``."""
+    op = record["op"]
+    if op == "add":
+        store.extend(record["names"])
+    elif op == "rename":
+        store.rename(record["old"], record["new"])
+    elif op == "rename_many":
+        store.rename_many(record["pairs"])
+    elif op == "remove":
+        store.remove_many(record["names"])
+    elif op == "clear":
+        store.clear()
+    else:
+        raise ValueError(f"Unknown journal operation {op!r}")
+
+
+class ItemJournal:
+    """Durable append-only log of store mutations with periodic snapshots.
+
+    Every mutation is recorded as one JSON line with a sequence number.
+    Records accumulate in memory until a commit writes the whole batch and
+    issues a single ``fsync``; concurrent requests awaiting :meth:`sync`
+    share that fsync (group commit). Once ``snapshot_every`` records have
+    been written, the store is dumped to a snapshot file and the log is
+    truncated. On startup the snapshot is memory-mapped and loaded, then
+    any log records newer than it are replayed.
+    """
+
+    WAL_NAME = "items.wal"
+    SNAPSHOT_NAME = "items.snapshot"
+
+    def __init__(
+        self,
+        directory: str | Path,
+        store: ItemStorage,
+        snapshot_every: int = 10000,
+        commit_interval: float = 0.002,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.wal_path = self.directory / self.WAL_NAME
+        self.snapshot_path = self.directory / self.SNAPSHOT_NAME
+        self.store = store
+        self.snapshot_every = snapshot_every
+        self.commit_interval = commit_interval
+        self._seq = 0
+        self._since_snapshot = 0
+        self._pending: list[bytes] = []
+        self._waiters: list[asyncio.Future] = []
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._file_lock = threading.Lock()
+        self.commits = 0
+
+    def load(self) -> None:
+        """Rebuild the store from the snapshot and log on disk."""
+        self.store.clear()
+        snapshot_seq = self._load_snapshot()
+        self._seq = snapshot_seq
+        self._since_snapshot = 0
+        if not self.wal_path.exists():
+            return
+        valid_end = 0
+        with self.wal_path.open("r+b") as wal:
+            for line in wal:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("missing newline")
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final write from a crash; nothing after it was
+                    # acknowledged.
+                    break
+                valid_end += len(line)
+                if record["seq"] <= snapshot_seq:
+                    continue
+                apply_record(self.store, record)
+                self._seq = record["seq"]
+                self._since_snapshot += 1
+            if valid_end < wal.seek(0, os.SEEK_END):
+                # Cut off the torn tail, or records appended after it would
+                # share its line and be unreadable on the next load.
+                wal.truncate(valid_end)
+                os.fsync(wal.fileno())
+
+    def _load_snapshot(self) -> int:
+        if not self.snapshot_path.exists() or not self.snapshot_path.stat().st_size:
+            return 0
+        with (
+            self.snapshot_path.open("rb") as snapshot,
+            mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ) as view,
+        ):
+            header = json.loads(view.readline())
+            self.store.extend(json.loads(line) for line in iter(view.readline, b""))
+        return header["seq"]
+
+    def record(self, op: str, **fields) -> None:
+        """Queue a mutation that has just been applied to the store."""
+        self._seq += 1
+        line = json.dumps({"seq": self._seq, "op": op, **fields}) + "\n"
+        self._pending.append(line.encode())
+
+    async def sync(self) -> None:
+        """Wait until every queued record has been fsynced."""
+        if self._task is None:
+            # Without the background task, write inline so batches can't be
+            # reordered by racing threads.
+            self._write(*self._take_batch())
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._wake.set()
+        await waiter
+
+    def _take_batch(self) -> tuple[list[bytes], tuple[int, list[str]] | None]:
+        lines, self._pending = self._pending, []
+        self._since_snapshot += len(lines)
+        snapshot = None
+        if self._since_snapshot >= self.snapshot_every:
+            snapshot = (self._seq, self.store.to_list())
+            self._since_snapshot = 0
+        return lines, snapshot
+
+    async def _commit(self) -> None:
+        waiters, self._waiters = self._waiters, []
+        lines, snapshot = self._take_batch()
+        try:
+            await asyncio.to_thread(self._write, lines, snapshot)
+        except OSError as exc:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(exc)
+            return
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _write(
+        self, lines: list[bytes], snapshot: tuple[int, list[str]] | None
+    ) -> None:
+        if not lines and not snapshot:
+            return
+        with self._file_lock:
+            self.commits += 1
+            if lines:
+                with self.wal_path.open("ab") as wal:
+                    wal.write(b"".join(lines))
+                    wal.flush()
+                    os.fsync(wal.fileno())
+            if snapshot:
+                self._write_snapshot(*snapshot)
+
+    def _write_snapshot(self, seq: int, names: list[str]) -> None:
+        temporary = self.snapshot_path.with_suffix(".tmp")
+        with temporary.open("w", encoding="utf-8") as out:
+            out.write(json.dumps({"seq": seq}) + "\n")
+            out.writelines(json.dumps(name) + "\n" for name in names)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temporary, self.snapshot_path)
+        # Records up to ``seq`` are in the snapshot; anything newer is still
+        # pending in memory and will be appended after the truncation.
+        with self.wal_path.open("wb") as wal:
+            os.fsync(wal.fileno())
+
+    async def _commit_forever(self) -> None:
+        while not self._stopping:
+            await self._wake.wait()
+            self._wake.clear()
+            if not self._stopping:
+                # Let other requests join this batch before paying for the
+                # fsync.
+                await asyncio.sleep(self.commit_interval)
+            await self._commit()
+
+    def start(self) -> None:
+        """Start the background group-commit task."""
+        if self._task is None:
+            self._stopping = False
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._commit_forever())
+
+    async def stop(self) -> None:
+        """Flush anything still queued and stop the background task."""
+        if self._task is not None:
+            self._stopping = True
+            self._wake.set()
+            await self._task
+            self._task = None
+            self._wake = None
+        self._write(*self._take_batch())
+
+
+def create_journal(store: ItemStorage) -> ItemJournal | None:
+    """Build a journal in ``$RANDOMIZER_DATA_DIR``, or ``None`` if unset."""
+    directory = os.environ.get("RANDOMIZER_DATA_DIR")
+    if not directory:
+        return None
+    return ItemJournal(directory, store)
@@ -0,0 +1,195 @@
+"""Per-client rate limiting and load shedding for write requests."""
+
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+
+from starlette.routing import Match
+
+# Requests that change data; reads are never limited
+WRITE_METHODS = frozenset({"POST", "PUT", "DELETE", "PATCH"})
+
+
+class TokenBuckets:
+    """Token buckets keyed by ``(client, route)``, at most ``max_clients`` of them.
+
+    Each bucket holds up to ``burst`` tokens and regains ``rate`` per second;
+    a request spends one. Buckets live in an ``OrderedDict`` in least
+    recently used order, so a lookup, refill, and eviction are all O(1) and
+    the oldest idle bucket is dropped once ``max_clients`` are tracked. A
+    dropped bucket comes back full, which only forgets a client that has
+    been quiet longer than every other one.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        # key -> [tokens, time of last refill]
+        self._buckets: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: tuple[str, str], now: float | None = None) -> float:
+        """Spend a token for ``key``; return 0, or seconds until one is available."""
+        if now is None:
+            now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+
+class AdmissionControl:
+    """Caps concurrent requests and sheds those that queue for too long.
+
+    At most ``max_concurrent`` requests run at once; the rest wait for a
+    slot in arrival order. A request still waiting after ``max_queue``
+    seconds is turned away, so a backlog can't build up faster than the
+    event loop drains it.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: float) -> None:
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be positive")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.shed = 0
+
+    async def acquire(self) -> bool:
+        """Wait for a slot; return ``False`` if the request should be shed."""
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.max_queue)
+        except TimeoutError:
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+
+
+def _client_address(scope) -> str:
+    # The direct peer; X-Forwarded-For is spoofable unless a trusted proxy
+    # rewrites it, e.g. with uvicorn's --forwarded-allow-ips.
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+async def _too_many_requests(send, retry_after: float, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    """ASGI middleware that throttles write requests before they are handled.
+
+    Writes are first charged to the client's bucket for the matched route
+    template, so ``PUT /items/{item_id}`` is one limit however many items a
+    client touches, then admitted through :class:`AdmissionControl`.
+    Rejections are ``429 Too Many Requests`` with a ``Retry-After`` header.
+    Either check can be left out by passing ``None``.
+    """
+
+    def __init__(
+        self,
+        app,
+        router,
+        buckets: TokenBuckets | None = None,
+        admission: AdmissionControl | None = None,
+    ) -> None:
+        self.app = app
+        self.router = router
+        self.buckets = buckets
+        self.admission = admission
+
+    def _route(self, scope):
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        buckets, admission = self.buckets, self.admission
+        if buckets is not None:
+            route = self._route(scope)
+            if route is not None:
+                wait = buckets.take((_client_address(scope), route.path))
+                if wait:
+                    # Lets outer middleware label the rejection by route.
+                    scope["route"] = route
+                    await _too_many_requests(send, wait, "Rate limit exceeded")
+                    return
+
+        if admission is None:
+            await self.app(scope, receive, send)
+            return
+        if not await admission.acquire():
+            await _too_many_requests(
+                send, admission.max_queue, "Server busy, try again later"
+            )
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release()
+
+
+def create_rate_limits() -> tuple[TokenBuckets | None, AdmissionControl | None]:
+    """Build the limits configured in the environment; each is ``None`` if unset.
+
+    ``$RANDOMIZER_RATE_LIMIT`` is writes per second per client and route,
+    with bursts of ``$RANDOMIZER_RATE_BURST`` (default the same, at least 1)
+    and buckets for up to ``$RANDOMIZER_RATE_LIMIT_CLIENTS`` (default
+    10,000). ``$RANDOMIZER_MAX_CONCURRENT_WRITES`` caps writes in progress,
+    shedding any that wait longer than ``$RANDOMIZER_MAX_QUEUE_MS``
+    (default 100).
+    """
+    buckets = None
+    rate = float(os.environ.get("RANDOMIZER_RATE_LIMIT", "0"))
+    if rate > 0:
+        burst = float(os.environ.get("RANDOMIZER_RATE_BURST", max(1.0, rate)))
+        max_clients = int(os.environ.get("RANDOMIZER_RATE_LIMIT_CLIENTS", "10000"))
+        buckets = TokenBuckets(rate, burst, max_clients)
+
+    admission = None
+    max_concurrent = int(os.environ.get("RANDOMIZER_MAX_CONCURRENT_WRITES", "0"))
+    if max_concurrent > 0:
+        max_queue_ms = float(os.environ.get("RANDOMIZER_MAX_QUEUE_MS", "100"))
+        admission = AdmissionControl(max_concurrent, max_queue_ms / 1000)
+    return buckets, admission
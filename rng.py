@@ -0,0 +1,215 @@
+"""Pluggable random number generator backends."""
+
+import asyncio
+import os
+import random
+import secrets
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+class RandomNumberGenerator:
+    """Draws uniform integers from an underlying ``random.Random``."""
+
+    name = "mt"
+
+    def __init__(self, seed: int | None = None) -> None:
+        self._random = random.Random(seed)
+
+    def randint(self, low: int, high: int) -> int:
+        """Return one integer in ``[low, high]``."""
+        return self._random.randint(low, high)
+
+    def randints(self, low: int, high: int, count: int) -> list[int]:
+        """Return ``count`` integers in ``[low, high]`` in one call."""
+        if low > high:
+            raise ValueError("low can't be greater than high")
+        # choices() scales a float onto the range, which overflows or loses
+        # low bits once the span passes 2**53; randrange() is exact.
+        randrange = self._random.randrange
+        return [randrange(low, high + 1) for _ in range(count)]
+
+    def random_words(self, count: int) -> array:
+        """Return ``count`` uniform unsigned 64-bit integers."""
+        return array("Q", self._random.randbytes(8 * count))
+
+
+class SystemRandomGenerator(RandomNumberGenerator):
+    """Draws from the operating system's CSPRNG via ``secrets``."""
+
+    name = "system"
+
+    def __init__(self, seed: int | None = None) -> None:
+        # SystemRandom ignores seeding; accept the argument for a uniform API.
+        self._random = secrets.SystemRandom()
+
+
+class NumpyRandomGenerator(RandomNumberGenerator):
+    """Draws from a NumPy PCG64 ``Generator`` with vectorized batches."""
+
+    name = "numpy"
+
+    # Bounds NumPy's int64 sampling can handle without overflowing
+    _INT64_MIN = -(2**63)
+    _INT64_MAX = 2**63 - 2
+
+    def __init__(self, seed: int | None = None) -> None:
+        if np is None:
+            raise RuntimeError("The numpy RNG backend requires numpy")
+        self._generator = np.random.Generator(np.random.PCG64(seed))
+        super().__init__(seed)
+
+    def randint(self, low: int, high: int) -> int:
+        return self.randints(low, high, 1)[0]
+
+    def randints(self, low: int, high: int, count: int) -> list[int]:
+        if low > high:
+            raise ValueError("low can't be greater than high")
+        if low < self._INT64_MIN or high > self._INT64_MAX:
+            return super().randints(low, high, count)
+        return self._generator.integers(low, high + 1, size=count).tolist()
+
+    def random_words(self, count: int) -> array:
+        return array("Q", self._generator.bytes(8 * count))
+
+
+RNG_BACKENDS: dict[str, type[RandomNumberGenerator]] = {
+    backend.name: backend
+    for backend in (RandomNumberGenerator, SystemRandomGenerator, NumpyRandomGenerator)
+}
+
+
+def create_rng(
+    name: str | None = None, seed: int | None = None
+) -> RandomNumberGenerator:
+    """Build the backend called ``name``, defaulting to ``$RANDOMIZER_RNG``."""
+    if name is None:
+        name = os.environ.get("RANDOMIZER_RNG", RandomNumberGenerator.name)
+    try:
+        backend = RNG_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown RNG backend {name!r}; expected one of {sorted(RNG_BACKENDS)}"
+        ) from None
+    return backend(seed)
+
+
+class RandomPool:
+    """Ring buffer of pre-drawn 64-bit words that serves integer draws.
+
+    Requests take one word from the buffer and map it onto ``[low, high]``
+    with a multiply-shift (no rejection loop, bias below ``span / 2**64``).
+    A background task tops the buffer back up whenever it drops below the
+    low watermark, so generator work stays off the request path. When the
+    buffer is empty the draw falls back to the generator and is counted as
+    a stall.
+    """
+
+    def __init__(
+        self,
+        generator: RandomNumberGenerator,
+        capacity: int = 65536,
+        low_watermark: float = 0.25,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.generator = generator
+        self.capacity = capacity
+        self.low_watermark = max(1, int(capacity * low_watermark))
+        self._buffer = array("Q", bytes(8 * capacity))
+        self._head = 0
+        self._available = 0
+        self._refill_needed: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self.hits = 0
+        self.stalls = 0
+        self.refills = 0
+
+    @property
+    def available(self) -> int:
+        return self._available
+
+    def refill(self) -> None:
+        """Fill every empty slot in the buffer."""
+        missing = self.capacity - self._available
+        if not missing:
+            return
+        words = self.generator.random_words(missing)
+        tail = (self._head + self._available) % self.capacity
+        first = min(missing, self.capacity - tail)
+        self._buffer[tail : tail + first] = words[:first]
+        self._buffer[: missing - first] = words[first:]
+        self._available = self.capacity
+        self.refills += 1
+
+    def randint(self, low: int, high: int) -> int:
+        """Return one integer in ``[low, high]``."""
+        span = high - low + 1
+        if span < 1:
+            raise ValueError("low can't be greater than high")
+        if span > 2**64:
+            return self.generator.randint(low, high)
+        if not self._available:
+            self.stalls += 1
+            self._request_refill()
+            return self.generator.randint(low, high)
+
+        word = self._buffer[self._head]
+        self._head = (self._head + 1) % self.capacity
+        self._available -= 1
+        self.hits += 1
+        if self._available < self.low_watermark:
+            self._request_refill()
+        return low + ((word * span) >> 64)
+
+    def stats(self) -> dict[str, int | float]:
+        draws = self.hits + self.stalls
+        return {
+            "capacity": self.capacity,
+            "available": self._available,
+            "hits": self.hits,
+            "stalls": self.stalls,
+            "refills": self.refills,
+            "hit_rate": self.hits / draws if draws else 1.0,
+        }
+
+    def _request_refill(self) -> None:
+        if self._refill_needed is not None:
+            self._refill_needed.set()
+
+    async def _refill_forever(self) -> None:
+        while True:
+            await self._refill_needed.wait()
+            self._refill_needed.clear()
+            self.refill()
+
+    def start(self) -> None:
+        """Fill the buffer and start the background refill task."""
+        self.refill()
+        if self._task is None:
+            self._refill_needed = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._refill_forever())
+
+    async def stop(self) -> None:
+        """Cancel the background refill task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._refill_needed = None
+
+
+def create_pool(generator: RandomNumberGenerator) -> RandomPool | None:
+    """Build a pool sized by ``$RANDOMIZER_RNG_POOL``, or ``None`` if unset."""
+    capacity = int(os.environ.get("RANDOMIZER_RNG_POOL", "0"))
+    if capacity <= 0:
+        return None
+    return RandomPool(generator, capacity)
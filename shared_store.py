@@ -0,0 +1,225 @@
+"""Item storage shared between worker processes through a memory-mapped file."""
+
+import fcntl
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+
+from persistence import apply_record
+from store import ItemStore
+
+# generation, end of the used data region
+HEADER = struct.Struct("<QQ")
+RECORD_LENGTH = struct.Struct("<I")
+
+# Bits of ``version`` taken by the log offset; arenas are far smaller.
+OFFSET_BITS = 40
+
+
+class SharedItemStore:
+    """Item storage that every uvicorn worker on a node reads and writes.
+
+    The arena is a memory-mapped file holding a small header and an
+    append-only log of mutation records. Each process keeps a local
+    :class:`store.ItemStore` replica and remembers how far into the log it
+    has read; before every operation it takes a shared ``flock``, compares
+    the header with its position, and replays only the new records. Writers
+    take the exclusive lock, bring their replica up to date, apply the
+    change, and append one record. When the log fills up it is rewritten as
+    a single snapshot record and the generation is bumped, which tells the
+    other workers to reload from scratch.
+    """
+
+    def __init__(self, path: str | Path, size: int = 64 * 1024 * 1024) -> None:
+        self.path = Path(path)
+        self._capacity = size - HEADER.size
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._flock(fcntl.LOCK_EX):
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._thread_lock = threading.RLock()
+        self._local = ItemStore()
+        self._generation = -1
+        self._offset = 0
+
+    def close(self) -> None:
+        """Unmap the arena and close its file."""
+        self._map.close()
+        os.close(self._fd)
+
+    @contextmanager
+    def _flock(self, operation: int) -> Iterator[None]:
+        fcntl.flock(self._fd, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[ItemStore]:
+        with (
+            self._thread_lock,
+            self._flock(fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH),
+        ):
+            self._catch_up()
+            yield self._local
+
+    def _catch_up(self) -> None:
+        generation, end = HEADER.unpack_from(self._map, 0)
+        if generation != self._generation:
+            self._local.clear()
+            self._generation = generation
+            self._offset = 0
+        while self._offset < end:
+            position = HEADER.size + self._offset
+            (length,) = RECORD_LENGTH.unpack_from(self._map, position)
+            start = position + RECORD_LENGTH.size
+            apply_record(self._local, json.loads(self._map[start : start + length]))
+            self._offset += RECORD_LENGTH.size + length
+
+    def _append(self, record: dict) -> None:
+        payload = json.dumps(record).encode()
+        if self._offset + RECORD_LENGTH.size + len(payload) > self._capacity:
+            self._rewrite()
+            return
+        position = HEADER.size + self._offset
+        RECORD_LENGTH.pack_into(self._map, position, len(payload))
+        start = position + RECORD_LENGTH.size
+        self._map[start : start + len(payload)] = payload
+        self._offset += RECORD_LENGTH.size + len(payload)
+        # Publish the record only after its bytes are in place.
+        HEADER.pack_into(self._map, 0, self._generation, self._offset)
+
+    def _rewrite(self) -> None:
+        # The local replica already includes the change being written.
+        names = self._local.to_list()
+        payload = json.dumps({"op": "add", "names": names}).encode()
+        if RECORD_LENGTH.size + len(payload) > self._capacity:
+            # Drop the unpublished change; the next operation reloads the
+            # replica from the arena.
+            self._generation = -1
+            raise MemoryError("Shared item store arena is full")
+        self._generation += 1
+        self._offset = 0
+        HEADER.pack_into(self._map, 0, self._generation, 0)
+        if names:
+            self._append({"op": "add", "names": names})
+
+    @property
+    def version(self) -> int:
+        # The log only grows within a generation and every clear or rewrite
+        # starts a new one, so this rises with every change.
+        with self._locked(exclusive=False):
+            return (self._generation << OFFSET_BITS) | self._offset
+
+    def __len__(self) -> int:
+        with self._locked(exclusive=False) as local:
+            return len(local)
+
+    def __contains__(self, name: object) -> bool:
+        with self._locked(exclusive=False) as local:
+            return name in local
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_list())
+
+    def __getitem__(self, position: int) -> str:
+        with self._locked(exclusive=False) as local:
+            return local[position]
+
+    def __repr__(self) -> str:
+        return f"SharedItemStore({str(self.path)!r})"
+
+    def add(self, name: str) -> None:
+        """Append ``name`` to the end of the list."""
+        self.extend([name])
+
+    def extend(self, names: Iterable[str]) -> None:
+        """Append every name in ``names``, in order, as one record."""
+        names = list(names)
+        with self._locked(exclusive=True) as local:
+            local.extend(names)
+            if names:
+                self._append({"op": "add", "names": names})
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        """Replace ``old_name`` with ``new_name`` at the same position."""
+        with self._locked(exclusive=True) as local:
+            local.rename(old_name, new_name)
+            if old_name != new_name:
+                self._append({"op": "rename", "old": old_name, "new": new_name})
+
+    def rename_many(self, renames: Iterable[tuple[str, str]]) -> None:
+        """Apply every ``(old_name, new_name)`` pair as one record."""
+        renames = [(old_name, new_name) for old_name, new_name in renames]
+        with self._locked(exclusive=True) as local:
+            local.rename_many(renames)
+            if renames:
+                self._append({"op": "rename_many", "pairs": renames})
+
+    def remove(self, name: str) -> None:
+        """Delete ``name`` from the list."""
+        with self._locked(exclusive=True) as local:
+            local.remove(name)
+            self._append({"op": "remove", "names": [name]})
+
+    def remove_many(self, names: Iterable[str]) -> None:
+        """Delete every name in ``names`` as one record."""
+        names = list(names)
+        with self._locked(exclusive=True) as local:
+            local.remove_many(names)
+            if names:
+                self._append({"op": "remove", "names": names})
+
+    def clear(self) -> None:
+        """Remove every item."""
+        with self._locked(exclusive=True) as local:
+            local.clear()
+            self._generation += 1
+            self._offset = 0
+            HEADER.pack_into(self._map, 0, self._generation, 0)
+
+    def choice(self) -> str:
+        """Return one uniformly random name."""
+        with self._locked(exclusive=False) as local:
+            return local.choice()
+
+    def sample(self, k: int) -> list[str]:
+        """Return ``k`` distinct random names."""
+        with self._locked(exclusive=False) as local:
+            return local.sample(k)
+
+    def page(self, offset: int, limit: int) -> list[str]:
+        """Return up to ``limit`` names starting at position ``offset``."""
+        with self._locked(exclusive=False) as local:
+            return local.page(offset, limit)
+
+    def take(self, positions: Sequence[int]) -> list[str]:
+        """Return the names at each of ``positions``, in that order."""
+        with self._locked(exclusive=False) as local:
+            return local.take(positions)
+
+    def snapshot(self) -> tuple[str, ...]:
+        """Return the names in insertion order as an immutable tuple."""
+        with self._locked(exclusive=False) as local:
+            return local.snapshot()
+
+    def to_list(self) -> list[str]:
+        """Return the names in insertion order as a new list."""
+        with self._locked(exclusive=False) as local:
+            return local.to_list()
+
+
+def default_shared_path() -> Path:
+    """Return a tmpfs-backed arena path when available."""
+    directory = Path("/dev/shm")
+    if not directory.is_dir():
+        directory = Path(tempfile.gettempdir())
+    return directory / "randomizer-items"
@@ -0,0 +1,79 @@
+"""Shuffle engines for item lists, vectorized with NumPy when it is installed."""
+
+import os
+import random
+from collections.abc import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+class Shuffler:
+    """Shuffles with the standard library's ``random.Random``."""
+
+    name = "stdlib"
+
+    def __init__(self, seed: int | None = None) -> None:
+        self._random = random.Random(seed)
+
+    def shuffled(self, names: Sequence[str], limit: int | None = None) -> list[str]:
+        """Return the first ``limit`` names (default all) of a random order."""
+        if limit is not None and limit < len(names):
+            # sample() draws only as many positions as it returns.
+            return self._random.sample(names, limit)
+        shuffled = list(names)
+        self._random.shuffle(shuffled)
+        return shuffled
+
+
+class NumpyShuffler(Shuffler):
+    """Permutes an index array with a NumPy PCG64 ``Generator``.
+
+    The permutation runs in C instead of one Python-level swap per name, and
+    names are gathered only for the positions being returned: a full shuffle
+    takes them through one object-array take, a partial one draws just
+    ``limit`` distinct indexes.
+    """
+
+    name = "numpy"
+
+    def __init__(self, seed: int | None = None) -> None:
+        if np is None:
+            raise RuntimeError("The numpy shuffle engine requires numpy")
+        self._generator = np.random.Generator(np.random.PCG64(seed))
+        super().__init__(seed)
+
+    def shuffled(self, names: Sequence[str], limit: int | None = None) -> list[str]:
+        count = len(names)
+        if limit is not None and limit < count:
+            indexes = self._generator.choice(count, size=limit, replace=False)
+            return [names[index] for index in indexes.tolist()]
+        gathered = np.empty(count, dtype=object)
+        gathered[:] = names
+        return gathered[self._generator.permutation(count)].tolist()
+
+
+SHUFFLE_ENGINES: dict[str, type[Shuffler]] = {
+    engine.name: engine for engine in (Shuffler, NumpyShuffler)
+}
+
+
+def create_shuffler(name: str | None = None, seed: int | None = None) -> Shuffler:
+    """Build the engine called ``name``, defaulting to ``$RANDOMIZER_SHUFFLE``.
+
+    Without either, NumPy is used when it is installed and the standard
+    library otherwise.
+    """
+    if name is None:
+        name = os.environ.get("RANDOMIZER_SHUFFLE")
+    if name is None:
+        name = Shuffler.name if np is None else NumpyShuffler.name
+    try:
+        engine = SHUFFLE_ENGINES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown shuffle engine {name!r}; expected one of {sorted(SHUFFLE_ENGINES)}"
+        ) from None
+    return engine(seed)
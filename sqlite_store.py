@@ -0,0 +1,331 @@
+"""SQLite-backed storage for list items."""
+
+import json
+import queue
+import random
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    position INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
+
+class SQLiteItemStore:
+    """Item storage in a SQLite database shared between processes.
+
+    Implements the same interface as :class:`store.ItemStore`, so several
+    uvicorn workers on one node can serve a single list. The database runs
+    in WAL mode, so readers don't block the writer. Connections come from
+    a small pool, and each connection's statement cache keeps the
+    parameterized queries prepared. ``position`` is the rowid, which keeps
+    insertion order and gives O(log n) lookups by rowid for random picks;
+    ``name`` carries a unique index for membership checks. Every write
+    transaction also bumps a version counter in the ``meta`` table; as in
+    ``ItemStore``, empty batches and same-name renames skip the transaction
+    and leave the version alone.
+    """
+
+    # Random rowid probes before falling back to an OFFSET scan
+    MAX_PROBES = 32
+    ITER_BATCH_SIZE = 1000
+
+    def __init__(self, path: str | Path, pool_size: int = 4) -> None:
+        self.path = str(path)
+        self._pool: queue.Queue[sqlite3.Connection] = queue.Queue()
+        self._written = threading.local()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=64,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+                ((version,),) = connection.execute(
+                    "UPDATE meta SET value = value + 1 WHERE key = 'version' "
+                    "RETURNING value"
+                ).fetchall()
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            self._written.version = version
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    @property
+    def version(self) -> int:
+        with self._connection() as connection:
+            return connection.execute(
+                "SELECT value FROM meta WHERE key = 'version'"
+            ).fetchone()[0]
+
+    @property
+    def written_version(self) -> int | None:
+        """The version committed by this thread's most recent write.
+
+        Unlike :attr:`version`, other workers' writes can't move it, so it
+        says which version a write produced even after they have.
+        """
+        return getattr(self._written, "version", None)
+
+    def __len__(self) -> int:
+        with self._connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT 1 FROM items WHERE name = ?", (name,)
+            ).fetchone()
+        return row is not None
+
+    def __iter__(self) -> Iterator[str]:
+        # Keyset pagination, so no connection is held between batches.
+        last_position = 0
+        while True:
+            with self._connection() as connection:
+                rows = connection.execute(
+                    "SELECT position, name FROM items WHERE position > ? "
+                    "ORDER BY position LIMIT ?",
+                    (last_position, self.ITER_BATCH_SIZE),
+                ).fetchall()
+            if not rows:
+                return
+            for _, name in rows:
+                yield name
+            last_position = rows[-1][0]
+
+    def __getitem__(self, position: int) -> str:
+        rows = self.page(position, 1) if position >= 0 else []
+        if not rows:
+            raise IndexError("store index out of range")
+        return rows[0]
+
+    def __repr__(self) -> str:
+        return f"SQLiteItemStore({self.path!r})"
+
+    def add(self, name: str) -> None:
+        """Append ``name`` to the end of the list."""
+        self.extend([name])
+
+    def extend(self, names: Iterable[str]) -> None:
+        """Append every name in ``names``, in order, in one transaction."""
+        names = list(names)
+        if not names:
+            return
+        try:
+            with self._transaction() as connection:
+                connection.executemany(
+                    "INSERT INTO items (name) VALUES (?)",
+                    ((name,) for name in names),
+                )
+        except sqlite3.IntegrityError as exc:
+            raise KeyError(str(exc)) from exc
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        """Replace ``old_name`` with ``new_name`` at the same position."""
+        if old_name == new_name:
+            if old_name not in self:
+                raise KeyError(old_name)
+            return
+        try:
+            with self._transaction() as connection:
+                cursor = connection.execute(
+                    "UPDATE items SET name = ? WHERE name = ?", (new_name, old_name)
+                )
+                if not cursor.rowcount:
+                    raise KeyError(old_name)
+        except sqlite3.IntegrityError as exc:
+            raise KeyError(new_name) from exc
+
+    def rename_many(self, renames: Iterable[tuple[str, str]]) -> None:
+        """Apply every ``(old_name, new_name)`` pair in one transaction.
+
+        The old rows are deleted first and the new names reinserted at the
+        same positions, so swaps don't trip the unique index midway.
+        """
+        renames = list(renames)
+        if not renames:
+            return
+        with self._transaction() as connection:
+            moved: list[tuple[int, str]] = []
+            for old_name, new_name in renames:
+                row = connection.execute(
+                    "DELETE FROM items WHERE name = ? RETURNING position", (old_name,)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(old_name)
+                moved.append((row[0], new_name))
+            for position, new_name in moved:
+                try:
+                    connection.execute(
+                        "INSERT INTO items (position, name) VALUES (?, ?)",
+                        (position, new_name),
+                    )
+                except sqlite3.IntegrityError:
+                    raise KeyError(new_name) from None
+
+    def remove(self, name: str) -> None:
+        """Delete ``name`` from the list."""
+        with self._transaction() as connection:
+            cursor = connection.execute("DELETE FROM items WHERE name = ?", (name,))
+            if not cursor.rowcount:
+                raise KeyError(name)
+
+    def remove_many(self, names: Iterable[str]) -> None:
+        """Delete every name in ``names`` in one transaction."""
+        names = list(names)
+        if not names:
+            return
+        with self._transaction() as connection:
+            for name in names:
+                cursor = connection.execute("DELETE FROM items WHERE name = ?", (name,))
+                if not cursor.rowcount:
+                    raise KeyError(name)
+
+    def clear(self) -> None:
+        """Remove every item."""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM items")
+
+    def compact(self) -> None:
+        """Present for interface parity; SQLite reuses freed pages itself."""
+
+    def _position_bounds(self, connection: sqlite3.Connection) -> tuple[int, int]:
+        return connection.execute(
+            "SELECT MIN(position), MAX(position) FROM items"
+        ).fetchone()
+
+    def choice(self) -> str:
+        """Return one uniformly random name."""
+        with self._connection() as connection:
+            low, high = self._position_bounds(connection)
+            if low is None:
+                raise IndexError("Cannot choose from an empty store")
+            # Probe random rowids; each probe is a primary key lookup and
+            # hits are uniform over live rows.
+            for _ in range(self.MAX_PROBES):
+                row = connection.execute(
+                    "SELECT name FROM items WHERE position = ?",
+                    (random.randint(low, high),),
+                ).fetchone()
+                if row is not None:
+                    return row[0]
+            # The rowid range is mostly gaps; pay for one scan instead.
+            count = connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            return connection.execute(
+                "SELECT name FROM items ORDER BY position LIMIT 1 OFFSET ?",
+                (random.randrange(count),),
+            ).fetchone()[0]
+
+    def sample(self, k: int) -> list[str]:
+        """Return ``k`` distinct random names."""
+        count = len(self)
+        if not 0 <= k <= count:
+            raise ValueError("Sample larger than population or is negative")
+        if not k:
+            return []
+        with self._connection() as connection:
+            low, high = self._position_bounds(connection)
+            picked: dict[int, str] = {}
+            # Dense rowids make probing cheap; sparse ones or large samples
+            # fall back to reading the list once.
+            if k * 2 <= count and count * 2 > high - low + 1:
+                while len(picked) < k:
+                    position = random.randint(low, high)
+                    if position in picked:
+                        continue
+                    row = connection.execute(
+                        "SELECT name FROM items WHERE position = ?", (position,)
+                    ).fetchone()
+                    if row is not None:
+                        picked[position] = row[0]
+                return list(picked.values())
+        return random.sample(self.to_list(), k)
+
+    def page(self, offset: int, limit: int) -> list[str]:
+        """Return up to ``limit`` names starting at position ``offset``."""
+        with self._connection() as connection:
+            rows = connection.execute(
+                "SELECT name FROM items ORDER BY position LIMIT ? OFFSET ?",
+                (limit, offset),
+            ).fetchall()
+        return [name for (name,) in rows]
+
+    def take(self, positions: Sequence[int]) -> list[str]:
+        """Return the names at each of ``positions``, in that order.
+
+        Rows up to the furthest position are numbered in one query and only
+        the requested ones are read back, so a scattered set of positions
+        costs a single scan instead of an ``OFFSET`` scan each.
+        """
+        if not positions:
+            return []
+        if min(positions) < 0:
+            raise IndexError("store index out of range")
+        with self._connection() as connection:
+            rows = connection.execute(
+                "SELECT rank, name FROM ("
+                "SELECT ROW_NUMBER() OVER (ORDER BY position) - 1 AS rank, name "
+                "FROM (SELECT position, name FROM items ORDER BY position LIMIT ?)"
+                ") WHERE rank IN (SELECT value FROM json_each(?))",
+                (max(positions) + 1, json.dumps(list(positions))),
+            ).fetchall()
+        names = dict(rows)
+        try:
+            return [names[position] for position in positions]
+        except KeyError:
+            raise IndexError("store index out of range") from None
+
+    def snapshot(self) -> tuple[str, ...]:
+        """Return the names in insertion order as an immutable tuple."""
+        return tuple(self.to_list())
+
+    def to_list(self) -> list[str]:
+        """Return the names in insertion order as a new list."""
+        with self._connection() as connection:
+            rows = connection.execute(
+                "SELECT name FROM items ORDER BY position"
+            ).fetchall()
+        return [name for (name,) in rows]
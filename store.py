@@ -0,0 +1,306 @@
+"""Indexed in-memory storage for list items."""
+
+import os
+import random
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Protocol
+
+
+class ItemStorage(Protocol):
+    """Interface the item endpoints rely on, implemented by every backend."""
+
+    @property
+    def version(self) -> int: ...
+    def __len__(self) -> int: ...
+    def __contains__(self, name: object) -> bool: ...
+    def __iter__(self) -> Iterator[str]: ...
+    def __getitem__(self, position: int) -> str: ...
+    def add(self, name: str) -> None: ...
+    def extend(self, names: Iterable[str]) -> None: ...
+    def rename(self, old_name: str, new_name: str) -> None: ...
+    def rename_many(self, renames: Iterable[tuple[str, str]]) -> None: ...
+    def remove(self, name: str) -> None: ...
+    def remove_many(self, names: Iterable[str]) -> None: ...
+    def clear(self) -> None: ...
+    def choice(self) -> str: ...
+    def sample(self, k: int) -> list[str]: ...
+    def page(self, offset: int, limit: int) -> list[str]: ...
+    def take(self, positions: Sequence[int]) -> list[str]: ...
+    def snapshot(self) -> tuple[str, ...]: ...
+    def to_list(self) -> list[str]: ...
+
+
+class ItemStore:
+    """Insertion-ordered set of item names with O(1) lookups and mutations.
+
+    Names live in a slot list alongside a ``name -> slot`` index. Deleting an
+    item leaves a tombstone (``None``) in its slot instead of shifting the
+    rest of the list; tombstones are compacted away once they make up more
+    than half of the slots, which keeps deletes amortized O(1) while
+    preserving the original insertion order.
+
+    Mutations are serialized by a lock, so the store is safe to share between
+    threads. Whole-list readers get an immutable tuple snapshot that is built
+    at most once per change and reused until the next write, so they never
+    observe a half-applied mutation and never hold the lock while they work.
+    ``version`` goes up by one with every change, so callers can cache
+    anything derived from the list until it moves.
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._lock = threading.RLock()
+        self._slots: list[str | None] = []
+        self._index: dict[str, int] = {}
+        self._tombstones = 0
+        self._snapshot: tuple[str, ...] | None = ()
+        self._version = 0
+        self.extend(names)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.snapshot())
+
+    def __getitem__(self, position: int) -> str:
+        with self._lock:
+            self._compact()
+            return self._slots[position]
+
+    def __repr__(self) -> str:
+        return f"ItemStore({list(self)!r})"
+
+    def snapshot(self) -> tuple[str, ...]:
+        """Return the names in insertion order as an immutable tuple."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    snapshot = tuple(name for name in self._slots if name is not None)
+                    self._snapshot = snapshot
+        return snapshot
+
+    def add(self, name: str) -> None:
+        """Append ``name`` to the end of the list."""
+        with self._lock:
+            if name in self._index:
+                raise KeyError(name)
+            self._index[name] = len(self._slots)
+            self._slots.append(name)
+            self._snapshot = None
+            self._version += 1
+
+    def extend(self, names: Iterable[str]) -> None:
+        """Append every name in ``names``, in order.
+
+        Either every name is added or, if any is already present or repeated,
+        none are.
+        """
+        names = list(names)
+        with self._lock:
+            seen: set[str] = set()
+            for name in names:
+                if name in self._index or name in seen:
+                    raise KeyError(name)
+                seen.add(name)
+            if not names:
+                return
+            start = len(self._slots)
+            self._slots.extend(names)
+            self._index.update(zip(names, range(start, len(self._slots))))
+            self._snapshot = None
+            self._version += 1
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        """Replace ``old_name`` with ``new_name`` at the same position."""
+        with self._lock:
+            if old_name not in self._index:
+                raise KeyError(old_name)
+            if old_name == new_name:
+                return
+            if new_name in self._index:
+                raise KeyError(new_name)
+            slot = self._index.pop(old_name)
+            self._slots[slot] = new_name
+            self._index[new_name] = slot
+            self._snapshot = None
+            self._version += 1
+
+    def rename_many(self, renames: Iterable[tuple[str, str]]) -> None:
+        """Apply every ``(old_name, new_name)`` pair, keeping positions.
+
+        New names are checked against the list as it will be once the whole
+        batch is applied, so swaps and chains are allowed. Either every pair
+        is applied or, if an old name is missing or repeated or a new name
+        would collide, none are.
+        """
+        renames = list(renames)
+        with self._lock:
+            old_names: set[str] = set()
+            for old_name, _ in renames:
+                if old_name not in self._index or old_name in old_names:
+                    raise KeyError(old_name)
+                old_names.add(old_name)
+            new_names: set[str] = set()
+            for _, new_name in renames:
+                if new_name in new_names or (
+                    new_name in self._index and new_name not in old_names
+                ):
+                    raise KeyError(new_name)
+                new_names.add(new_name)
+            if not renames:
+                return
+            slots = [self._index.pop(old_name) for old_name, _ in renames]
+            for slot, (_, new_name) in zip(slots, renames, strict=True):
+                self._slots[slot] = new_name
+                self._index[new_name] = slot
+            self._snapshot = None
+            self._version += 1
+
+    def remove(self, name: str) -> None:
+        """Delete ``name`` from the list."""
+        with self._lock:
+            slot = self._index.pop(name)
+            if slot == len(self._slots) - 1:
+                self._slots.pop()
+            else:
+                self._slots[slot] = None
+                self._tombstones += 1
+            if self._tombstones * 2 > len(self._slots):
+                self._compact()
+            self._snapshot = None
+            self._version += 1
+
+    def remove_many(self, names: Iterable[str]) -> None:
+        """Delete every name in ``names`` with at most one compaction.
+
+        Either every name is removed or, if any is missing or repeated, none
+        are.
+        """
+        names = list(names)
+        with self._lock:
+            seen: set[str] = set()
+            for name in names:
+                if name not in self._index or name in seen:
+                    raise KeyError(name)
+                seen.add(name)
+            if not names:
+                return
+            for name in names:
+                self._slots[self._index.pop(name)] = None
+            self._tombstones += len(names)
+            if self._tombstones * 2 > len(self._slots):
+                self._compact()
+            self._snapshot = None
+            self._version += 1
+
+    def clear(self) -> None:
+        """Remove every item."""
+        with self._lock:
+            # Fresh containers, so threads still reading the old ones are
+            # unaffected.
+            self._slots = []
+            self._index = {}
+            self._tombstones = 0
+            self._snapshot = ()
+            self._version += 1
+
+    def compact(self) -> None:
+        """Drop tombstones and reindex the remaining names."""
+        with self._lock:
+            self._compact()
+
+    def _compact(self) -> None:
+        if not self._tombstones:
+            return
+        self._slots = [name for name in self._slots if name is not None]
+        self._index = {name: slot for slot, name in enumerate(self._slots)}
+        self._tombstones = 0
+
+    def choice(self) -> str:
+        """Return one uniformly random name without copying the list."""
+        with self._lock:
+            if not self._index:
+                raise IndexError("Cannot choose from an empty store")
+            # Tombstones never exceed half the slots, so this needs fewer
+            # than two draws on average.
+            while True:
+                name = self._slots[random.randrange(len(self._slots))]
+                if name is not None:
+                    return name
+
+    def sample(self, k: int) -> list[str]:
+        """Return ``k`` distinct random names without copying the list."""
+        with self._lock:
+            if not 0 <= k <= len(self._index):
+                raise ValueError("Sample larger than population or is negative")
+            if not self._tombstones:
+                return random.sample(self._slots, k)
+            if k * 2 > len(self._index):
+                self._compact()
+                return random.sample(self._slots, k)
+            picked: dict[int, str] = {}
+            while len(picked) < k:
+                slot = random.randrange(len(self._slots))
+                name = self._slots[slot]
+                if name is not None:
+                    picked[slot] = name
+            return list(picked.values())
+
+    def page(self, offset: int, limit: int) -> list[str]:
+        """Return up to ``limit`` names starting at position ``offset``."""
+        with self._lock:
+            self._compact()
+            return self._slots[offset : offset + limit]
+
+    def take(self, positions: Sequence[int]) -> list[str]:
+        """Return the names at each of ``positions``, in that order."""
+        with self._lock:
+            self._compact()
+            slots = self._slots
+            return [slots[position] for position in positions]
+
+    def to_list(self) -> list[str]:
+        """Return the names in insertion order as a new list."""
+        return list(self.snapshot())
+
+
+def create_store() -> ItemStorage:
+    """Build the backend named by ``$RANDOMIZER_STORAGE``.
+
+    ``memory`` (the default) keeps items in this process, ``compact`` does
+    too but packs names into one buffer for very large lists, ``sqlite`` uses
+    the database at ``$RANDOMIZER_SQLITE_PATH``, and ``shared`` uses a
+    memory-mapped arena at ``$RANDOMIZER_SHARED_PATH`` that every worker
+    process on the machine can read and write.
+    """
+    backend = os.environ.get("RANDOMIZER_STORAGE", "memory")
+    if backend == "memory":
+        return ItemStore()
+    if backend == "compact":
+        from compact_store import CompactItemStore
+
+        return CompactItemStore()
+    if backend == "sqlite":
+        from sqlite_store import SQLiteItemStore
+
+        return SQLiteItemStore(os.environ.get("RANDOMIZER_SQLITE_PATH", "items.db"))
+    if backend == "shared":
+        from shared_store import SharedItemStore, default_shared_path
+
+        path = os.environ.get("RANDOMIZER_SHARED_PATH") or default_shared_path()
+        size_mb = int(os.environ.get("RANDOMIZER_SHARED_SIZE_MB", "64"))
+        return SharedItemStore(path, size_mb * 1024 * 1024)
+    raise ValueError(
+        f"Unknown storage backend {backend!r}; "
+        "expected 'memory', 'compact', 'sqlite' or 'shared'"
+    )
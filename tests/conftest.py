@@ -3,17 +3,28 @@
 import pytest
 from fastapi.testclient import TestClient
 
-from main import app, items_db, items_db_set
+import main
+from lists import ListRegistry
+from main import app, items_db
 
 
 @pytest.fixture(autouse=True)
 def clear_items_db():
     """Clear the items database before each test."""
     items_db.clear()
-    items_db_set.clear()
+    main.item_weights.clear()
+    main.change_log.reset(items_db.version)
     yield
     items_db.clear()
-    items_db_set.clear()
+    main.item_weights.clear()
+
+
+@pytest.fixture(autouse=True)
+def list_registry(tmp_path, monkeypatch):
+    """Give each test its own named-list registry in a temporary directory."""
+    registry = ListRegistry(tmp_path / "lists", max_resident=3)
+    monkeypatch.setattr(main, "list_registry", registry)
+    return registry
 
 
 @pytest.fixture
@@ -32,5 +43,4 @@ def sample_items():
 def populated_db(sample_items):
     """Populate the database with sample items."""
     items_db.extend(sample_items)
-    items_db_set.update(sample_items)
     return sample_items
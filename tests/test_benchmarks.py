@@ -0,0 +1,84 @@
+"""Tests for the benchmark load driver and report comparison."""
+
+import asyncio
+import json
+
+import pytest
+
+from benchmarks import compare, load
+from main import items_db
+
+
+class TestLoadDriver:
+    """Tests for benchmarks/load.py."""
+
+    @pytest.mark.parametrize(
+        ("fraction", "expected"), [(0.5, 50), (0.99, 99), (1.0, 100), (0.001, 1)]
+    )
+    def test_percentile(self, fraction, expected):
+        """Test nearest-rank percentiles."""
+        values = list(range(100, 0, -1))
+        assert load.percentile(values, fraction) == expected
+
+    def test_percentile_empty(self):
+        """Test that an empty run reports zero latency."""
+        assert load.percentile([], 0.5) == 0.0
+
+    def test_run_covers_every_scenario(self):
+        """Test a tiny run of every scenario without errors."""
+        results = asyncio.run(load.run((10,), requests=5, concurrency=2))
+        assert [result.scenario for result in results] == [
+            scenario.name for scenario in load.SCENARIOS
+        ]
+        for result in results:
+            assert result.requests == 5
+            assert result.errors == 0
+            assert result.throughput_rps > 0
+            assert 0 < result.p50_ms <= result.p99_ms
+        assert len(items_db) == 0
+
+    def test_cli_writes_json(self, tmp_path):
+        """Test the machine-readable report."""
+        output = tmp_path / "results.json"
+        load.cli(
+            [
+                "--sizes",
+                "10",
+                "--scenario",
+                "/random",
+                "--requests",
+                "3",
+                "--output",
+                str(output),
+            ]
+        )
+        report = json.loads(output.read_text())
+        assert report["environment"]["storage"] == "ItemStore"
+        assert {row["scenario"] for row in report["results"]} == {
+            "GET /random/{max_value}",
+            "GET /random-between",
+        }
+
+
+class TestCompare:
+    """Tests for benchmarks/compare.py."""
+
+    def _write(self, path, throughput, p99):
+        row = {"scenario": "GET /items", "size": 10}
+        row |= {"throughput_rps": throughput, "p99_ms": p99}
+        path.write_text(json.dumps({"results": [row]}))
+        return path
+
+    def test_no_regression(self, tmp_path, capsys):
+        """Test that small changes pass."""
+        baseline = self._write(tmp_path / "a.json", 1000, 2.0)
+        current = self._write(tmp_path / "b.json", 980, 2.1)
+        assert compare.cli([str(baseline), str(current)]) == 0
+        assert "regression" not in capsys.readouterr().out
+
+    @pytest.mark.parametrize(("throughput", "p99"), [(800, 2.0), (1000, 3.0)])
+    def test_regression(self, tmp_path, throughput, p99):
+        """Test that lower throughput or higher p99 fails the comparison."""
+        baseline = self._write(tmp_path / "a.json", 1000, 2.0)
+        current = self._write(tmp_path / "b.json", throughput, p99)
+        assert compare.cli([str(baseline), str(current)]) == 1
@@ -0,0 +1,223 @@
+"""Tests for the compact UTF-8 buffer item store."""
+
+import gc
+import random
+import tracemalloc
+
+import pytest
+
+import compact_store
+import main
+from compact_store import CompactItemStore
+from store import ItemStore, create_store
+
+
+class TestCompactItemStore:
+    """Tests for CompactItemStore behavior."""
+
+    def test_add_and_iterate_in_order(self):
+        """Test insertion order, membership, and non-ASCII names."""
+        store = CompactItemStore(["Apple", "Café", "🍒"])
+        assert list(store) == ["Apple", "Café", "🍒"]
+        assert store.snapshot() == ("Apple", "Café", "🍒")
+        assert len(store) == 3
+        assert "Café" in store
+        assert "Cafe" not in store
+        assert 42 not in store
+
+    def test_add_duplicate_raises(self):
+        """Test that adding an existing name raises KeyError."""
+        store = CompactItemStore(["Apple"])
+        with pytest.raises(KeyError):
+            store.add("Apple")
+
+    def test_extend_is_all_or_nothing(self):
+        """Test that a bulk add with any duplicate adds nothing."""
+        store = CompactItemStore(["Apple"])
+        with pytest.raises(KeyError):
+            store.extend(["Banana", "Apple"])
+        with pytest.raises(KeyError):
+            store.extend(["Banana", "Banana"])
+        assert list(store) == ["Apple"]
+        assert store.version == 1
+
+    def test_rename_preserves_position(self):
+        """Test that renames keep positions and allow swaps."""
+        store = CompactItemStore(["Apple", "Banana", "Cherry"])
+        store.rename("Banana", "Blackcurrant")
+        assert list(store) == ["Apple", "Blackcurrant", "Cherry"]
+        store.rename_many([("Apple", "Cherry"), ("Cherry", "Apple")])
+        assert list(store) == ["Cherry", "Blackcurrant", "Apple"]
+        assert "Banana" not in store
+        with pytest.raises(KeyError):
+            store.rename("Missing", "Other")
+        with pytest.raises(KeyError):
+            store.rename("Apple", "Cherry")
+        version = store.version
+        store.rename("Apple", "Apple")
+        assert store.version == version
+
+    def test_remove_and_compact(self):
+        """Test that deletes leave order intact across compactions."""
+        names = [f"item-{index}" for index in range(100)]
+        store = CompactItemStore(names)
+        store.remove_many(names[:60])
+        assert store._tombstones == 0  # more than half deleted, so compacted
+        store.remove("item-99")
+        assert list(store) == names[60:99]
+        assert store[0] == "item-60"
+        assert store[-1] == "item-98"
+        assert store.page(1, 2) == ["item-61", "item-62"]
+        assert store.take([38, 0, 1]) == ["item-98", "item-60", "item-61"]
+        with pytest.raises(KeyError):
+            store.remove_many(["item-60", "item-60"])
+        assert len(store) == 39
+
+    def test_renames_reclaim_space(self):
+        """Test that orphaned bytes from renames are compacted away."""
+        store = CompactItemStore(["a" * 50])
+        for index in range(10):
+            store.rename(store[0], f"{index}" * 50)
+        assert len(store._data) <= 100
+        assert list(store) == ["9" * 50]
+
+    def test_clear(self):
+        """Test that clear empties the store and bumps the version."""
+        store = CompactItemStore(["Apple", "Banana"])
+        store.clear()
+        assert list(store) == []
+        assert len(store) == 0
+        assert store.version == 2
+        store.add("Apple")
+        assert list(store) == ["Apple"]
+
+    def test_choice_and_sample(self):
+        """Test random picks skip deleted slots and are distinct."""
+        names = [f"item-{index}" for index in range(20)]
+        store = CompactItemStore(names)
+        store.remove_many(names[:8])
+        assert store._tombstones == 8
+        for _ in range(50):
+            assert store.choice() in names[8:]
+        sample = store.sample(5)
+        assert len(set(sample)) == 5
+        assert set(sample) <= set(names[8:])
+        assert sorted(store.sample(12)) == sorted(names[8:])
+        with pytest.raises(ValueError):
+            store.sample(13)
+        with pytest.raises(IndexError):
+            CompactItemStore().choice()
+
+    def test_iteration_across_chunks_and_compaction(self, monkeypatch):
+        """Test that iteration survives a compaction part-way through."""
+        monkeypatch.setattr(compact_store, "ITER_CHUNK", 3)
+        names = [f"item-{index}" for index in range(10)]
+        store = CompactItemStore(names)
+        iterator = iter(store)
+        seen = [next(iterator) for _ in range(4)]
+        store.remove_many(names[6:])
+        store.compact()
+        seen.extend(iterator)
+        assert seen[:4] == names[:4]
+        assert seen == names[:6] or seen == names
+
+    def test_matches_item_store(self):
+        """Test random operation sequences against ItemStore."""
+        rng = random.Random(7)
+        for _ in range(20):
+            plain, compact = ItemStore(), CompactItemStore()
+            for _ in range(100):
+                names = list(plain)
+                op = rng.randrange(5)
+                if op == 0:
+                    batch = [f"n{rng.randrange(40)}" for _ in range(rng.randrange(4))]
+                    call = ("extend", batch)
+                elif op == 1 and names:
+                    pairs = [
+                        (rng.choice(names), f"n{rng.randrange(40)}")
+                        for _ in range(rng.randrange(1, 3))
+                    ]
+                    call = ("rename_many", pairs)
+                elif op == 2 and names:
+                    call = ("remove_many", rng.sample(names, min(len(names), 2)))
+                elif op == 3 and names:
+                    call = ("remove", rng.choice([*names, "missing"]))
+                else:
+                    call = ("add", f"n{rng.randrange(40)}")
+                outcomes = []
+                for store in (plain, compact):
+                    try:
+                        getattr(store, call[0])(call[1])
+                        outcomes.append(None)
+                    except KeyError:
+                        outcomes.append(KeyError)
+                assert outcomes[0] == outcomes[1], call
+                assert list(plain) == list(compact)
+
+    def test_uses_a_fraction_of_the_memory(self):
+        """Test that the compact store holds far less than ItemStore."""
+
+        def held(store_class):
+            tracemalloc.start()
+            store = store_class(f"item-{index}" for index in range(50_000))
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert len(store) == 50_000
+            return current
+
+        assert held(CompactItemStore) * 3 < held(ItemStore)
+
+
+class TestCompactEndpoints:
+    """Tests that the item endpoints work against compact storage."""
+
+    def test_from_environment(self, monkeypatch):
+        """Test selecting the compact store through RANDOMIZER_STORAGE."""
+        monkeypatch.setenv("RANDOMIZER_STORAGE", "compact")
+        assert isinstance(create_store(), CompactItemStore)
+
+    def test_crud_workflow(self, client, monkeypatch):
+        """Test create, bulk add, update, pick, and delete on compact storage."""
+        store = CompactItemStore()
+        monkeypatch.setattr(main, "items_db", store)
+
+        assert client.post("/items", json={"name": "Apple"}).status_code == 200
+        data = client.post(
+            "/items/bulk", json={"names": ["Banana", "Apple", "Cherry"]}
+        ).json()
+        assert data["added_items"] == ["Banana", "Cherry"]
+        assert data["skipped_duplicates"] == ["Apple"]
+
+        assert (
+            client.put("/items/Banana", json={"name": "Blueberry"}).status_code == 200
+        )
+        assert client.delete("/items/Apple").status_code == 200
+
+        data = client.get("/items").json()
+        assert data["original_order"] == ["Blueberry", "Cherry"]
+        assert client.get("/items/random").json()["item"] in {"Blueberry", "Cherry"}
+        assert client.get("/items/page?limit=1&cursor=1").json()["items"] == ["Cherry"]
+        assert (
+            client.get("/items/export?format=csv").text == "name\nBlueberry\nCherry\n"
+        )
+
+        assert client.delete("/items").json()["deleted_count"] == 2
+        assert len(store) == 0
+
+    def test_reads_keep_no_copy_of_the_names(self, client, monkeypatch):
+        """Test that GET /items and weighted picks don't retain decoded names."""
+        store = CompactItemStore(f"item-{index}" for index in range(50_000))
+        monkeypatch.setattr(main, "items_db", store)
+        monkeypatch.setattr(main, "items_cache", None)
+
+        gc.collect()
+        tracemalloc.start()
+        assert client.get("/items").json()["count"] == 50_000
+        assert client.get("/items/weighted-pick?k=5").status_code == 200
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert main.items_cache.names is None
+        # The cached JSON body and the alias table, not a str per name
+        assert retained / len(store) < 40
@@ -0,0 +1,165 @@
+"""Stress tests for concurrent access to the item store."""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from store import ItemStore
+
+THREADS = 8
+OPERATIONS = 2000
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    """Switch threads far more often than usual to provoke interleavings."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _assert_consistent(store):
+    """Check that the slot list and the name index agree."""
+    live = [name for name in store._slots if name is not None]
+    assert len(live) == len(set(live)) == len(store)
+    assert all(store._slots[slot] == name for name, slot in store._index.items())
+    assert list(store) == live
+
+
+@pytest.mark.slow
+class TestConcurrentWrites:
+    """Tests that hammer ItemStore from many threads at once."""
+
+    def test_concurrent_adds_and_removes(self):
+        """Test that interleaved adds and removes leave a consistent store."""
+        store = ItemStore()
+
+        def worker(worker_id):
+            for i in range(OPERATIONS):
+                name = f"{worker_id}-{i}"
+                store.add(name)
+                if i % 3:
+                    store.remove(name)
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            list(pool.map(worker, range(THREADS)))
+
+        _assert_consistent(store)
+        expected = {f"{w}-{i}" for w in range(THREADS) for i in range(0, OPERATIONS, 3)}
+        assert set(store) == expected
+
+    def test_racing_adds_of_same_name(self):
+        """Test that exactly one thread wins each contested name."""
+        store = ItemStore()
+        wins = []
+        wins_lock = threading.Lock()
+
+        def worker(_):
+            for i in range(OPERATIONS):
+                try:
+                    store.add(f"Item{i}")
+                except KeyError:
+                    continue
+                with wins_lock:
+                    wins.append(i)
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            list(pool.map(worker, range(THREADS)))
+
+        assert sorted(wins) == list(range(OPERATIONS))
+        _assert_consistent(store)
+
+    def test_bulk_adds_are_all_or_nothing(self):
+        """Test that overlapping bulk adds never apply partially."""
+        store = ItemStore()
+        batches = [
+            [f"Item{i}" for i in range(start, start + 50)]
+            for start in range(0, 2000, 25)
+        ]
+        applied = []
+        applied_lock = threading.Lock()
+
+        def worker(batch):
+            try:
+                store.extend(batch)
+            except KeyError:
+                return
+            with applied_lock:
+                applied.append(batch)
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            list(pool.map(worker, batches))
+
+        _assert_consistent(store)
+        assert len(store) == sum(len(batch) for batch in applied)
+        for batch in applied:
+            assert all(name in store for name in batch)
+
+    def test_renames_and_removes(self):
+        """Test concurrent renames against concurrent removals."""
+        names = [f"Item{i}" for i in range(OPERATIONS)]
+        store = ItemStore(names)
+
+        def renamer(_):
+            for name in names:
+                try:
+                    store.rename(name, f"{name}-renamed")
+                except KeyError:
+                    pass
+
+        def remover(_):
+            for name in names[::2]:
+                for candidate in (name, f"{name}-renamed"):
+                    try:
+                        store.remove(candidate)
+                        break
+                    except KeyError:
+                        pass
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            futures = [pool.submit(renamer, i) for i in range(THREADS // 2)]
+            futures += [pool.submit(remover, i) for i in range(THREADS // 2)]
+            for future in futures:
+                future.result()
+
+        _assert_consistent(store)
+        assert len(store) == OPERATIONS // 2
+
+    def test_snapshots_are_never_torn(self):
+        """Test that readers always see a complete, duplicate-free list."""
+        store = ItemStore(f"Base{i}" for i in range(100))
+        stop = threading.Event()
+        failures = []
+
+        def writer(writer_id):
+            i = 0
+            while not stop.is_set():
+                new, pair = f"New{writer_id}-{i}", f"Pair{writer_id}-{i}"
+                store.extend([new, pair])
+                store.remove(new)
+                store.rename(pair, f"Renamed{writer_id}-{i}")
+                store.remove(f"Renamed{writer_id}-{i}")
+                i += 1
+
+        def reader():
+            for _ in range(OPERATIONS):
+                snapshot = store.snapshot()
+                if len(snapshot) != len(set(snapshot)) or None in snapshot:
+                    failures.append(snapshot)
+                if snapshot[:100] != tuple(f"Base{i}" for i in range(100)):
+                    failures.append(snapshot)
+
+        writers = [threading.Thread(target=writer, args=(i,)) for i in range(2)]
+        for thread in writers:
+            thread.start()
+        with ThreadPoolExecutor(THREADS) as pool:
+            list(pool.map(lambda _: reader(), range(THREADS)))
+        stop.set()
+        for thread in writers:
+            thread.join()
+
+        assert not failures
+        _assert_consistent(store)
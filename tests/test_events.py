@@ -0,0 +1,460 @@
+"""Tests for the live item change feed and the change log."""
+
+import asyncio
+import json
+import signal
+
+import pytest
+
+import main
+from events import (
+    ChangeBroadcaster,
+    ChangeLog,
+    Subscription,
+    change_event,
+    format_sse,
+)
+
+
+def parse_sse(message: str) -> tuple[str, dict]:
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+def drain(subscription: Subscription) -> list[dict]:
+    async def collect():
+        events = []
+        while (event := await subscription.get(0)) is not None:
+            events.append(event)
+        return events
+
+    return asyncio.run(collect())
+
+
+@pytest.fixture
+def subscription():
+    """Subscribe to the main list's change feed for one test."""
+    subscription = main.item_events.subscribe()
+    yield subscription
+    main.item_events.unsubscribe(subscription)
+
+
+class TestChangeEvents:
+    """Tests for turning journal records into change events."""
+
+    @pytest.mark.parametrize(
+        ("op", "fields", "expected"),
+        [
+            ("add", {"names": ["A"]}, {"type": "added", "names": ["A"]}),
+            ("remove", {"names": ["A"]}, {"type": "deleted", "names": ["A"]}),
+            (
+                "rename",
+                {"old": "A", "new": "B"},
+                {"type": "updated", "renames": [{"old_name": "A", "new_name": "B"}]},
+            ),
+            (
+                "rename_many",
+                {"pairs": [("A", "B"), ("B", "A")]},
+                {
+                    "type": "updated",
+                    "renames": [
+                        {"old_name": "A", "new_name": "B"},
+                        {"old_name": "B", "new_name": "A"},
+                    ],
+                },
+            ),
+            ("clear", {}, {"type": "cleared"}),
+        ],
+    )
+    def test_change_event(self, op, fields, expected):
+        """Test the event produced for each journal operation."""
+        assert change_event(op, 7, **fields) == {**expected, "version": 7}
+
+    def test_format_sse(self):
+        """Test the Server-Sent Events wire format."""
+        assert format_sse("added", {"names": ["A"]}, 3) == (
+            'event: added\nid: 3\ndata: {"names":["A"]}\n\n'
+        )
+
+
+class TestChangeBroadcaster:
+    """Tests for bounded fan-out to subscribers."""
+
+    def test_publish(self):
+        """Test that every subscriber receives each event in order."""
+        broadcaster = ChangeBroadcaster()
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        broadcaster.publish({"version": 1})
+        broadcaster.publish({"version": 2})
+        assert drain(first) == drain(second) == [{"version": 1}, {"version": 2}]
+
+    def test_slow_subscriber_overflows(self):
+        """Test that a subscriber past its limit is dropped, not waited for."""
+        broadcaster = ChangeBroadcaster(queue_limit=2)
+        slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+        for version in range(2):
+            broadcaster.publish({"version": version})
+        drain(fast)
+        broadcaster.publish({"version": 2})
+
+        assert slow.overflowed
+        assert drain(slow) == []
+        assert drain(fast) == [{"version": 2}]
+        assert len(broadcaster) == 1
+        assert broadcaster.overflows == 1
+
+    def test_get_timeout(self):
+        """Test that waiting without events times out with None."""
+        subscription = ChangeBroadcaster().subscribe()
+        assert asyncio.run(subscription.get(0.01)) is None
+        assert not subscription.overflowed
+
+    def test_close(self):
+        """Test that closing wakes subscribers and removes them."""
+        broadcaster = ChangeBroadcaster()
+        subscription = broadcaster.subscribe()
+        broadcaster.close()
+        assert asyncio.run(subscription.get(1)) is None
+        assert subscription.closed
+        assert len(broadcaster) == 0
+
+
+class TestItemEventsEndpoint:
+    """Tests for GET /items/events and the mutation paths that feed it."""
+
+    def test_mutations_publish(self, client, subscription):
+        """Test that each kind of change reaches subscribers with its version."""
+        client.post("/items/bulk", json={"names": ["Apple", "Banana", "Cherry"]})
+        client.put("/items/Apple", json={"name": "Apricot"})
+        client.post(
+            "/items/bulk-rename",
+            json={"renames": [{"old_name": "Banana", "new_name": "Blueberry"}]},
+        )
+        client.delete("/items/Cherry")
+        client.post("/items/bulk-delete", json={"names": ["Blueberry"]})
+        client.delete("/items")
+
+        events = drain(subscription)
+        assert [event["type"] for event in events] == [
+            "added",
+            "updated",
+            "updated",
+            "deleted",
+            "deleted",
+            "cleared",
+        ]
+        assert events[0]["names"] == ["Apple", "Banana", "Cherry"]
+        assert events[1]["renames"] == [{"old_name": "Apple", "new_name": "Apricot"}]
+        versions = [event["version"] for event in events]
+        assert versions == sorted(versions)
+        assert len(set(versions)) == len(versions)
+        assert versions[-1] == main.items_db.version
+
+    def test_failed_mutation_publishes_nothing(self, client, subscription):
+        """Test that rejected changes are not broadcast."""
+        client.delete("/items/missing")
+        client.put("/items/missing", json={"name": "Other"})
+        assert drain(subscription) == []
+
+    def test_stream(self, sample_items):
+        """Test the snapshot followed by live events on the stream."""
+        main.items_db.extend(sample_items)
+
+        async def scenario():
+            stream = main._item_events()
+            snapshot = await anext(stream)
+            await main.add_item(main.Item(name="Fig"))
+            await main.delete_item("Apple")
+            added, deleted = await anext(stream), await anext(stream)
+            await stream.aclose()
+            return snapshot, added, deleted
+
+        snapshot, added, deleted = asyncio.run(scenario())
+        assert parse_sse(snapshot) == (
+            "snapshot",
+            {
+                "version": main.items_db.version - 2,
+                "items": sample_items,
+                "count": len(sample_items),
+            },
+        )
+        assert parse_sse(added)[1]["names"] == ["Fig"]
+        assert parse_sse(deleted) == (
+            "deleted",
+            {"type": "deleted", "version": main.items_db.version, "names": ["Apple"]},
+        )
+        assert len(main.item_events) == 0
+
+    def test_stream_resync(self, monkeypatch):
+        """Test that an overflowed subscriber is told to resync and the stream ends."""
+        monkeypatch.setattr(main.item_events, "queue_limit", 1)
+
+        async def scenario():
+            stream = main._item_events()
+            await anext(stream)
+            await main.add_item(main.Item(name="A"))
+            await main.add_item(main.Item(name="B"))
+            messages = [message async for message in stream]
+            return messages
+
+        messages = asyncio.run(scenario())
+        assert [parse_sse(message)[0] for message in messages] == ["resync"]
+
+    def test_stream_snapshot_version_matches_names(self, monkeypatch):
+        """Test that a write landing mid-snapshot is in the snapshot's version."""
+        store = main.items_db
+        snapshot = store.snapshot
+        writes = iter(["Elsewhere"])
+
+        def racing_snapshot():
+            names = snapshot()
+            # Another worker writes right after the names were read.
+            for name in writes:
+                store.add(name)
+            return names
+
+        monkeypatch.setattr(store, "snapshot", racing_snapshot)
+
+        async def scenario():
+            stream = main._item_events()
+            message = await anext(stream)
+            await stream.aclose()
+            return message
+
+        event, data = parse_sse(asyncio.run(scenario()))
+        assert event == "snapshot"
+        assert data["items"] == ["Elsewhere"]
+        assert data["version"] == store.version
+
+    def test_stream_resyncs_when_writes_never_settle(self, monkeypatch):
+        """Test that the stream ends with a resync if every snapshot races a write."""
+        store = main.items_db
+        snapshot = store.snapshot
+        names = (f"Item{index}" for index in range(100))
+
+        def racing_snapshot():
+            store.add(next(names))
+            return snapshot()
+
+        monkeypatch.setattr(store, "snapshot", racing_snapshot)
+
+        async def scenario():
+            return [message async for message in main._item_events()]
+
+        messages = asyncio.run(scenario())
+        assert [parse_sse(message)[0] for message in messages] == ["resync"]
+        assert len(main.item_events) == 0
+
+    def test_stream_keepalive(self, monkeypatch):
+        """Test that an idle stream sends comment lines."""
+        monkeypatch.setattr(main, "EVENT_KEEPALIVE_SECONDS", 0.01)
+
+        async def scenario():
+            stream = main._item_events()
+            await anext(stream)
+            keepalive = await anext(stream)
+            await stream.aclose()
+            return keepalive
+
+        assert asyncio.run(scenario()) == ": keepalive\n\n"
+
+    def test_streams_end_when_shutdown_starts(self):
+        """Test that an exit signal ends open streams before lifespan shutdown."""
+        originals = {
+            signum: signal.getsignal(signum)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        received = []
+        signal.signal(signal.SIGTERM, lambda signum, frame: received.append(signum))
+
+        async def scenario():
+            stream = main._item_events()
+            await anext(stream)
+            main._end_streams_on_exit()
+            signal.raise_signal(signal.SIGTERM)
+            return [message async for message in stream]
+
+        try:
+            messages = asyncio.run(asyncio.wait_for(scenario(), 5))
+        finally:
+            for signum, handler in originals.items():
+                signal.signal(signum, handler)
+        assert messages == []
+        assert received == [signal.SIGTERM]
+        assert len(main.item_events) == 0
+
+    def test_response_headers(self):
+        """Test the event stream media type and caching headers."""
+        response = asyncio.run(main.stream_item_events())
+        assert response.media_type == "text/event-stream"
+        assert response.headers["cache-control"] == "no-cache"
+
+
+class TestChangeLog:
+    """Tests for the bounded log of recent changes."""
+
+    def test_since(self):
+        """Test that only events after the given version are returned."""
+        log = ChangeLog()
+        log.reset(10)
+        for version in (11, 13, 14):
+            log.append({"version": version})
+        assert log.since(10) == [{"version": 11}, {"version": 13}, {"version": 14}]
+        assert log.since(12) == [{"version": 13}, {"version": 14}]
+        assert log.since(14) == []
+
+    def test_aged_out(self):
+        """Test that versions before the oldest retained event need a resync."""
+        log = ChangeLog(limit=2)
+        log.reset(0)
+        for version in (1, 2, 3):
+            log.append({"version": version})
+        assert len(log) == 2
+        assert log.base == 1
+        assert log.since(0) is None
+        assert log.since(1) == [{"version": 2}, {"version": 3}]
+
+    def test_unknown_future_version(self):
+        """Test that versions the log has never reached need a resync."""
+        log = ChangeLog()
+        log.reset(5)
+        assert log.since(6) is None
+        assert log.since(4) is None
+
+
+class TestItemChangesEndpoint:
+    """Tests for GET /items/changes."""
+
+    def test_changes_since(self, client):
+        """Test catching up on a few changes from a known version."""
+        response = client.post("/items/bulk", json={"names": ["Apple", "Banana"]})
+        version = int(client.get("/items/list").headers["x-items-version"])
+        client.put("/items/Apple", json={"name": "Apricot"})
+        client.delete("/items/Banana")
+
+        data = client.get(f"/items/changes?since={version}").json()
+        assert response.status_code == 200
+        assert data == {
+            "since": version,
+            "version": main.items_db.version,
+            "resync": False,
+            "changes": [
+                {
+                    "type": "updated",
+                    "version": data["changes"][0]["version"],
+                    "renames": [{"old_name": "Apple", "new_name": "Apricot"}],
+                },
+                {
+                    "type": "deleted",
+                    "version": main.items_db.version,
+                    "names": ["Banana"],
+                },
+            ],
+        }
+
+    def test_up_to_date(self, client):
+        """Test that a current client gets no changes."""
+        client.post("/items", json={"name": "Apple"})
+        version = main.items_db.version
+        data = client.get(f"/items/changes?since={version}").json()
+        assert data == {
+            "since": version,
+            "version": version,
+            "resync": False,
+            "changes": [],
+        }
+
+    def test_every_mutation_is_logged(self, client):
+        """Test that each mutating endpoint adds one change with a higher version."""
+        start = main.items_db.version
+        client.post("/items", json={"name": "Apple"})
+        client.post("/items/bulk", json={"names": ["Banana", "Cherry"]})
+        client.put("/items/Apple", json={"name": "Apricot"})
+        client.delete("/items/Banana")
+        client.delete("/items")
+        changes = client.get(f"/items/changes?since={start}").json()["changes"]
+        assert [change["type"] for change in changes] == [
+            "added",
+            "added",
+            "updated",
+            "deleted",
+            "cleared",
+        ]
+        versions = [change["version"] for change in changes]
+        assert versions == sorted(set(versions))
+        assert versions[0] > start
+
+    def test_resync_when_aged_out(self, client, monkeypatch):
+        """Test that a version older than the log asks for a resync."""
+        monkeypatch.setattr(main, "change_log", ChangeLog(limit=2))
+        main.change_log.reset(main.items_db.version)
+        start = main.items_db.version
+        for name in ("A", "B", "C"):
+            client.post("/items", json={"name": name})
+        data = client.get(f"/items/changes?since={start}").json()
+        assert data == {
+            "since": start,
+            "version": main.items_db.version,
+            "resync": True,
+            "changes": [],
+        }
+
+    def test_resync_on_unlogged_change(self, client):
+        """Test that changes the log never saw, e.g. from another worker, force a resync."""
+        version = main.items_db.version
+        main.items_db.add("Elsewhere")
+        data = client.get(f"/items/changes?since={version}").json()
+        assert data["resync"] is True
+
+    def test_list_version_header(self, client):
+        """Test that /items/list reports its version, including on a 304."""
+        client.post("/items", json={"name": "Apple"})
+        response = client.get("/items/list")
+        assert response.headers["x-items-version"] == str(main.items_db.version)
+        revalidated = client.get(
+            "/items/list", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
+        assert revalidated.headers["x-items-version"] == str(main.items_db.version)
+
+    def test_list_version_matches_body_under_concurrent_writes(
+        self, client, monkeypatch
+    ):
+        """Test that a write landing mid-snapshot is reflected in the version header."""
+        store = main.items_db
+        snapshot = store.snapshot
+        writes = iter(["Elsewhere"])
+
+        def racing_snapshot():
+            names = snapshot()
+            # Another worker writes right after the names were read.
+            for name in writes:
+                store.add(name)
+            return names
+
+        monkeypatch.setattr(store, "snapshot", racing_snapshot)
+        response = client.get("/items/list")
+        assert response.json()["items"] == ["Elsewhere"]
+        assert response.headers["x-items-version"] == str(store.version)
+
+    def test_list_version_omitted_when_writes_never_settle(self, client, monkeypatch):
+        """Test that no version is claimed, or cached, if every snapshot races a write."""
+        store = main.items_db
+        snapshot = store.snapshot
+        names = (f"Item{index}" for index in range(100))
+
+        def racing_snapshot():
+            store.add(next(names))
+            return snapshot()
+
+        monkeypatch.setattr(store, "snapshot", racing_snapshot)
+        monkeypatch.setattr(main, "items_cache", None)
+        response = client.get("/items/list")
+        assert response.status_code == 200
+        assert "x-items-version" not in response.headers
+        assert main.items_cache is None
+
+    def test_since_required(self, client):
+        """Test that since is required and non-negative."""
+        assert client.get("/items/changes").status_code == 422
+        assert client.get("/items/changes?since=-1").status_code == 422
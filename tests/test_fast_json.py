@@ -0,0 +1,93 @@
+"""Tests for the fast JSON response mode."""
+
+import pytest
+
+import fast_json
+import main
+from fast_json import FastJSONResponse, dumps, fast_json_enabled
+from main import app
+
+READ_ENDPOINTS = [
+    "/items/list",
+    "/items/page?limit=3",
+    "/items/sample?k=5",
+    "/items/random",
+    "/items/weighted-pick?k=3",
+]
+
+
+class TestFastJSONHelpers:
+    """Tests for fast_json serialization helpers."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_dumps(self, monkeypatch, use_orjson):
+        """Test compact UTF-8 output with and without orjson."""
+        if not use_orjson:
+            monkeypatch.setattr(fast_json, "orjson", None)
+        elif fast_json.orjson is None:
+            pytest.skip("orjson is not installed")
+        content = {"items": ("Café", 'Say "hi"'), "count": 2}
+        assert dumps(content) == '{"items":["Café","Say \\"hi\\""],"count":2}'.encode()
+
+    def test_response_class(self):
+        """Test that FastJSONResponse renders bytes as application/json."""
+        response = FastJSONResponse({"item": "Apple"})
+        assert response.body == b'{"item":"Apple"}'
+        assert response.media_type == "application/json"
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(None, False), ("0", False), ("false", False), ("1", True), ("yes", True)],
+    )
+    def test_enabled_from_environment(self, monkeypatch, value, expected):
+        """Test reading $RANDOMIZER_FAST_JSON."""
+        if value is None:
+            monkeypatch.delenv("RANDOMIZER_FAST_JSON", raising=False)
+        else:
+            monkeypatch.setenv("RANDOMIZER_FAST_JSON", value)
+        assert fast_json_enabled() is expected
+
+
+class TestFastJSONEndpoints:
+    """Tests that the fast path changes nothing clients can observe."""
+
+    def test_openapi_schema_is_identical(self, monkeypatch):
+        """Test that the OpenAPI schema doesn't depend on the mode."""
+        monkeypatch.setattr(app, "openapi_schema", None)
+        monkeypatch.setattr(main, "FAST_JSON", False)
+        default_schema = app.openapi()
+        monkeypatch.setattr(app, "openapi_schema", None)
+        monkeypatch.setattr(main, "FAST_JSON", True)
+        assert app.openapi() == default_schema
+
+    @pytest.mark.parametrize("path", READ_ENDPOINTS)
+    def test_responses_match(self, client, populated_db, monkeypatch, path):
+        """Test that both modes return the same JSON shape."""
+        monkeypatch.setattr(main, "FAST_JSON", False)
+        main.items_cache = None
+        default = client.get(path)
+        monkeypatch.setattr(main, "FAST_JSON", True)
+        main.items_cache = None
+        fast = client.get(path)
+
+        assert fast.status_code == default.status_code == 200
+        assert fast.headers["content-type"] == "application/json"
+        assert fast.json().keys() == default.json().keys()
+        assert fast.json()["count"] == default.json()["count"]
+
+    def test_ordered_responses_are_identical(self, client, populated_db, monkeypatch):
+        """Test byte-identical bodies where the output isn't random."""
+        bodies = []
+        for enabled in (False, True):
+            monkeypatch.setattr(main, "FAST_JSON", enabled)
+            main.items_cache = None
+            bodies.append(client.get("/items/list").content)
+        assert bodies[0] == bodies[1]
+
+    def test_get_items_keeps_etag(self, client, populated_db, monkeypatch):
+        """Test that GET /items sends its cache headers in fast mode."""
+        monkeypatch.setattr(main, "FAST_JSON", True)
+        response = client.get("/items")
+        assert response.json()["original_order"] == populated_db
+        assert response.headers["etag"].startswith("W/")
+        assert response.headers["cache-control"] == "no-cache"
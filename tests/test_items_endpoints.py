@@ -1,5 +1,12 @@
 """Tests for item management endpoints."""
 
+import json
+
+import pytest
+
+import main
+from store import ItemStore
+
 
 class TestAddItem:
     """Tests for POST /items endpoint."""
@@ -119,6 +126,340 @@ class TestGetItems:
             assert data["original_order"] == sample_items
 
 
+class TestItemsCaching:
+    """Tests for ETag revalidation of GET /items and GET /items/list."""
+
+    def test_items_list(self, client, populated_db):
+        """Test that /items/list returns the original order with an ETag."""
+        response = client.get("/items/list")
+        assert response.status_code == 200
+        assert response.json() == {"items": populated_db, "count": len(populated_db)}
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_not_modified_until_a_mutation(self, client, populated_db):
+        """Test 304 responses for an unchanged list and 200 after a change."""
+        etag = client.get("/items/list").headers["etag"]
+        response = client.get("/items/list", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        client.post("/items", json={"name": "Fig"})
+        response = client.get("/items/list", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["items"][-1] == "Fig"
+
+    def test_body_is_cached_per_version(self, client, populated_db):
+        """Test that repeat reads reuse one serialized body."""
+        client.get("/items/list")
+        cached = main.items_cache
+        client.get("/items/list")
+        assert main.items_cache is cached
+
+        client.delete("/items/Apple")
+        client.get("/items/list")
+        assert main.items_cache is not cached
+
+    def test_get_items_weak_etag(self, client, populated_db):
+        """Test that GET /items revalidates with a weak ETag."""
+        response = client.get("/items")
+        etag = response.headers["etag"]
+        assert etag.startswith("W/")
+        assert etag.removeprefix("W/") == client.get("/items/list").headers["etag"]
+
+        response = client.get("/items", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        client.put("/items/Apple", json={"name": "Avocado"})
+        response = client.get("/items", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize("header", ['"other", {etag}', "W/{etag}", "*"])
+    def test_if_none_match_forms(self, client, populated_db, header):
+        """Test lists of tags, weak tags, and the wildcard."""
+        etag = client.get("/items/list").headers["etag"]
+        response = client.get(
+            "/items/list", headers={"If-None-Match": header.format(etag=etag)}
+        )
+        assert response.status_code == 304
+
+    def test_stale_etag_after_store_swap(self, client, monkeypatch, populated_db):
+        """Test that the cache is keyed on the store as well as its version."""
+        client.get("/items/list")
+        monkeypatch.setattr(main, "items_db", ItemStore(["Other"]))
+        assert client.get("/items/list").json()["items"] == ["Other"]
+
+
+class TestGetItemsPage:
+    """Tests for GET /items/page endpoint."""
+
+    def test_page_empty(self, client):
+        """Test paging when the list is empty."""
+        response = client.get("/items/page")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"] == []
+        assert data["count"] == 0
+        assert data["next_cursor"] is None
+
+    def test_page_walks_whole_list(self, client, populated_db):
+        """Test that following next_cursor returns every item in order."""
+        collected = []
+        cursor = 0
+        while cursor is not None:
+            response = client.get(f"/items/page?limit=2&cursor={cursor}")
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data["items"]) <= 2
+            assert data["count"] == len(populated_db)
+            collected.extend(data["items"])
+            cursor = data["next_cursor"]
+        assert collected == populated_db
+
+    def test_page_after_deletes(self, client, populated_db):
+        """Test that pages skip deleted items."""
+        client.delete(f"/items/{populated_db[1]}")
+        client.delete(f"/items/{populated_db[3]}")
+        response = client.get("/items/page?limit=10")
+        data = response.json()
+        assert data["items"] == [populated_db[0], populated_db[2], populated_db[4]]
+        assert data["next_cursor"] is None
+
+    def test_page_cursor_past_end(self, client, populated_db):
+        """Test that a cursor past the end returns an empty page."""
+        response = client.get("/items/page?cursor=100")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"] == []
+        assert data["next_cursor"] is None
+
+    def test_page_invalid_params(self, client):
+        """Test validation of limit and cursor."""
+        assert client.get("/items/page?limit=0").status_code == 422
+        assert client.get("/items/page?limit=1001").status_code == 422
+        assert client.get("/items/page?cursor=-1").status_code == 422
+
+
+class TestStreamItems:
+    """Tests for GET /items/stream endpoint."""
+
+    def test_stream_empty(self, client):
+        """Test streaming when the list is empty."""
+        response = client.get("/items/stream")
+        assert response.status_code == 200
+        assert "application/x-ndjson" in response.headers["content-type"]
+        assert response.text == ""
+
+    def test_stream_items_in_order(self, client, populated_db):
+        """Test that every item is streamed as one JSON line, in order."""
+        response = client.get("/items/stream")
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["item"] for line in lines] == populated_db
+
+    def test_stream_spans_multiple_chunks(self, client, monkeypatch):
+        """Test streaming a list larger than one chunk."""
+        monkeypatch.setattr(main, "STREAM_CHUNK_SIZE", 3)
+        names = [f"Item{i}" for i in range(10)]
+        client.post("/items/bulk", json={"names": names})
+
+        response = client.get("/items/stream")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["item"] for line in lines] == names
+
+
+class TestShuffleSessions:
+    """Tests for /items/shuffles endpoints."""
+
+    def _read_all(self, client, session_id, limit=2):
+        collected = []
+        offset = 0
+        while offset is not None:
+            response = client.get(
+                f"/items/shuffles/{session_id}?offset={offset}&limit={limit}"
+            )
+            assert response.status_code == 200
+            data = response.json()
+            collected.extend(data["items"])
+            offset = data["next_offset"]
+        return collected
+
+    def test_create_session(self, client, populated_db):
+        """Test creating a shuffle session."""
+        response = client.post("/items/shuffles")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["session_id"]
+        assert isinstance(data["seed"], int)
+        assert data["count"] == len(populated_db)
+
+    def test_pages_cover_every_item(self, client, populated_db):
+        """Test that paging a session yields each item exactly once."""
+        session_id = client.post("/items/shuffles").json()["session_id"]
+        collected = self._read_all(client, session_id)
+        assert sorted(collected) == sorted(populated_db)
+
+    def test_pages_are_repeatable(self, client, populated_db):
+        """Test that re-reading a session returns the same order."""
+        session_id = client.post("/items/shuffles").json()["session_id"]
+        first = self._read_all(client, session_id, limit=2)
+        second = self._read_all(client, session_id, limit=3)
+        assert first == second
+
+    def test_seed_replays_order(self, client, populated_db):
+        """Test that a new session with the same seed replays the order."""
+        first = client.post("/items/shuffles", json={"seed": 1234}).json()
+        second = client.post("/items/shuffles", json={"seed": 1234}).json()
+        assert first["seed"] == second["seed"] == 1234
+        assert self._read_all(client, first["session_id"]) == self._read_all(
+            client, second["session_id"]
+        )
+
+    def test_different_seeds_differ(self, client):
+        """Test that different seeds give different orders."""
+        names = [f"Item{i}" for i in range(50)]
+        client.post("/items/bulk", json={"names": names})
+        first = client.post("/items/shuffles", json={"seed": 1}).json()
+        second = client.post("/items/shuffles", json={"seed": 2}).json()
+        assert self._read_all(client, first["session_id"], 50) != self._read_all(
+            client, second["session_id"], 50
+        )
+
+    def test_session_not_found(self, client):
+        """Test reading an unknown session."""
+        response = client.get("/items/shuffles/unknown")
+        assert response.status_code == 404
+        assert "not found" in response.json()["detail"]
+
+    def test_session_invalidated_by_size_change(self, client, populated_db):
+        """Test that a session is rejected once items are added or removed."""
+        session_id = client.post("/items/shuffles").json()["session_id"]
+        client.delete(f"/items/{populated_db[0]}")
+        response = client.get(f"/items/shuffles/{session_id}")
+        assert response.status_code == 409
+        assert "changed" in response.json()["detail"]
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda client: client.put("/items/Apple", json={"name": "Apricot"}),
+            lambda client: (
+                client.delete("/items/Apple"),
+                client.post("/items", json={"name": "Fig"}),
+            ),
+        ],
+        ids=["rename", "delete-then-add"],
+    )
+    def test_session_invalidated_when_count_is_unchanged(
+        self, client, populated_db, change
+    ):
+        """Test that changes keeping the item count still invalidate a session."""
+        session_id = client.post("/items/shuffles").json()["session_id"]
+        change(client)
+        assert len(main.items_db) == len(populated_db)
+        assert client.get(f"/items/shuffles/{session_id}").status_code == 409
+
+    def test_empty_list_session(self, client):
+        """Test shuffling an empty list."""
+        session_id = client.post("/items/shuffles").json()["session_id"]
+        response = client.get(f"/items/shuffles/{session_id}")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"] == []
+        assert data["next_offset"] is None
+
+    def test_invalid_seed(self, client):
+        """Test that negative seeds are rejected."""
+        response = client.post("/items/shuffles", json={"seed": -1})
+        assert response.status_code == 422
+
+    def test_session_id_needs_no_server_state(self, client, populated_db):
+        """Test that a session id alone is enough to serve pages, e.g. on another worker."""
+        session = client.post("/items/shuffles", json={"seed": 99}).json()
+        session_id = main._shuffle_session_id(99, main.items_db.version)
+        assert session["session_id"] == session_id
+        assert main._parse_shuffle_session_id(session_id) == (
+            99,
+            main.items_db.version,
+        )
+        assert self._read_all(client, session_id) == self._read_all(
+            client, session["session_id"]
+        )
+
+    @pytest.mark.parametrize(
+        "session_id", ["1-2-3", "zz-1", "-1-1", "8000000000000000-1"]
+    )
+    def test_malformed_session_id(self, client, session_id):
+        """Test that ids that don't decode are reported as unknown sessions."""
+        assert client.get(f"/items/shuffles/{session_id}").status_code == 404
+
+
+class TestRandomItem:
+    """Tests for GET /items/random endpoint."""
+
+    def test_random_item_success(self, client, populated_db):
+        """Test picking a random item from the list."""
+        response = client.get("/items/random")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["item"] in populated_db
+        assert data["count"] == len(populated_db)
+
+    def test_random_item_empty(self, client):
+        """Test picking a random item when the list is empty."""
+        response = client.get("/items/random")
+        assert response.status_code == 404
+        data = response.json()
+        assert "No items available" in data["detail"]
+
+    def test_random_item_multiple_calls(self, client, populated_db):
+        """Test that multiple picks can produce different results."""
+        results = set()
+        for _ in range(30):
+            response = client.get("/items/random")
+            results.add(response.json()["item"])
+        # Very unlikely all 30 picks return the same item
+        assert len(results) > 1
+
+
+class TestSampleItems:
+    """Tests for GET /items/sample endpoint."""
+
+    def test_sample_items_success(self, client, populated_db):
+        """Test sampling distinct items from the list."""
+        response = client.get("/items/sample?k=3")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 3
+        assert len(set(data["items"])) == 3
+        assert set(data["items"]) <= set(populated_db)
+        assert data["count"] == len(populated_db)
+
+    def test_sample_items_default_size(self, client, populated_db):
+        """Test that a single item is sampled by default."""
+        response = client.get("/items/sample")
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 1
+
+    def test_sample_items_whole_list(self, client, populated_db):
+        """Test sampling every item in the list."""
+        response = client.get(f"/items/sample?k={len(populated_db)}")
+        assert response.status_code == 200
+        assert sorted(response.json()["items"]) == sorted(populated_db)
+
+    def test_sample_items_too_many(self, client, populated_db):
+        """Test error when k exceeds the number of items."""
+        response = client.get(f"/items/sample?k={len(populated_db) + 1}")
+        assert response.status_code == 400
+        data = response.json()
+        assert "k can't be greater than the number of items" in data["detail"]
+
+    def test_sample_items_invalid_size(self, client, populated_db):
+        """Test validation of out-of-range sample sizes."""
+        assert client.get("/items/sample?k=0").status_code == 422
+        assert client.get("/items/sample?k=501").status_code == 422
+
+
 class TestUpdateItem:
     """Tests for PUT /items/{update_item_name} endpoint."""
 
@@ -385,3 +726,123 @@ class TestBulkItemOperations:
         items_response = client.get("/items")
         items_data = items_response.json()
         assert items_data["count"] == 0
+
+
+class TestBulkDelete:
+    """Tests for POST /items/bulk-delete."""
+
+    def test_bulk_delete_reports_each_item(self, client, populated_db):
+        """Test that found names are deleted and the rest are reported."""
+        response = client.post(
+            "/items/bulk-delete",
+            json={"names": ["Apple", "Durian", "Cherry", "Apple"]},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["deleted_count"] == 2
+        assert data["skipped_count"] == 2
+        assert data["remaining_items_count"] == len(populated_db) - 2
+        assert [result["status"] for result in data["results"]] == [
+            "deleted",
+            "not_found",
+            "deleted",
+            "duplicate",
+        ]
+        assert client.get("/items").json()["original_order"] == [
+            "Banana",
+            "Date",
+            "Elderberry",
+        ]
+
+    def test_bulk_delete_drops_weights(self, client):
+        """Test that deleted items lose their weights."""
+        client.post("/items", json={"name": "Apple", "weight": 3})
+        client.post("/items/bulk-delete", json={"names": ["Apple"]})
+        assert main.item_weights.get("Apple") == 1
+
+    def test_bulk_delete_validation(self, client):
+        """Test that empty and oversized payloads are rejected."""
+        assert client.post("/items/bulk-delete", json={"names": []}).status_code == 422
+        response = client.post("/items/bulk-delete", json={"names": ["x"] * 5001})
+        assert response.status_code == 422
+
+
+class TestBulkRename:
+    """Tests for POST /items/bulk-rename."""
+
+    def test_bulk_rename_with_swap(self, client, populated_db):
+        """Test renaming several items, including a swap, in one request."""
+        response = client.post(
+            "/items/bulk-rename",
+            json={
+                "renames": [
+                    {"old_name": "Apple", "new_name": "Banana"},
+                    {"old_name": "Banana", "new_name": "Apple"},
+                    {"old_name": "Cherry", "new_name": "Cranberry"},
+                    {"old_name": "Date", "new_name": "Date"},
+                ]
+            },
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["renamed_count"] == 3
+        assert [result["status"] for result in data["results"]] == [
+            "renamed",
+            "renamed",
+            "renamed",
+            "unchanged",
+        ]
+        assert client.get("/items").json()["original_order"] == [
+            "Banana",
+            "Apple",
+            "Cranberry",
+            "Date",
+            "Elderberry",
+        ]
+
+    def test_bulk_rename_is_all_or_nothing(self, client, populated_db):
+        """Test that one bad pair stops the whole batch."""
+        response = client.post(
+            "/items/bulk-rename",
+            json={
+                "renames": [
+                    {"old_name": "Apple", "new_name": "Avocado"},
+                    {"old_name": "Durian", "new_name": "Dragonfruit"},
+                    {"old_name": "Banana", "new_name": "Cherry"},
+                    {"old_name": "Apple", "new_name": "Apricot"},
+                ]
+            },
+        )
+        assert response.status_code == 409
+        detail = response.json()["detail"]
+        assert [result["status"] for result in detail["results"]] == [
+            "renamed",
+            "not_found",
+            "conflict",
+            "duplicate",
+        ]
+        assert client.get("/items").json()["original_order"] == populated_db
+
+    def test_bulk_rename_moves_weights(self, client):
+        """Test that weights follow their items through a swap."""
+        client.post("/items", json={"name": "Apple", "weight": 3})
+        client.post("/items", json={"name": "Banana"})
+        client.post(
+            "/items/bulk-rename",
+            json={
+                "renames": [
+                    {"old_name": "Apple", "new_name": "Banana"},
+                    {"old_name": "Banana", "new_name": "Apple"},
+                ]
+            },
+        )
+        assert main.item_weights.get("Banana") == 3
+        assert main.item_weights.get("Apple") == 1
+
+    def test_bulk_rename_rejects_empty_name(self, client, populated_db):
+        """Test that new names are validated."""
+        response = client.post(
+            "/items/bulk-rename",
+            json={"renames": [{"old_name": "Apple", "new_name": ""}]},
+        )
+        assert response.status_code == 422
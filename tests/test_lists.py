@@ -0,0 +1,167 @@
+"""Tests for named lists and the list registry."""
+
+import main
+from lists import ListRegistry, create_registry
+
+
+class TestListRegistry:
+    """Tests for ListRegistry caching and eviction."""
+
+    def test_get_creates_only_when_asked(self, tmp_path):
+        """Test that unknown lists are only created on request."""
+        registry = ListRegistry(tmp_path)
+        assert registry.get("team") is None
+        store = registry.get("team", create=True)
+        assert registry.get("team") is store
+        assert "team" in registry
+        assert len(registry) == 1
+
+    def test_cold_lists_are_evicted_and_reloaded(self, tmp_path):
+        """Test that the least recently used list goes to disk and comes back."""
+        registry = ListRegistry(tmp_path, max_resident=2)
+        registry.get("a", create=True).extend(["Apple", "Avocado"])
+        registry.get("b", create=True).add("Banana")
+        registry.get("a")  # "b" is now the coldest list
+        registry.get("c", create=True).add("Cherry")
+
+        assert registry.resident_count == 2
+        assert registry.evictions == 1
+        assert (tmp_path / "b.json").exists()
+        assert "b" in registry
+        assert len(registry) == 3
+
+        assert registry.get("b").to_list() == ["Banana"]
+        assert registry.loads == 1
+
+    def test_flush_and_reopen(self, tmp_path):
+        """Test that flushed lists are visible to a new registry."""
+        registry = ListRegistry(tmp_path)
+        registry.get("team", create=True).extend(["Alex", "Blake"])
+        registry.flush()
+        assert ListRegistry(tmp_path).get("team").to_list() == ["Alex", "Blake"]
+
+    def test_delete(self, tmp_path):
+        """Test deleting resident and evicted lists."""
+        registry = ListRegistry(tmp_path, max_resident=1)
+        registry.get("a", create=True)
+        registry.get("b", create=True)
+        assert registry.delete("a")
+        assert registry.delete("b")
+        assert not registry.delete("a")
+        assert len(registry) == 0
+
+    def test_create_registry_from_environment(self, tmp_path, monkeypatch):
+        """Test configuring the registry through environment variables."""
+        monkeypatch.setenv("RANDOMIZER_LISTS_DIR", str(tmp_path))
+        monkeypatch.setenv("RANDOMIZER_MAX_RESIDENT_LISTS", "5")
+        registry = create_registry()
+        assert registry.directory == tmp_path
+        assert registry.max_resident == 5
+
+
+class TestNamedListEndpoints:
+    """Tests for /lists/{list_id} endpoints."""
+
+    def test_lists_are_independent(self, client):
+        """Test that items added to one list don't appear in another."""
+        client.post("/lists/fruit/items", json={"name": "Apple"})
+        client.post("/lists/colors/items/bulk", json={"names": ["Red", "Blue"]})
+
+        fruit = client.get("/lists/fruit/items").json()
+        colors = client.get("/lists/colors/items").json()
+        assert fruit["original_order"] == ["Apple"]
+        assert colors["original_order"] == ["Red", "Blue"]
+        assert set(colors["randomized_order"]) == {"Red", "Blue"}
+        assert client.get("/items").json()["count"] == 0
+
+    def test_crud_on_a_list(self, client):
+        """Test update, delete, pick, and sample within one list."""
+        client.post(
+            "/lists/team/items/bulk", json={"names": ["Alex", "Blake", "Chris"]}
+        )
+        assert (
+            client.post("/lists/team/items", json={"name": "Alex"}).status_code == 400
+        )
+
+        response = client.put("/lists/team/items/Blake", json={"name": "Bailey"})
+        assert response.status_code == 200
+        assert (
+            client.put("/lists/team/items/Nobody", json={"name": "X"}).status_code
+            == 404
+        )
+
+        response = client.delete("/lists/team/items/Chris")
+        assert response.json()["remaining_items_count"] == 2
+
+        assert client.get("/lists/team/items/random").json()["item"] in {
+            "Alex",
+            "Bailey",
+        }
+        sample = client.get("/lists/team/items/sample?k=2").json()
+        assert sorted(sample["items"]) == ["Alex", "Bailey"]
+
+        response = client.delete("/lists/team/items")
+        assert response.json()["deleted_count"] == 2
+        assert client.get("/lists/team/items/random").status_code == 404
+
+    def test_unknown_list(self, client):
+        """Test reading or changing a list that doesn't exist."""
+        assert client.get("/lists/missing/items").status_code == 404
+        assert client.get("/lists/missing/items/random").status_code == 404
+        assert client.delete("/lists/missing/items/Apple").status_code == 404
+        assert client.delete("/lists/missing").status_code == 404
+
+    def test_rejected_adds_create_no_list(self, client, monkeypatch):
+        """Test that adds which add nothing leave an unknown list unknown."""
+        monkeypatch.setattr(main, "MAX_LIST_ITEMS", 1)
+        assert (
+            client.post("/lists/ghost/items", json={"name": "   "}).status_code == 422
+        )
+        response = client.post("/lists/ghost/items/bulk", json={"names": ["  ", ""]})
+        assert response.json()["count_added"] == 0
+        response = client.post("/lists/ghost/items/bulk", json={"names": ["x" * 101]})
+        assert response.status_code == 422
+        response = client.post("/lists/ghost/items/bulk", json={"names": ["A", "B"]})
+        assert response.status_code == 400
+        assert client.get("/lists/ghost/items").status_code == 404
+        assert "ghost" not in main.list_registry
+
+        assert client.post("/lists/ghost/items", json={"name": "A"}).status_code == 200
+        assert client.get("/lists/ghost/items").json()["original_order"] == ["A"]
+
+    def test_invalid_list_id(self, client):
+        """Test that list ids are restricted to safe characters."""
+        response = client.post("/lists/bad.id/items", json={"name": "Apple"})
+        assert response.status_code == 422
+
+    def test_list_size_limit(self, client, monkeypatch):
+        """Test that each list enforces its size limit."""
+        monkeypatch.setattr(main, "MAX_LIST_ITEMS", 3)
+        response = client.post(
+            "/lists/small/items/bulk", json={"names": ["A", "B", "C", "D"]}
+        )
+        assert response.status_code == 400
+        assert "can't hold more than 3 items" in response.json()["detail"]
+
+        client.post("/lists/small/items/bulk", json={"names": ["A", "B", "C"]})
+        response = client.post("/lists/small/items", json={"name": "D"})
+        assert response.status_code == 400
+
+    def test_delete_list(self, client):
+        """Test deleting a whole list."""
+        client.post("/lists/temp/items", json={"name": "Apple"})
+        response = client.delete("/lists/temp")
+        assert response.status_code == 200
+        assert response.json()["list_id"] == "temp"
+        assert client.get("/lists/temp/items").status_code == 404
+
+    def test_evicted_lists_keep_their_items(self, client, list_registry):
+        """Test that lists pushed out of memory are served from disk."""
+        for index in range(5):
+            client.post(f"/lists/list{index}/items", json={"name": f"Item{index}"})
+        assert list_registry.resident_count == 3
+
+        for index in range(5):
+            data = client.get(f"/lists/list{index}/items").json()
+            assert data["original_order"] == [f"Item{index}"]
+        assert list_registry.loads >= 2
@@ -0,0 +1,164 @@
+"""Tests for request metrics and the /metrics endpoint."""
+
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import main
+from metrics import Histogram, Metrics, MetricsMiddleware, StackSampler
+
+
+class TestHistogram:
+    """Tests for the fixed-bucket histogram."""
+
+    def test_observe(self):
+        """Test that values land in the first bucket at or above them."""
+        histogram = Histogram((1, 5, 10))
+        for value in (0.5, 1, 3, 10, 50):
+            histogram.observe(value)
+        assert histogram.counts == [2, 1, 1, 1]
+        assert histogram.sum == 64.5
+        assert histogram.count == 5
+
+    def test_cumulative(self):
+        """Test that buckets are reported cumulatively and end with +Inf."""
+        histogram = Histogram((1, 5))
+        for value in (0.5, 3, 7):
+            histogram.observe(value)
+        assert list(histogram.cumulative()) == [("1", 1), ("5", 2), ("+Inf", 3)]
+
+
+class TestMetricsRender:
+    """Tests for the Prometheus text output."""
+
+    def test_render(self):
+        """Test counters, histograms, and gauges in the exposition format."""
+        metrics = Metrics()
+        metrics.observe_request("GET", "/items", 200, 0.002, 150)
+        metrics.observe_request("GET", "/items", 304, 0.001, 0)
+        metrics.count_draws("rng", 3)
+        with metrics.time_shuffle():
+            pass
+        metrics.gauge("randomizer_items", "Items in the main list.", lambda: 7)
+        text = metrics.render()
+
+        assert (
+            'randomizer_http_requests_total{method="GET",route="/items",status="200"} 1'
+            in text
+        )
+        assert (
+            'randomizer_http_request_duration_seconds_count{method="GET",route="/items"} 2'
+            in text
+        )
+        assert (
+            'randomizer_http_response_size_bytes_bucket{method="GET",route="/items",le="1000"} 2'
+            in text
+        )
+        assert 'randomizer_shuffle_duration_seconds_bucket{le="+Inf"} 1' in text
+        assert 'randomizer_rng_draws_total{source="rng"} 3' in text
+        assert "# TYPE randomizer_items gauge\nrandomizer_items 7\n" in text
+
+    def test_label_escaping(self):
+        """Test that quotes and backslashes in label values are escaped."""
+        metrics = Metrics()
+        metrics.count_draws('a"b\\c')
+        assert 'randomizer_rng_draws_total{source="a\\"b\\\\c"} 1' in metrics.render()
+
+
+class TestMetricsMiddleware:
+    """Tests for per-route request recording."""
+
+    def make_client(self, sampler=None):
+        app = FastAPI()
+
+        @app.get("/things/{name}")
+        async def get_thing(name: str):
+            return {"name": name}
+
+        @app.get("/slow")
+        def get_slow():
+            time.sleep(0.05)
+            return {}
+
+        @app.get("/events")
+        async def get_events():
+            def events():
+                time.sleep(0.05)
+                yield "event: ping\ndata: {}\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        metrics = Metrics()
+        app.add_middleware(MetricsMiddleware, metrics=metrics, sampler=sampler)
+        return TestClient(app), metrics
+
+    def test_route_templates(self):
+        """Test that requests are labelled by route template, not by path."""
+        client, metrics = self.make_client()
+        client.get("/things/a")
+        client.get("/things/b")
+        client.get("/nowhere")
+        assert metrics.requests[("GET", "/things/{name}", "200")] == 2
+        assert metrics.requests[("GET", "unmatched", "404")] == 1
+
+    def test_response_size(self):
+        """Test that body bytes are counted."""
+        client, metrics = self.make_client()
+        body = client.get("/things/abc").content
+        assert metrics.response_size[("GET", "/things/{name}")].sum == len(body)
+
+    def test_slow_request_profile(self, tmp_path):
+        """Test that a request over the threshold writes collapsed stacks."""
+        sampler = StackSampler(tmp_path, threshold=0.02, interval=0.001)
+        client, _ = self.make_client(sampler)
+        client.get("/things/fast")
+        client.get("/slow")
+        profiles = list(tmp_path.glob("*.folded"))
+        assert sampler.dumps == len(profiles) == 1
+        assert "GET__slow" in profiles[0].name
+        stack, count = profiles[0].read_text().splitlines()[0].rsplit(" ", 1)
+        assert ";" in stack
+        assert int(count) >= 1
+
+    def test_event_streams_are_only_counted(self, tmp_path):
+        """Test that long-lived event streams skip latency, size, and profiles."""
+        sampler = StackSampler(tmp_path, threshold=0.02, interval=0.001)
+        client, metrics = self.make_client(sampler)
+        client.get("/events")
+        assert metrics.requests[("GET", "/events", "200")] == 1
+        assert ("GET", "/events") not in metrics.latency
+        assert ("GET", "/events") not in metrics.response_size
+        assert sampler.dumps == 0
+        assert sampler._active == 0
+
+
+class TestMetricsEndpoint:
+    """Tests for GET /metrics on the main app."""
+
+    def test_metrics_endpoint(self, client, sample_items):
+        """Test the content type and the item gauge."""
+        client.post("/items/bulk", json={"names": sample_items})
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert f"randomizer_items {len(sample_items)}" in response.text
+
+    def test_instrumentation(self, client, sample_items):
+        """Test that shuffles and random draws are counted."""
+        client.post("/items/bulk", json={"names": sample_items})
+        shuffles = main.metrics.shuffle.count
+        draws = main.metrics.rng_draws.copy()
+        requests = main.metrics.requests[("GET", "/items", "200")]
+
+        client.get("/items")
+        client.get("/random/10?count=4")
+        client.get("/items/sample?k=2")
+        client.get("/items/weighted-pick?k=3")
+
+        assert main.metrics.shuffle.count == shuffles + 1
+        assert main.metrics.requests[("GET", "/items", "200")] == requests + 1
+        assert main.metrics.rng_draws["rng"] - draws["rng"] == 4
+        assert main.metrics.rng_draws["item"] - draws["item"] == 2
+        assert main.metrics.rng_draws["weighted"] - draws["weighted"] == 3
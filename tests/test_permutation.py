@@ -0,0 +1,45 @@
+"""Tests for seeded Feistel permutations."""
+
+import pytest
+
+from permutation import FeistelPermutation
+
+
+class TestFeistelPermutation:
+    """Tests for FeistelPermutation behavior."""
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 17, 100, 1000])
+    def test_is_bijection(self, size):
+        """Test that every index maps to a distinct index in range."""
+        permutation = FeistelPermutation(size, seed=42)
+        assert sorted(permutation[i] for i in range(size)) == list(range(size))
+
+    def test_same_seed_is_deterministic(self):
+        """Test that the same seed replays the same permutation."""
+        first = FeistelPermutation(500, seed=7)
+        second = FeistelPermutation(500, seed=7)
+        assert [first[i] for i in range(500)] == [second[i] for i in range(500)]
+
+    def test_different_seeds_differ(self):
+        """Test that different seeds produce different orderings."""
+        first = FeistelPermutation(500, seed=1)
+        second = FeistelPermutation(500, seed=2)
+        assert [first[i] for i in range(500)] != [second[i] for i in range(500)]
+
+    def test_shuffles_the_order(self):
+        """Test that the permutation is not the identity."""
+        permutation = FeistelPermutation(100, seed=3)
+        assert [permutation[i] for i in range(100)] != list(range(100))
+
+    def test_index_out_of_range(self):
+        """Test that out-of-range indices raise IndexError."""
+        permutation = FeistelPermutation(5, seed=0)
+        with pytest.raises(IndexError):
+            permutation[5]
+        with pytest.raises(IndexError):
+            FeistelPermutation(0, seed=0)[0]
+
+    def test_negative_size(self):
+        """Test that a negative size is rejected."""
+        with pytest.raises(ValueError):
+            FeistelPermutation(-1, seed=0)
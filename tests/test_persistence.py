@@ -0,0 +1,192 @@
+"""Tests for the item store write-ahead log and snapshots."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from persistence import ItemJournal, create_journal
+from store import ItemStore
+
+
+def _reopen(directory):
+    """Load a fresh store from the journal files in ``directory``."""
+    store = ItemStore()
+    ItemJournal(directory, store).load()
+    return store
+
+
+class TestItemJournal:
+    """Tests for ItemJournal durability and replay."""
+
+    def test_replay_all_operations(self, tmp_path):
+        """Test that every operation type survives a reload."""
+        store = ItemStore()
+        journal = ItemJournal(tmp_path, store)
+
+        async def scenario():
+            store.extend(["Apple", "Banana", "Cherry"])
+            journal.record("add", names=["Apple", "Banana", "Cherry"])
+            store.rename("Banana", "Blueberry")
+            journal.record("rename", old="Banana", new="Blueberry")
+            store.remove("Apple")
+            journal.record("remove", names=["Apple"])
+            await journal.sync()
+
+        asyncio.run(scenario())
+        assert _reopen(tmp_path).to_list() == ["Blueberry", "Cherry"]
+
+    def test_bulk_operations_are_replayed(self, tmp_path):
+        """Test that batch deletes and renames survive a reload."""
+        store = ItemStore(["Apple", "Banana", "Cherry"])
+        journal = ItemJournal(tmp_path, store)
+        journal.record("add", names=["Apple", "Banana", "Cherry"])
+        store.rename_many([("Apple", "Banana"), ("Banana", "Apple")])
+        journal.record("rename_many", pairs=[("Apple", "Banana"), ("Banana", "Apple")])
+        store.remove_many(["Cherry", "Apple"])
+        journal.record("remove", names=["Cherry", "Apple"])
+        asyncio.run(journal.sync())
+        assert _reopen(tmp_path).to_list() == ["Banana"]
+
+    def test_clear_is_replayed(self, tmp_path):
+        """Test that clearing the store is recorded."""
+        store = ItemStore(["Apple"])
+        journal = ItemJournal(tmp_path, store)
+        journal.record("add", names=["Apple"])
+        store.clear()
+        journal.record("clear")
+        asyncio.run(journal.sync())
+        assert _reopen(tmp_path).to_list() == []
+
+    def test_group_commit_shares_fsync(self, tmp_path):
+        """Test that concurrent writers are committed in one batch."""
+        store = ItemStore()
+        journal = ItemJournal(tmp_path, store, commit_interval=0.01)
+
+        async def writer(name):
+            store.add(name)
+            journal.record("add", names=[name])
+            await journal.sync()
+
+        async def scenario():
+            journal.start()
+            await asyncio.gather(*(writer(f"Item{i}") for i in range(50)))
+            await journal.stop()
+
+        asyncio.run(scenario())
+        assert journal.commits < 50
+        assert _reopen(tmp_path).to_list() == [f"Item{i}" for i in range(50)]
+
+    def test_snapshot_truncates_log(self, tmp_path):
+        """Test that snapshots compact the log and still reload correctly."""
+        store = ItemStore()
+        journal = ItemJournal(tmp_path, store, snapshot_every=3)
+        for i in range(4):
+            store.add(f"Item{i}")
+            journal.record("add", names=[f"Item{i}"])
+            asyncio.run(journal.sync())
+        store.remove("Item0")
+        journal.record("remove", names=["Item0"])
+        asyncio.run(journal.sync())
+
+        assert journal.snapshot_path.exists()
+        assert len(journal.wal_path.read_bytes().splitlines()) == 2
+        assert _reopen(tmp_path).to_list() == ["Item1", "Item2", "Item3"]
+
+    def test_replay_skips_records_in_snapshot(self, tmp_path):
+        """Test recovery from a crash between snapshot and log truncation."""
+        store = ItemStore()
+        journal = ItemJournal(tmp_path, store, snapshot_every=2)
+        store.extend(["Apple", "Banana"])
+        journal.record("add", names=["Apple"])
+        journal.record("add", names=["Banana"])
+        wal_before_snapshot = b"".join(journal._pending)
+        asyncio.run(journal.sync())
+        # Simulate the log never having been truncated.
+        journal.wal_path.write_bytes(wal_before_snapshot)
+
+        assert _reopen(tmp_path).to_list() == ["Apple", "Banana"]
+
+    def test_torn_final_record_is_ignored(self, tmp_path):
+        """Test that a partially written last line doesn't block startup."""
+        store = ItemStore(["Apple"])
+        journal = ItemJournal(tmp_path, store)
+        journal.record("add", names=["Apple"])
+        asyncio.run(journal.sync())
+        with journal.wal_path.open("ab") as wal:
+            wal.write(b'{"seq": 2, "op": "ad')
+
+        assert _reopen(tmp_path).to_list() == ["Apple"]
+
+    def test_writes_after_torn_record_survive(self, tmp_path):
+        """Test that records appended after a torn write survive a second restart."""
+        store = ItemStore()
+        journal = ItemJournal(tmp_path, store)
+        store.add("a")
+        journal.record("add", names=["a"])
+        asyncio.run(journal.sync())
+        with journal.wal_path.open("ab") as wal:
+            wal.write(b'{"seq": 2, "op": "ad')
+
+        store = ItemStore()
+        journal = ItemJournal(tmp_path, store)
+        journal.load()
+        for name in ("b", "c"):
+            store.add(name)
+            journal.record("add", names=[name])
+        asyncio.run(journal.sync())
+
+        assert _reopen(tmp_path).to_list() == ["a", "b", "c"]
+
+    def test_names_with_newlines_round_trip(self, tmp_path):
+        """Test that snapshot encoding handles awkward names."""
+        names = ["line\nbreak", 'quote "x"', "🍎 Apple"]
+        store = ItemStore(names)
+        journal = ItemJournal(tmp_path, store, snapshot_every=1)
+        journal.record("add", names=names)
+        asyncio.run(journal.sync())
+        assert _reopen(tmp_path).to_list() == names
+
+    def test_unknown_operation(self, tmp_path):
+        """Test that unknown operations in the log are rejected."""
+        (tmp_path / ItemJournal.WAL_NAME).write_text('{"seq": 1, "op": "shuffle"}\n')
+        with pytest.raises(ValueError, match="Unknown journal operation"):
+            _reopen(tmp_path)
+
+    def test_create_journal_from_environment(self, tmp_path, monkeypatch):
+        """Test that $RANDOMIZER_DATA_DIR enables the journal."""
+        monkeypatch.delenv("RANDOMIZER_DATA_DIR", raising=False)
+        assert create_journal(ItemStore()) is None
+        monkeypatch.setenv("RANDOMIZER_DATA_DIR", str(tmp_path / "data"))
+        assert create_journal(ItemStore()).directory == tmp_path / "data"
+
+
+class TestPersistedEndpoints:
+    """Tests that item endpoints survive an application restart."""
+
+    def test_items_survive_restart(self, tmp_path, monkeypatch):
+        """Test that mutations are reloaded by the next app startup."""
+        monkeypatch.setattr(main, "journal", ItemJournal(tmp_path, main.items_db))
+        with TestClient(main.app) as client:
+            client.post("/items", json={"name": "Apple"})
+            client.post("/items/bulk", json={"names": ["Banana", "Cherry"]})
+            client.put("/items/Banana", json={"name": "Blueberry"})
+            client.delete("/items/Apple")
+
+        main.items_db.clear()
+        monkeypatch.setattr(main, "journal", ItemJournal(tmp_path, main.items_db))
+        with TestClient(main.app) as client:
+            data = client.get("/items").json()
+        assert data["original_order"] == ["Blueberry", "Cherry"]
+
+    def test_delete_all_survives_restart(self, tmp_path, monkeypatch):
+        """Test that deleting every item is persisted."""
+        monkeypatch.setattr(main, "journal", ItemJournal(tmp_path, main.items_db))
+        with TestClient(main.app) as client:
+            client.post("/items/bulk", json={"names": ["Apple", "Banana"]})
+            client.delete("/items")
+
+        monkeypatch.setattr(main, "journal", ItemJournal(tmp_path, main.items_db))
+        with TestClient(main.app) as client:
+            assert client.get("/items").json()["count"] == 0
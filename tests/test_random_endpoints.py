@@ -1,5 +1,10 @@
 """Tests for random number generation endpoints."""
 
+import pytest
+
+import main
+from rng import RandomNumberGenerator, RandomPool
+
 
 class TestRandomNumber:
     """Tests for /random/{max_value} endpoint."""
@@ -40,6 +45,28 @@ class TestRandomNumber:
         # Very unlikely all 20 calls return the same number
         assert len(results) > 1
 
+    def test_random_number_batch(self, client):
+        """Test generating several random numbers in one request."""
+        response = client.get("/random/6?count=50")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["max"] == 6
+        assert data["count"] == 50
+        assert len(data["random_numbers"]) == 50
+        assert all(1 <= number <= 6 for number in data["random_numbers"])
+
+    def test_random_number_batch_huge_max(self, client):
+        """Test batched draws with a maximum far beyond 2**53."""
+        response = client.get("/random/99999999999999999999?count=2")
+        assert response.status_code == 200
+        numbers = response.json()["random_numbers"]
+        assert all(1 <= number <= 99999999999999999999 for number in numbers)
+
+    def test_random_number_batch_invalid_count(self, client):
+        """Test validation of the count parameter."""
+        assert client.get("/random/6?count=0").status_code == 422
+        assert client.get("/random/6?count=10001").status_code == 422
+
 
 class TestRandomBetween:
     """Tests for /random-between endpoint."""
@@ -105,3 +132,51 @@ class TestRandomBetween:
             results.add(data["random_number"])
         # Very unlikely all 20 calls return the same number
         assert len(results) > 1
+
+    def test_random_between_batch(self, client):
+        """Test generating several random numbers in a range at once."""
+        response = client.get("/random-between?min_value=10&max_value=20&count=100")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["min"] == 10
+        assert data["max"] == 20
+        assert data["count"] == 100
+        assert len(data["random_numbers"]) == 100
+        assert all(10 <= number <= 20 for number in data["random_numbers"])
+
+    def test_random_between_batch_min_greater_than_max(self, client):
+        """Test that batched requests still validate the range."""
+        response = client.get("/random-between?min_value=100&max_value=10&count=5")
+        assert response.status_code == 400
+
+
+class TestRandomPoolEndpoints:
+    """Tests for random endpoints served from the pre-drawn pool."""
+
+    @pytest.fixture
+    def pool(self, monkeypatch):
+        pool = RandomPool(RandomNumberGenerator(), capacity=64)
+        pool.refill()
+        monkeypatch.setattr(main, "rng_pool", pool)
+        return pool
+
+    def test_pool_stats_disabled(self, client, monkeypatch):
+        """Test pool stats when the pool is not configured."""
+        monkeypatch.setattr(main, "rng_pool", None)
+        response = client.get("/random-pool/stats")
+        assert response.status_code == 200
+        assert response.json() == {"enabled": False}
+
+    def test_random_number_uses_pool(self, client, pool):
+        """Test that single draws are served from the pool."""
+        for _ in range(10):
+            data = client.get("/random/100").json()
+            assert 1 <= data["random_number"] <= 100
+        data = client.get("/random-between?min_value=5&max_value=6").json()
+        assert 5 <= data["random_number"] <= 6
+
+        stats = client.get("/random-pool/stats").json()
+        assert stats["enabled"] is True
+        assert stats["hits"] == 11
+        assert stats["stalls"] == 0
+        assert stats["hit_rate"] == 1.0
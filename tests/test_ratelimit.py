@@ -0,0 +1,202 @@
+"""Tests for write rate limiting and load shedding."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from ratelimit import (
+    AdmissionControl,
+    RateLimitMiddleware,
+    TokenBuckets,
+    create_rate_limits,
+)
+
+
+@pytest.fixture
+def limited_client():
+    """Return a client for the main app behind a rate limiter."""
+
+    def make(buckets=None, admission=None):
+        middleware = RateLimitMiddleware(
+            main.app, main.app.router, buckets=buckets, admission=admission
+        )
+        return TestClient(middleware)
+
+    return make
+
+
+class TestTokenBuckets:
+    """Tests for per-client token buckets."""
+
+    def test_burst_then_wait(self):
+        """Test that a full bucket allows a burst, then reports the wait."""
+        buckets = TokenBuckets(rate=2, burst=3)
+        key = ("10.0.0.1", "/items")
+        assert [buckets.take(key, now=0) for _ in range(3)] == [0, 0, 0]
+        assert buckets.take(key, now=0) == pytest.approx(0.5)
+
+    def test_refill(self):
+        """Test that tokens come back at the configured rate, up to the burst."""
+        buckets = TokenBuckets(rate=2, burst=2)
+        key = ("10.0.0.1", "/items")
+        buckets.take(key, now=0)
+        buckets.take(key, now=0)
+        assert buckets.take(key, now=0.5) == 0
+        assert buckets.take(key, now=0.5) > 0
+        assert [buckets.take(key, now=100) for _ in range(2)] == [0, 0]
+        assert buckets.take(key, now=100) > 0
+
+    def test_keys_are_independent(self):
+        """Test that clients and routes each get their own bucket."""
+        buckets = TokenBuckets(rate=1, burst=1)
+        assert buckets.take(("a", "/items"), now=0) == 0
+        assert buckets.take(("a", "/items"), now=0) > 0
+        assert buckets.take(("b", "/items"), now=0) == 0
+        assert buckets.take(("a", "/items/bulk"), now=0) == 0
+
+    def test_least_recently_used_bucket_is_evicted(self):
+        """Test that tracked buckets stay bounded, dropping the idlest first."""
+        buckets = TokenBuckets(rate=1, burst=1, max_clients=2)
+        buckets.take(("a", "/items"), now=0)
+        buckets.take(("b", "/items"), now=0)
+        buckets.take(("a", "/items"), now=0)
+        buckets.take(("c", "/items"), now=0)
+        assert len(buckets) == 2
+        # "a" was used more recently than "b", so it is still limited.
+        assert buckets.take(("a", "/items"), now=0) > 0
+        assert buckets.take(("b", "/items"), now=0) == 0
+
+    def test_invalid_settings(self):
+        """Test that a non-positive rate or a burst below one is rejected."""
+        with pytest.raises(ValueError):
+            TokenBuckets(rate=0, burst=1)
+        with pytest.raises(ValueError):
+            TokenBuckets(rate=1, burst=0.5)
+
+
+class TestAdmissionControl:
+    """Tests for the concurrency cap and queue timeout."""
+
+    def test_sheds_after_queue_timeout(self):
+        """Test that a request waiting past max_queue is turned away."""
+
+        async def scenario():
+            admission = AdmissionControl(max_concurrent=1, max_queue=0.01)
+            assert await admission.acquire()
+            shed = not await admission.acquire()
+            admission.release()
+            return admission, shed, await admission.acquire()
+
+        admission, shed, admitted = asyncio.run(scenario())
+        assert shed
+        assert admitted
+        assert admission.shed == 1
+        assert admission.in_flight == 1
+
+    def test_queued_request_gets_freed_slot(self):
+        """Test that a waiting request runs once a slot frees up in time."""
+
+        async def scenario():
+            admission = AdmissionControl(max_concurrent=1, max_queue=1)
+            await admission.acquire()
+            waiter = asyncio.create_task(admission.acquire())
+            await asyncio.sleep(0)
+            admission.release()
+            return await waiter
+
+        assert asyncio.run(scenario()) is True
+
+
+class TestRateLimitMiddleware:
+    """Tests for throttling write endpoints."""
+
+    def test_writes_are_limited(self, limited_client):
+        """Test that writes past the burst get a 429 with Retry-After."""
+        client = limited_client(TokenBuckets(rate=0.5, burst=2))
+        statuses = [
+            client.post("/items", json={"name": name}).status_code
+            for name in ("A", "B", "C")
+        ]
+        assert statuses == [200, 200, 429]
+
+        response = client.post("/items", json={"name": "D"})
+        assert response.json() == {"detail": "Rate limit exceeded"}
+        assert response.headers["retry-after"] == "2"
+        assert list(main.items_db) == ["A", "B"]
+
+    def test_reads_are_not_limited(self, limited_client):
+        """Test that GET requests never spend tokens."""
+        client = limited_client(TokenBuckets(rate=1, burst=1))
+        assert all(client.get("/items").status_code == 200 for _ in range(5))
+
+    def test_limit_is_per_route_template(self, limited_client, populated_db):
+        """Test that one route shares a bucket however its path varies."""
+        client = limited_client(TokenBuckets(rate=1, burst=1))
+        assert client.put("/items/Apple", json={"name": "Apricot"}).status_code == 200
+        assert client.put("/items/Banana", json={"name": "B"}).status_code == 429
+        assert client.delete("/items/Banana").status_code == 200
+
+    def test_concurrent_writes_are_shed(self):
+        """Test that writes queued behind the concurrency cap get a 429."""
+        release = asyncio.Event()
+
+        async def slow_app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def call(middleware):
+            statuses = []
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            scope = {"type": "http", "method": "POST", "path": "/items"}
+            await middleware(scope, None, send)
+            return statuses[0]
+
+        async def scenario():
+            admission = AdmissionControl(max_concurrent=1, max_queue=0.01)
+            middleware = RateLimitMiddleware(
+                slow_app, main.app.router, admission=admission
+            )
+            first = asyncio.create_task(call(middleware))
+            await asyncio.sleep(0)
+            second = await call(middleware)
+            release.set()
+            return await first, second, admission
+
+        first, second, admission = asyncio.run(scenario())
+        assert (first, second) == (200, 429)
+        assert admission.in_flight == 0
+
+    def test_disabled_by_default(self, client):
+        """Test that the main app does not throttle without configuration."""
+        assert main.rate_buckets is None
+        assert main.write_admission is None
+        for index in range(20):
+            assert client.post("/items", json={"name": str(index)}).status_code == 200
+
+
+class TestCreateRateLimits:
+    """Tests for configuring limits from the environment."""
+
+    def test_unset(self, monkeypatch):
+        """Test that no limits are built without settings."""
+        monkeypatch.delenv("RANDOMIZER_RATE_LIMIT", raising=False)
+        monkeypatch.delenv("RANDOMIZER_MAX_CONCURRENT_WRITES", raising=False)
+        assert create_rate_limits() == (None, None)
+
+    def test_from_environment(self, monkeypatch):
+        """Test that every setting is read."""
+        monkeypatch.setenv("RANDOMIZER_RATE_LIMIT", "5")
+        monkeypatch.setenv("RANDOMIZER_RATE_BURST", "20")
+        monkeypatch.setenv("RANDOMIZER_RATE_LIMIT_CLIENTS", "100")
+        monkeypatch.setenv("RANDOMIZER_MAX_CONCURRENT_WRITES", "8")
+        monkeypatch.setenv("RANDOMIZER_MAX_QUEUE_MS", "250")
+        buckets, admission = create_rate_limits()
+        assert (buckets.rate, buckets.burst, buckets.max_clients) == (5, 20, 100)
+        assert (admission.max_concurrent, admission.max_queue) == (8, 0.25)
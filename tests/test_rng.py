@@ -0,0 +1,190 @@
+"""Tests for random number generator backends."""
+
+import asyncio
+
+import pytest
+
+from rng import (
+    RNG_BACKENDS,
+    NumpyRandomGenerator,
+    RandomNumberGenerator,
+    RandomPool,
+    SystemRandomGenerator,
+    create_pool,
+    create_rng,
+)
+
+STDLIB_BACKENDS = [RandomNumberGenerator, SystemRandomGenerator]
+
+
+class TestRandomBackends:
+    """Tests shared by every stdlib-based backend."""
+
+    @pytest.mark.parametrize("backend", STDLIB_BACKENDS)
+    def test_randint_in_range(self, backend):
+        """Test that single draws stay within bounds."""
+        generator = backend()
+        for _ in range(100):
+            assert 5 <= generator.randint(5, 10) <= 10
+
+    @pytest.mark.parametrize("backend", STDLIB_BACKENDS)
+    def test_randints_batch(self, backend):
+        """Test that batched draws return the requested count within bounds."""
+        numbers = backend().randints(1, 6, 500)
+        assert len(numbers) == 500
+        assert all(1 <= number <= 6 for number in numbers)
+        assert set(numbers) == {1, 2, 3, 4, 5, 6}
+
+    @pytest.mark.parametrize("backend", STDLIB_BACKENDS)
+    def test_randints_invalid_range(self, backend):
+        """Test that inverted bounds raise ValueError."""
+        with pytest.raises(ValueError):
+            backend().randints(10, 1, 5)
+
+    @pytest.mark.parametrize("backend", STDLIB_BACKENDS)
+    def test_random_words(self, backend):
+        """Test that raw 64-bit words are returned in bulk."""
+        words = backend().random_words(100)
+        assert len(words) == 100
+        assert len(set(words)) > 90
+
+    @pytest.mark.parametrize("backend", STDLIB_BACKENDS)
+    def test_randints_wide_range(self, backend):
+        """Test that spans past 2**53 don't overflow or lose low bits."""
+        numbers = backend().randints(1, 2**70, 50)
+        assert all(1 <= number <= 2**70 for number in numbers)
+        assert len({number % 128 for number in numbers}) > 1
+
+    def test_mt_seed_is_reproducible(self):
+        """Test that seeded Mersenne Twister draws are repeatable."""
+        assert RandomNumberGenerator(42).randints(1, 100, 20) == (
+            RandomNumberGenerator(42).randints(1, 100, 20)
+        )
+
+
+class TestNumpyBackend:
+    """Tests for the NumPy PCG64 backend."""
+
+    @pytest.fixture(autouse=True)
+    def require_numpy(self):
+        pytest.importorskip("numpy")
+
+    def test_randints_batch(self):
+        """Test vectorized draws return Python ints within bounds."""
+        numbers = NumpyRandomGenerator(1).randints(1, 6, 500)
+        assert len(numbers) == 500
+        assert all(type(number) is int for number in numbers)
+        assert set(numbers) == {1, 2, 3, 4, 5, 6}
+
+    def test_seed_is_reproducible(self):
+        """Test that seeded PCG64 draws are repeatable."""
+        assert NumpyRandomGenerator(7).randints(1, 100, 20) == (
+            NumpyRandomGenerator(7).randints(1, 100, 20)
+        )
+
+    def test_random_words(self):
+        """Test that raw 64-bit words are returned in bulk."""
+        assert len(NumpyRandomGenerator().random_words(100)) == 100
+
+    def test_huge_bounds_fall_back(self):
+        """Test that bounds beyond int64 still produce valid numbers."""
+        numbers = NumpyRandomGenerator().randints(1, 2**70, 10)
+        assert all(1 <= number <= 2**70 for number in numbers)
+
+
+class TestCreateRng:
+    """Tests for backend selection."""
+
+    def test_default_backend(self, monkeypatch):
+        """Test that the Mersenne Twister backend is the default."""
+        monkeypatch.delenv("RANDOMIZER_RNG", raising=False)
+        assert type(create_rng()) is RandomNumberGenerator
+
+    def test_backend_from_environment(self, monkeypatch):
+        """Test that $RANDOMIZER_RNG selects the backend."""
+        monkeypatch.setenv("RANDOMIZER_RNG", "system")
+        assert type(create_rng()) is SystemRandomGenerator
+
+    def test_unknown_backend(self):
+        """Test that unknown backend names raise ValueError."""
+        with pytest.raises(ValueError, match="Unknown RNG backend"):
+            create_rng("dice")
+
+    def test_registry_names(self):
+        """Test that every backend is registered under its name."""
+        assert set(RNG_BACKENDS) == {"mt", "system", "numpy"}
+
+
+class TestRandomPool:
+    """Tests for the pre-drawn random number pool."""
+
+    def test_draws_in_range(self):
+        """Test that pooled draws stay within bounds and cover the range."""
+        pool = RandomPool(RandomNumberGenerator(1), capacity=1000)
+        pool.refill()
+        numbers = [pool.randint(1, 6) for _ in range(600)]
+        assert all(1 <= number <= 6 for number in numbers)
+        assert set(numbers) == {1, 2, 3, 4, 5, 6}
+        assert pool.hits == 600
+        assert pool.available == 400
+
+    def test_single_value_range(self):
+        """Test that a one-value range always returns that value."""
+        pool = RandomPool(RandomNumberGenerator(), capacity=10)
+        pool.refill()
+        assert [pool.randint(7, 7) for _ in range(10)] == [7] * 10
+
+    def test_empty_pool_falls_back(self):
+        """Test that an empty pool still answers and counts a stall."""
+        pool = RandomPool(RandomNumberGenerator(), capacity=4)
+        assert 1 <= pool.randint(1, 10) <= 10
+        stats = pool.stats()
+        assert stats["stalls"] == 1
+        assert stats["hits"] == 0
+        assert stats["hit_rate"] == 0.0
+
+    def test_refill_wraps_around(self):
+        """Test that refilling a partially drained ring fills every slot."""
+        pool = RandomPool(RandomNumberGenerator(3), capacity=8)
+        pool.refill()
+        for _ in range(5):
+            pool.randint(1, 100)
+        pool.refill()
+        assert pool.available == 8
+        assert pool.refills == 2
+        for _ in range(8):
+            pool.randint(1, 100)
+        assert pool.stalls == 0
+
+    def test_invalid_range_and_capacity(self):
+        """Test that bad arguments raise ValueError."""
+        with pytest.raises(ValueError):
+            RandomPool(RandomNumberGenerator(), capacity=0)
+        pool = RandomPool(RandomNumberGenerator(), capacity=4)
+        with pytest.raises(ValueError):
+            pool.randint(10, 1)
+
+    def test_background_refill(self):
+        """Test that draining below the watermark triggers a refill."""
+
+        async def scenario():
+            pool = RandomPool(RandomNumberGenerator(), capacity=8)
+            pool.start()
+            for _ in range(7):
+                pool.randint(1, 100)
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            available = pool.available
+            await pool.stop()
+            return pool, available
+
+        pool, available = asyncio.run(scenario())
+        assert available == 8
+        assert pool.refills == 2
+
+    def test_create_pool_from_environment(self, monkeypatch):
+        """Test that $RANDOMIZER_RNG_POOL enables and sizes the pool."""
+        monkeypatch.delenv("RANDOMIZER_RNG_POOL", raising=False)
+        assert create_pool(RandomNumberGenerator()) is None
+        monkeypatch.setenv("RANDOMIZER_RNG_POOL", "128")
+        assert create_pool(RandomNumberGenerator()).capacity == 128
@@ -0,0 +1,178 @@
+"""Tests for the multi-process shared item store."""
+
+import multiprocessing
+
+import pytest
+
+import main
+from shared_store import SharedItemStore
+from store import create_store
+
+
+@pytest.fixture
+def arena(tmp_path):
+    """Return a path for a temporary shared arena."""
+    return tmp_path / "arena"
+
+
+def _add_from_worker(path, names):
+    store = SharedItemStore(path, size=64 * 1024)
+    store.extend(names)
+    store.close()
+
+
+class TestSharedItemStore:
+    """Tests for SharedItemStore behavior."""
+
+    def test_basic_operations(self, arena):
+        """Test the store interface on a single instance."""
+        store = SharedItemStore(arena, size=64 * 1024)
+        store.extend(["Apple", "Banana", "Cherry"])
+        store.rename("Banana", "Blueberry")
+        store.remove("Apple")
+        assert store.to_list() == ["Blueberry", "Cherry"]
+        assert len(store) == 2
+        assert "Cherry" in store
+        assert store[0] == "Blueberry"
+        assert store.page(1, 5) == ["Cherry"]
+        assert store.take([1, 0]) == ["Cherry", "Blueberry"]
+        assert store.choice() in {"Blueberry", "Cherry"}
+        assert sorted(store.sample(2)) == ["Blueberry", "Cherry"]
+        store.close()
+
+    def test_errors_match_item_store(self, arena):
+        """Test that invalid mutations raise KeyError and change nothing."""
+        store = SharedItemStore(arena, size=64 * 1024)
+        store.extend(["Apple", "Banana"])
+        with pytest.raises(KeyError):
+            store.add("Apple")
+        with pytest.raises(KeyError):
+            store.extend(["Cherry", "Cherry"])
+        with pytest.raises(KeyError):
+            store.rename("Apple", "Banana")
+        with pytest.raises(KeyError):
+            store.remove("Durian")
+        assert store.to_list() == ["Apple", "Banana"]
+        store.close()
+
+    def test_instances_see_each_other(self, arena):
+        """Test that two mappings of one arena stay in sync."""
+        first = SharedItemStore(arena, size=64 * 1024)
+        second = SharedItemStore(arena, size=64 * 1024)
+        first.extend(["Apple", "Banana"])
+        assert second.to_list() == ["Apple", "Banana"]
+        second.rename("Apple", "Green Apple")
+        second.remove("Banana")
+        assert first.to_list() == ["Green Apple"]
+        first.clear()
+        assert len(second) == 0
+        second.add("Cherry")
+        assert first.to_list() == ["Cherry"]
+        first.close()
+        second.close()
+
+    def test_bulk_mutations_replicate(self, arena):
+        """Test that batch deletes and renames reach other instances."""
+        first = SharedItemStore(arena, size=64 * 1024)
+        second = SharedItemStore(arena, size=64 * 1024)
+        first.extend(["Apple", "Banana", "Cherry"])
+        first.rename_many([("Apple", "Banana"), ("Banana", "Apple")])
+        first.remove_many(["Cherry"])
+        assert second.to_list() == ["Banana", "Apple"]
+        with pytest.raises(KeyError):
+            second.remove_many(["Apple", "Cherry"])
+        assert first.to_list() == ["Banana", "Apple"]
+        first.close()
+        second.close()
+
+    def test_version_rises_across_instances(self, arena):
+        """Test that writes from any instance raise the version, clear included."""
+        first = SharedItemStore(arena, size=64 * 1024)
+        second = SharedItemStore(arena, size=64 * 1024)
+        versions = [second.version]
+        first.add("Apple")
+        versions.append(second.version)
+        first.clear()
+        versions.append(second.version)
+        second.add("Banana")
+        versions.append(first.version)
+        assert versions == sorted(set(versions))
+        first.close()
+        second.close()
+
+    def test_log_rewrite_when_full(self, arena):
+        """Test that a full log is compacted into a snapshot record."""
+        first = SharedItemStore(arena, size=4096)
+        second = SharedItemStore(arena, size=4096)
+        first.extend(["Keep1", "Keep2"])
+        for i in range(200):
+            first.add(f"Temp{i}")
+            first.remove(f"Temp{i}")
+        assert first._generation > 0
+        assert second.to_list() == ["Keep1", "Keep2"]
+        first.close()
+        second.close()
+
+    def test_arena_full(self, arena):
+        """Test that exceeding the arena raises and keeps replicas consistent."""
+        store = SharedItemStore(arena, size=1024)
+        with pytest.raises(MemoryError):
+            for i in range(200):
+                store.add(f"Item{i:04d}")
+        other = SharedItemStore(arena, size=1024)
+        assert store.to_list() == other.to_list()
+        store.close()
+        other.close()
+
+    def test_writes_from_other_processes(self, arena):
+        """Test that writes from worker processes are visible here."""
+        store = SharedItemStore(arena, size=64 * 1024)
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(
+                target=_add_from_worker,
+                args=(arena, [f"W{worker}-{i}" for i in range(20)]),
+            )
+            for worker in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+            assert worker.exitcode == 0
+
+        names = store.to_list()
+        assert len(names) == 60
+        assert len(set(names)) == 60
+        store.close()
+
+    def test_create_store_from_environment(self, arena, monkeypatch):
+        """Test selecting the shared backend through the environment."""
+        monkeypatch.setenv("RANDOMIZER_STORAGE", "shared")
+        monkeypatch.setenv("RANDOMIZER_SHARED_PATH", str(arena))
+        monkeypatch.setenv("RANDOMIZER_SHARED_SIZE_MB", "1")
+        store = create_store()
+        assert isinstance(store, SharedItemStore)
+        assert arena.stat().st_size == 1024 * 1024
+        store.close()
+
+
+class TestSharedEndpoints:
+    """Tests that the item endpoints work against the shared store."""
+
+    def test_crud_workflow(self, client, arena, monkeypatch):
+        """Test the endpoints while another worker writes to the arena."""
+        store = SharedItemStore(arena, size=64 * 1024)
+        other_worker = SharedItemStore(arena, size=64 * 1024)
+        monkeypatch.setattr(main, "items_db", store)
+
+        client.post("/items/bulk", json={"names": ["Apple", "Banana"]})
+        other_worker.add("Cherry")
+        assert client.post("/items", json={"name": "Cherry"}).status_code == 400
+        client.put("/items/Banana", json={"name": "Blueberry"})
+
+        data = client.get("/items").json()
+        assert data["original_order"] == ["Apple", "Blueberry", "Cherry"]
+        assert other_worker.to_list() == ["Apple", "Blueberry", "Cherry"]
+        store.close()
+        other_worker.close()
@@ -0,0 +1,128 @@
+"""Tests for the shuffle engines and shuffled item limits."""
+
+import pytest
+
+import main
+from shuffle import SHUFFLE_ENGINES, NumpyShuffler, Shuffler, create_shuffler
+
+NAMES = tuple(f"item-{index}" for index in range(50))
+
+
+class TestShuffler:
+    """Tests for the stdlib shuffle engine."""
+
+    def test_full_shuffle_is_a_permutation(self):
+        """Test that a full shuffle returns every name once."""
+        shuffled = Shuffler().shuffled(NAMES)
+        assert sorted(shuffled) == sorted(NAMES)
+        assert shuffled != list(NAMES)
+
+    def test_limit(self):
+        """Test that a limit returns that many distinct names."""
+        shuffled = Shuffler().shuffled(NAMES, 5)
+        assert len(shuffled) == len(set(shuffled)) == 5
+        assert set(shuffled) <= set(NAMES)
+        assert sorted(Shuffler().shuffled(NAMES, 500)) == sorted(NAMES)
+
+    def test_seed_is_reproducible(self):
+        """Test that seeded shuffles are repeatable."""
+        assert Shuffler(3).shuffled(NAMES) == Shuffler(3).shuffled(NAMES)
+
+    def test_empty(self):
+        """Test shuffling an empty list."""
+        assert Shuffler().shuffled(()) == []
+
+
+class TestNumpyShuffler:
+    """Tests for the NumPy index-permutation engine."""
+
+    @pytest.fixture(autouse=True)
+    def require_numpy(self):
+        pytest.importorskip("numpy")
+
+    def test_full_shuffle_is_a_permutation(self):
+        """Test that a full shuffle returns every name once as a list of str."""
+        shuffled = NumpyShuffler().shuffled(NAMES)
+        assert type(shuffled) is list
+        assert all(type(name) is str for name in shuffled)
+        assert sorted(shuffled) == sorted(NAMES)
+
+    def test_limit(self):
+        """Test that a limit gathers only that many distinct names."""
+        shuffled = NumpyShuffler().shuffled(NAMES, 5)
+        assert len(shuffled) == len(set(shuffled)) == 5
+        assert set(shuffled) <= set(NAMES)
+
+    def test_seed_is_reproducible(self):
+        """Test that seeded PCG64 shuffles are repeatable."""
+        assert NumpyShuffler(3).shuffled(NAMES) == NumpyShuffler(3).shuffled(NAMES)
+
+    def test_empty(self):
+        """Test shuffling an empty list."""
+        assert NumpyShuffler().shuffled(()) == []
+
+
+class TestCreateShuffler:
+    """Tests for shuffle engine selection."""
+
+    def test_default_engine(self, monkeypatch):
+        """Test that NumPy is preferred when installed, else the stdlib."""
+        monkeypatch.delenv("RANDOMIZER_SHUFFLE", raising=False)
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            expected = Shuffler
+        else:
+            expected = NumpyShuffler
+        assert type(create_shuffler()) is expected
+
+    def test_engine_from_environment(self, monkeypatch):
+        """Test that $RANDOMIZER_SHUFFLE selects the engine."""
+        monkeypatch.setenv("RANDOMIZER_SHUFFLE", "stdlib")
+        assert type(create_shuffler()) is Shuffler
+
+    def test_unknown_engine(self):
+        """Test that unknown engine names raise ValueError."""
+        with pytest.raises(ValueError, match="Unknown shuffle engine"):
+            create_shuffler("riffle")
+
+    def test_registry_names(self):
+        """Test that every engine is registered under its name."""
+        assert set(SHUFFLE_ENGINES) == {"stdlib", "numpy"}
+
+
+class TestShuffleLimit:
+    """Tests for the limit parameter on shuffled item endpoints."""
+
+    def test_get_items_limit(self, client, sample_items):
+        """Test that GET /items can return only part of the shuffled order."""
+        client.post("/items/bulk", json={"names": sample_items})
+        data = client.get("/items?limit=2").json()
+        assert data["original_order"] == sample_items
+        assert data["count"] == len(sample_items)
+        assert len(data["randomized_order"]) == 2
+        assert set(data["randomized_order"]) <= set(sample_items)
+
+    def test_limit_above_count(self, client, sample_items):
+        """Test that a limit past the end returns every item."""
+        client.post("/items/bulk", json={"names": sample_items})
+        data = client.get("/items?limit=1000").json()
+        assert sorted(data["randomized_order"]) == sorted(sample_items)
+
+    def test_invalid_limit(self, client):
+        """Test that a limit below one is rejected."""
+        assert client.get("/items?limit=0").status_code == 422
+
+    def test_named_list_limit(self, client):
+        """Test the limit on a named list's shuffled items."""
+        client.post("/lists/fruit/items/bulk", json={"names": ["A", "B", "C"]})
+        data = client.get("/lists/fruit/items?limit=1").json()
+        assert data["original_order"] == ["A", "B", "C"]
+        assert len(data["randomized_order"]) == 1
+
+    def test_uses_configured_engine(self, client, monkeypatch):
+        """Test that GET /items shuffles with the module's engine."""
+        monkeypatch.setattr(main, "shuffler", Shuffler(seed=11))
+        client.post("/items/bulk", json={"names": list(NAMES)})
+        expected = Shuffler(seed=11).shuffled(NAMES)
+        assert client.get("/items").json()["randomized_order"] == expected
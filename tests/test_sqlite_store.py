@@ -0,0 +1,359 @@
+"""Tests for the SQLite-backed item store."""
+
+import asyncio
+import sqlite3
+import time
+
+import httpx
+import pytest
+
+import main
+from sqlite_store import SQLiteItemStore
+from store import ItemStore, create_store
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    """Create a SQLite store in a temporary database file."""
+    store = SQLiteItemStore(tmp_path / "items.db")
+    yield store
+    store.close()
+
+
+class TestSQLiteItemStore:
+    """Tests for SQLiteItemStore behavior."""
+
+    def test_add_and_iterate_in_order(self, sqlite_store):
+        """Test that items are iterated in insertion order."""
+        sqlite_store.extend(["Apple", "Banana", "Cherry"])
+        assert list(sqlite_store) == ["Apple", "Banana", "Cherry"]
+        assert len(sqlite_store) == 3
+        assert "Banana" in sqlite_store
+        assert "Durian" not in sqlite_store
+        assert 42 not in sqlite_store
+
+    def test_iteration_spans_batches(self, sqlite_store, monkeypatch):
+        """Test iterating more rows than one keyset batch."""
+        monkeypatch.setattr(SQLiteItemStore, "ITER_BATCH_SIZE", 3)
+        names = [f"Item{i}" for i in range(10)]
+        sqlite_store.extend(names)
+        assert list(sqlite_store) == names
+
+    def test_add_duplicate_raises(self, sqlite_store):
+        """Test that adding an existing name raises KeyError."""
+        sqlite_store.add("Apple")
+        with pytest.raises(KeyError):
+            sqlite_store.add("Apple")
+
+    def test_extend_is_atomic(self, sqlite_store):
+        """Test that a failing bulk insert leaves the store unchanged."""
+        sqlite_store.add("Apple")
+        with pytest.raises(KeyError):
+            sqlite_store.extend(["Banana", "Apple"])
+        assert sqlite_store.to_list() == ["Apple"]
+
+    def test_rename_preserves_position(self, sqlite_store):
+        """Test that renaming keeps the item in the same position."""
+        sqlite_store.extend(["Apple", "Banana", "Cherry"])
+        sqlite_store.rename("Banana", "Blueberry")
+        assert sqlite_store.to_list() == ["Apple", "Blueberry", "Cherry"]
+
+    def test_rename_missing_or_conflicting(self, sqlite_store):
+        """Test that renaming fails for missing sources and taken targets."""
+        sqlite_store.extend(["Apple", "Banana"])
+        with pytest.raises(KeyError):
+            sqlite_store.rename("Cherry", "Date")
+        with pytest.raises(KeyError):
+            sqlite_store.rename("Apple", "Banana")
+        assert sqlite_store.to_list() == ["Apple", "Banana"]
+
+    def test_remove_and_clear(self, sqlite_store):
+        """Test removing single items and clearing the store."""
+        sqlite_store.extend(["Apple", "Banana", "Cherry"])
+        sqlite_store.remove("Banana")
+        assert sqlite_store.to_list() == ["Apple", "Cherry"]
+        with pytest.raises(KeyError):
+            sqlite_store.remove("Banana")
+        sqlite_store.clear()
+        assert len(sqlite_store) == 0
+
+    def test_bulk_remove_and_rename(self, sqlite_store):
+        """Test batch mutations, including swaps and rollback."""
+        sqlite_store.extend(["Apple", "Banana", "Cherry", "Date"])
+        sqlite_store.remove_many(["Apple", "Date"])
+        assert list(sqlite_store) == ["Banana", "Cherry"]
+        with pytest.raises(KeyError):
+            sqlite_store.remove_many(["Banana", "Durian"])
+
+        sqlite_store.rename_many([("Banana", "Cherry"), ("Cherry", "Banana")])
+        assert list(sqlite_store) == ["Cherry", "Banana"]
+        with pytest.raises(KeyError):
+            sqlite_store.rename_many([("Cherry", "Fig"), ("Missing", "Grape")])
+        with pytest.raises(KeyError):
+            sqlite_store.rename_many([("Cherry", "Banana")])
+        assert list(sqlite_store) == ["Cherry", "Banana"]
+
+    def test_version_is_shared_and_bumped_by_writes(self, sqlite_store, tmp_path):
+        """Test that every committed write bumps the shared version."""
+        other = SQLiteItemStore(tmp_path / "items.db")
+        start = sqlite_store.version
+        sqlite_store.add("Apple")
+        assert other.version == start + 1
+        with pytest.raises(KeyError):
+            sqlite_store.add("Apple")
+        other.remove("Apple")
+        assert sqlite_store.version == start + 2
+        other.close()
+
+    def test_no_op_writes_keep_the_version(self, sqlite_store):
+        """Test that empty batches and same-name renames don't bump the version."""
+        sqlite_store.add("Apple")
+        start = sqlite_store.version
+        sqlite_store.extend([])
+        sqlite_store.remove_many([])
+        sqlite_store.rename_many([])
+        sqlite_store.rename("Apple", "Apple")
+        assert sqlite_store.version == start
+        with pytest.raises(KeyError):
+            sqlite_store.rename("Missing", "Missing")
+
+    def test_page_and_index(self, sqlite_store):
+        """Test positional access after deletes."""
+        sqlite_store.extend(["Apple", "Banana", "Cherry", "Date"])
+        sqlite_store.remove("Banana")
+        assert sqlite_store.page(1, 2) == ["Cherry", "Date"]
+        assert sqlite_store[0] == "Apple"
+        with pytest.raises(IndexError):
+            sqlite_store[3]
+
+    def test_take_reads_a_page_in_one_query(self, tmp_path):
+        """Test reading scattered positions across gaps with one statement."""
+        store = SQLiteItemStore(tmp_path / "take.db", pool_size=1)
+        names = [f"Item{i}" for i in range(50)]
+        store.extend(names)
+        store.remove_many(names[10:20])
+        live = names[:10] + names[20:]
+        statements = []
+        with store._connection() as connection:
+            connection.set_trace_callback(statements.append)
+        positions = [39, 0, 12, 5, 12]
+        assert store.take(positions) == [live[p] for p in positions]
+        assert len(statements) == 1
+        assert store.take([]) == []
+        for position in (-1, 40):
+            with pytest.raises(IndexError):
+                store.take([0, position])
+        store.close()
+
+    def test_choice(self, sqlite_store):
+        """Test random picks only return live names."""
+        with pytest.raises(IndexError):
+            sqlite_store.choice()
+        names = [f"Item{i}" for i in range(20)]
+        sqlite_store.extend(names)
+        for name in names[::2]:
+            sqlite_store.remove(name)
+        picks = {sqlite_store.choice() for _ in range(100)}
+        assert picks <= set(names[1::2])
+        assert len(picks) > 1
+
+    def test_choice_with_sparse_rowids(self, sqlite_store, monkeypatch):
+        """Test the scan fallback when probes keep missing."""
+        monkeypatch.setattr(SQLiteItemStore, "MAX_PROBES", 0)
+        sqlite_store.extend(["Apple", "Banana"])
+        assert sqlite_store.choice() in {"Apple", "Banana"}
+
+    def test_sample(self, sqlite_store):
+        """Test sampling distinct names by probing and by full read."""
+        names = [f"Item{i}" for i in range(20)]
+        sqlite_store.extend(names)
+        for k in (0, 3, 15, 20):
+            sample = sqlite_store.sample(k)
+            assert len(sample) == len(set(sample)) == k
+            assert set(sample) <= set(names)
+        with pytest.raises(ValueError):
+            sqlite_store.sample(21)
+
+    def test_shared_between_instances(self, tmp_path):
+        """Test that two stores on one file see each other's writes."""
+        first = SQLiteItemStore(tmp_path / "shared.db")
+        second = SQLiteItemStore(tmp_path / "shared.db")
+        first.add("Apple")
+        assert "Apple" in second
+        second.rename("Apple", "Green Apple")
+        assert first.to_list() == ["Green Apple"]
+        first.close()
+        second.close()
+
+
+class TestCreateStore:
+    """Tests for storage backend selection."""
+
+    def test_default_is_memory(self, monkeypatch):
+        """Test that the in-memory store is the default."""
+        monkeypatch.delenv("RANDOMIZER_STORAGE", raising=False)
+        assert isinstance(create_store(), ItemStore)
+
+    def test_sqlite_from_environment(self, tmp_path, monkeypatch):
+        """Test selecting SQLite through environment variables."""
+        monkeypatch.setenv("RANDOMIZER_STORAGE", "sqlite")
+        monkeypatch.setenv("RANDOMIZER_SQLITE_PATH", str(tmp_path / "env.db"))
+        store = create_store()
+        assert isinstance(store, SQLiteItemStore)
+        store.close()
+
+    def test_unknown_backend(self, monkeypatch):
+        """Test that unknown backends raise ValueError."""
+        monkeypatch.setenv("RANDOMIZER_STORAGE", "redis")
+        with pytest.raises(ValueError, match="Unknown storage backend"):
+            create_store()
+
+
+class TestSQLiteEndpoints:
+    """Tests that the item endpoints work against SQLite storage."""
+
+    def test_crud_workflow(self, client, sqlite_store, monkeypatch):
+        """Test create, bulk add, update, pick, and delete on SQLite."""
+        monkeypatch.setattr(main, "items_db", sqlite_store)
+
+        assert client.post("/items", json={"name": "Apple"}).status_code == 200
+        data = client.post(
+            "/items/bulk", json={"names": ["Banana", "Apple", "Cherry"]}
+        ).json()
+        assert data["added_items"] == ["Banana", "Cherry"]
+        assert data["skipped_duplicates"] == ["Apple"]
+
+        assert (
+            client.put("/items/Banana", json={"name": "Blueberry"}).status_code == 200
+        )
+        assert client.delete("/items/Apple").status_code == 200
+
+        data = client.get("/items").json()
+        assert data["original_order"] == ["Blueberry", "Cherry"]
+        assert client.get("/items/random").json()["item"] in {"Blueberry", "Cherry"}
+        assert client.get("/items/page?limit=1&cursor=1").json()["items"] == ["Cherry"]
+
+        assert client.delete("/items").json()["deleted_count"] == 2
+        assert len(sqlite_store) == 0
+
+    def test_skipped_writes_keep_changes_in_sync(
+        self, client, sqlite_store, monkeypatch
+    ):
+        """Test that writes skipping every name don't force a resync."""
+        monkeypatch.setattr(main, "items_db", sqlite_store)
+        monkeypatch.setattr(main, "change_log", main.ChangeLog())
+        main.change_log.reset(sqlite_store.version)
+        client.post("/items", json={"name": "Apple"})
+        version = sqlite_store.version
+
+        client.post("/items/bulk", json={"names": ["Apple"]})
+        client.post("/items/bulk-delete", json={"names": ["Missing"]})
+        client.put("/items/Apple", json={"name": "Apple"})
+        data = client.get(f"/items/changes?since={version}").json()
+        assert data == {
+            "since": version,
+            "version": version,
+            "resync": False,
+            "changes": [],
+        }
+
+    def test_draws_are_counted_on_the_event_loop(
+        self, client, sqlite_store, monkeypatch
+    ):
+        """Test that random picks count draws outside the store thread."""
+        monkeypatch.setattr(main, "items_db", sqlite_store)
+        sqlite_store.extend(["Apple", "Banana"])
+        counted = []
+
+        def count_draws(source, count=1):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                counted.append(None)
+            else:
+                counted.append((source, count))
+
+        monkeypatch.setattr(main.metrics, "count_draws", count_draws)
+        assert client.get("/items/random").status_code == 200
+        assert client.get("/items/sample?k=2").status_code == 200
+        assert counted == [("item", 1), ("item", 2)]
+
+    def test_shuffle_pages_cover_the_list(self, client, sqlite_store, monkeypatch):
+        """Test that shuffle pages over SQLite return every name exactly once."""
+        monkeypatch.setattr(main, "items_db", sqlite_store)
+        names = [f"Item{i}" for i in range(30)]
+        sqlite_store.extend(names)
+        sqlite_store.remove_many(names[5:10])
+
+        session_id = client.post("/items/shuffles", json={"seed": 7}).json()[
+            "session_id"
+        ]
+        seen = []
+        for offset in range(0, 25, 10):
+            page = client.get(f"/items/shuffles/{session_id}?offset={offset}&limit=10")
+            seen.extend(page.json()["items"])
+        assert sorted(seen) == sorted(names[:5] + names[10:])
+
+    def test_writes_waiting_for_the_lock_leave_the_loop_free(
+        self, sqlite_store, monkeypatch
+    ):
+        """Test that other requests are served while a write waits for the lock."""
+        monkeypatch.setattr(main, "items_db", sqlite_store)
+        blocker = sqlite3.connect(sqlite_store.path, isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                write = asyncio.create_task(client.post("/items", json={"name": "A"}))
+                await asyncio.sleep(0.1)
+                read = await client.get("/items/page")
+                waiting = not write.done()
+                blocker.execute("COMMIT")
+                return read, waiting, await write
+
+        read, waiting, write = asyncio.run(scenario())
+        blocker.close()
+        assert read.json()["items"] == []
+        assert waiting
+        assert write.status_code == 200
+        assert sqlite_store.to_list() == ["A"]
+
+    def test_changes_carry_the_version_each_write_made(
+        self, sqlite_store, tmp_path, monkeypatch
+    ):
+        """Test change versions and order when writes overlap other workers."""
+        monkeypatch.setattr(main, "items_db", sqlite_store)
+        monkeypatch.setattr(main, "change_log", main.ChangeLog())
+        start = sqlite_store.version
+        main.change_log.reset(start)
+        other = SQLiteItemStore(tmp_path / "items.db")
+        add = sqlite_store.add
+
+        def slow_add(name):
+            if name == "a":
+                time.sleep(0.1)
+            add(name)
+            if name == "a":
+                # Another worker writes before this one's loop resumes
+                other.add("other")
+
+        monkeypatch.setattr(sqlite_store, "add", slow_add)
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                first = asyncio.create_task(client.post("/items", json={"name": "a"}))
+                await asyncio.sleep(0.02)
+                await client.post("/items", json={"name": "b"})
+                await first
+                return (await client.get(f"/items/changes?since={start}")).json()
+
+        data = asyncio.run(scenario())
+        other.close()
+        changes = [(change["names"], change["version"]) for change in data["changes"]]
+        assert changes == [(["a"], start + 1), (["b"], start + 3)]
@@ -0,0 +1,251 @@
+"""Tests for the indexed item store."""
+
+import time
+
+import pytest
+
+from store import ItemStore
+
+
+class TestItemStore:
+    """Tests for ItemStore behavior."""
+
+    def test_add_and_iterate_in_order(self):
+        """Test that items are iterated in insertion order."""
+        store = ItemStore(["Apple", "Banana", "Cherry"])
+        assert list(store) == ["Apple", "Banana", "Cherry"]
+        assert len(store) == 3
+        assert "Banana" in store
+        assert "Durian" not in store
+
+    def test_add_duplicate_raises(self):
+        """Test that adding an existing name raises KeyError."""
+        store = ItemStore(["Apple"])
+        with pytest.raises(KeyError):
+            store.add("Apple")
+
+    def test_extend_is_all_or_nothing(self):
+        """Test that a bulk add with any duplicate adds nothing."""
+        store = ItemStore(["Apple"])
+        with pytest.raises(KeyError):
+            store.extend(["Banana", "Apple"])
+        with pytest.raises(KeyError):
+            store.extend(["Banana", "Banana"])
+        assert list(store) == ["Apple"]
+
+    def test_snapshot_is_reused_until_mutation(self):
+        """Test that snapshots are cached and invalidated by writes."""
+        store = ItemStore(["Apple", "Banana"])
+        first = store.snapshot()
+        assert first == ("Apple", "Banana")
+        assert store.snapshot() is first
+
+        store.add("Cherry")
+        second = store.snapshot()
+        assert second == ("Apple", "Banana", "Cherry")
+        assert first == ("Apple", "Banana")
+
+    def test_version_changes_with_every_mutation(self):
+        """Test that each change bumps the version and reads don't."""
+        store = ItemStore()
+        versions = [store.version]
+        for mutate in (
+            lambda: store.add("Apple"),
+            lambda: store.extend(["Banana", "Cherry"]),
+            lambda: store.rename("Apple", "Avocado"),
+            lambda: store.rename_many([("Banana", "Blueberry")]),
+            lambda: store.remove("Cherry"),
+            lambda: store.remove_many(["Blueberry"]),
+            store.clear,
+        ):
+            mutate()
+            versions.append(store.version)
+        assert versions == sorted(set(versions))
+
+        store.snapshot()
+        assert store.version == versions[-1]
+        with pytest.raises(KeyError):
+            store.remove("Durian")
+        assert store.version == versions[-1]
+
+    def test_rename_preserves_position(self):
+        """Test that renaming keeps the item in the same slot."""
+        store = ItemStore(["Apple", "Banana", "Cherry"])
+        store.rename("Banana", "Blueberry")
+        assert list(store) == ["Apple", "Blueberry", "Cherry"]
+        assert "Banana" not in store
+        assert "Blueberry" in store
+
+    def test_rename_to_same_name(self):
+        """Test that renaming an item to itself is a no-op."""
+        store = ItemStore(["Apple"])
+        store.rename("Apple", "Apple")
+        assert list(store) == ["Apple"]
+
+    def test_rename_missing_or_conflicting(self):
+        """Test that renaming fails for missing sources and taken targets."""
+        store = ItemStore(["Apple", "Banana"])
+        with pytest.raises(KeyError):
+            store.rename("Cherry", "Date")
+        with pytest.raises(KeyError):
+            store.rename("Cherry", "Cherry")
+        with pytest.raises(KeyError):
+            store.rename("Apple", "Banana")
+
+    def test_remove_preserves_order(self):
+        """Test that removing items keeps the remaining order intact."""
+        store = ItemStore(["Apple", "Banana", "Cherry", "Date"])
+        store.remove("Banana")
+        store.remove("Date")
+        assert list(store) == ["Apple", "Cherry"]
+        assert len(store) == 2
+
+    def test_remove_missing_raises(self):
+        """Test that removing a missing name raises KeyError."""
+        store = ItemStore()
+        with pytest.raises(KeyError):
+            store.remove("Apple")
+
+    def test_readd_after_remove(self):
+        """Test that a removed name can be added again at the end."""
+        store = ItemStore(["Apple", "Banana", "Cherry"])
+        store.remove("Apple")
+        store.add("Apple")
+        assert list(store) == ["Banana", "Cherry", "Apple"]
+
+    def test_compaction_after_many_removals(self):
+        """Test that tombstones are compacted without losing items."""
+        names = [f"Item{i}" for i in range(100)]
+        store = ItemStore(names)
+        for name in names[:60]:
+            store.remove(name)
+        assert list(store) == names[60:]
+        assert len(store._slots) < len(names)
+
+        store.rename("Item60", "First")
+        assert store.to_list()[0] == "First"
+
+    def test_remove_many_compacts_once(self, monkeypatch):
+        """Test that a batch delete keeps order and compacts at most once."""
+        names = [f"Item{i}" for i in range(100)]
+        store = ItemStore(names)
+        compactions = []
+        original = store._compact
+        monkeypatch.setattr(store, "_compact", lambda: compactions.append(original()))
+        store.remove_many(names[:80])
+        assert list(store) == names[80:]
+        assert len(compactions) == 1
+        assert len(store._slots) == 20
+
+    def test_remove_many_is_all_or_nothing(self):
+        """Test that a missing or repeated name leaves the store unchanged."""
+        store = ItemStore(["Apple", "Banana"])
+        with pytest.raises(KeyError):
+            store.remove_many(["Apple", "Durian"])
+        with pytest.raises(KeyError):
+            store.remove_many(["Apple", "Apple"])
+        assert list(store) == ["Apple", "Banana"]
+
+    def test_rename_many_allows_swaps_and_chains(self):
+        """Test renames checked against the final state of the batch."""
+        store = ItemStore(["Apple", "Banana", "Cherry"])
+        store.rename_many([("Apple", "Banana"), ("Banana", "Apple")])
+        assert list(store) == ["Banana", "Apple", "Cherry"]
+        store.rename_many([("Banana", "Cherry"), ("Cherry", "Date")])
+        assert list(store) == ["Cherry", "Apple", "Date"]
+        assert "Banana" not in store
+
+    def test_rename_many_is_all_or_nothing(self):
+        """Test that any bad pair leaves the store unchanged."""
+        store = ItemStore(["Apple", "Banana", "Cherry"])
+        for renames in (
+            [("Apple", "Avocado"), ("Durian", "Date")],
+            [("Apple", "Avocado"), ("Apple", "Apricot")],
+            [("Apple", "Cherry")],
+            [("Apple", "Date"), ("Banana", "Date")],
+        ):
+            with pytest.raises(KeyError):
+                store.rename_many(renames)
+        assert list(store) == ["Apple", "Banana", "Cherry"]
+
+    def test_clear(self):
+        """Test that clear empties the store."""
+        store = ItemStore(["Apple", "Banana"])
+        store.remove("Apple")
+        store.clear()
+        assert list(store) == []
+        assert len(store) == 0
+        store.add("Apple")
+        assert list(store) == ["Apple"]
+
+    def test_choice_skips_tombstones(self):
+        """Test that random picks only return live names."""
+        names = [f"Item{i}" for i in range(10)]
+        store = ItemStore(names)
+        for name in names[1:8:2]:
+            store.remove(name)
+        picks = {store.choice() for _ in range(200)}
+        assert picks <= set(store)
+        assert len(picks) > 1
+
+    def test_choice_empty_raises(self):
+        """Test that choosing from an empty store raises IndexError."""
+        with pytest.raises(IndexError):
+            ItemStore().choice()
+
+    def test_sample_returns_distinct_live_names(self):
+        """Test sampling with and without tombstones present."""
+        names = [f"Item{i}" for i in range(20)]
+        store = ItemStore(names)
+        assert len(set(store.sample(5))) == 5
+
+        for name in names[1:12:2]:
+            store.remove(name)
+        for k in (3, 10, len(store)):
+            sample = store.sample(k)
+            assert len(sample) == k
+            assert len(set(sample)) == k
+            assert set(sample) <= set(store)
+
+    def test_sample_too_large_raises(self):
+        """Test that oversized samples raise ValueError."""
+        with pytest.raises(ValueError):
+            ItemStore(["Apple"]).sample(2)
+
+    def test_take_reads_scattered_positions(self):
+        """Test reading positions out of order after removals."""
+        store = ItemStore(["Apple", "Banana", "Cherry", "Date"])
+        store.remove("Banana")
+        assert store.take([2, 0, 1]) == ["Date", "Apple", "Cherry"]
+        assert store.take([]) == []
+        with pytest.raises(IndexError):
+            store.take([3])
+
+
+def _time_operations(size: int, operations: int) -> float:
+    """Time renames and removals against a store of ``size`` items."""
+    store = ItemStore(f"Item{i}" for i in range(size))
+    # Spread targets across the whole list so a linear scan would pay for it.
+    step = size // operations
+    targets = [f"Item{i}" for i in range(0, size, step)][:operations]
+
+    start = time.perf_counter()
+    for name in targets:
+        store.rename(name, f"{name}-renamed")
+        assert f"{name}-renamed" in store
+        store.remove(f"{name}-renamed")
+    return time.perf_counter() - start
+
+
+@pytest.mark.slow
+class TestItemStoreComplexity:
+    """Tests that store mutations stay constant-time as the list grows."""
+
+    def test_mutations_do_not_scale_with_size(self):
+        """Test that per-operation cost is flat from 1k to 200k items."""
+        operations = 500
+        small = min(_time_operations(1_000, operations) for _ in range(3))
+        large = min(_time_operations(200_000, operations) for _ in range(3))
+        # A linear scan would be ~200x slower on the larger store; allow
+        # generous headroom for cache effects and timer noise.
+        assert large < small * 10
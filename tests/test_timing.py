@@ -0,0 +1,199 @@
+"""Tests for Server-Timing breakdowns and sampled request profiling."""
+
+import pstats
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import main
+from timing import (
+    RequestTimer,
+    ServerTimingMiddleware,
+    TimedRoute,
+    current_timer,
+    phase,
+    timing_mode,
+)
+
+
+def parse_server_timing(value: str) -> dict[str, float]:
+    phases = {}
+    for entry in value.split(", "):
+        name, _, duration = entry.partition(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+
+@pytest.fixture
+def timed_client():
+    """Return a client for the main app with Server-Timing on every response."""
+
+    def make(mode="all", **kwargs):
+        middleware = ServerTimingMiddleware(main.app, mode=mode, **kwargs)
+        return TestClient(middleware), middleware
+
+    return make
+
+
+class TestRequestTimer:
+    """Tests for phase bookkeeping."""
+
+    def test_breakdown(self):
+        """Test that named phases are carved out of the handler's own time."""
+        timer = RequestTimer()
+        timer.start = 0.0
+        timer.handler_start = 1.0
+        timer.add("store", 2.0)
+        timer.add("store", 1.0)
+        timer.add("shuffle", 0.5)
+        timer.handler_end = 5.0
+        assert timer.breakdown(now=5.5) == {
+            "validation": 1.0,
+            "store": 3.0,
+            "shuffle": 0.5,
+            "handler": 0.5,
+            "serialization": 0.5,
+            "total": 5.5,
+        }
+
+    def test_breakdown_without_handler(self):
+        """Test that requests rejected before the handler only report a total."""
+        timer = RequestTimer()
+        timer.start = 0.0
+        assert timer.breakdown(now=0.25) == {"total": 0.25}
+        assert timer.header(now=0.25) == "total;dur=250.000"
+
+    def test_phase_without_timer(self):
+        """Test that phase() is a no-op outside a timed request."""
+        assert current_timer.get() is None
+        with phase("store"):
+            pass
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(None, None), ("0", None), ("header", "header"), ("1", "all")],
+    )
+    def test_timing_mode(self, monkeypatch, value, expected):
+        """Test reading the mode from the environment."""
+        if value is None:
+            monkeypatch.delenv("RANDOMIZER_SERVER_TIMING", raising=False)
+        else:
+            monkeypatch.setenv("RANDOMIZER_SERVER_TIMING", value)
+        assert timing_mode() == expected
+
+
+class TestServerTimingHeader:
+    """Tests for the Server-Timing header on real endpoints."""
+
+    def test_get_items_phases(self, timed_client, sample_items):
+        """Test that GET /items reports every phase."""
+        main.items_db.extend(sample_items)
+        client, _ = timed_client()
+        response = client.get("/items")
+        assert response.status_code == 200
+        phases = parse_server_timing(response.headers["server-timing"])
+        for name in ("validation", "store", "shuffle", "handler", "serialization"):
+            assert name in phases
+        assert (
+            phases["total"]
+            >= sum(duration for name, duration in phases.items() if name != "total")
+            - 0.01
+        )
+
+    def test_bulk_add_phases(self, timed_client):
+        """Test that POST /items/bulk times its store write."""
+        client, _ = timed_client()
+        response = client.post("/items/bulk", json={"names": ["Apple", "Banana"]})
+        phases = parse_server_timing(response.headers["server-timing"])
+        assert {"validation", "store", "serialization"} <= set(phases)
+
+    def test_rng_phase(self, timed_client):
+        """Test that random number endpoints report an rng phase."""
+        client, _ = timed_client()
+        phases = parse_server_timing(
+            client.get("/random/10?count=5").headers["server-timing"]
+        )
+        assert "rng" in phases
+
+    def test_header_mode(self, timed_client):
+        """Test that header mode only times requests that ask for it."""
+        client, _ = timed_client(mode="header")
+        assert "server-timing" not in client.get("/random/10").headers
+        response = client.get("/random/10", headers={"X-Server-Timing": "1"})
+        assert "rng" in parse_server_timing(response.headers["server-timing"])
+
+    def test_disabled(self, timed_client):
+        """Test that no header is added when timing is off."""
+        client, _ = timed_client(mode=None)
+        assert "server-timing" not in client.get("/random/10").headers
+
+    def test_timed_route_keeps_signature(self):
+        """Test that wrapped handlers keep their parameters and sync handlers work."""
+        app = FastAPI()
+        app.router.route_class = TimedRoute
+
+        @app.get("/double/{value}")
+        def double(value: int):
+            with phase("work"):
+                return {"value": value * 2}
+
+        client = TestClient(ServerTimingMiddleware(app, mode="all"))
+        response = client.get("/double/21")
+        assert response.json() == {"value": 42}
+        assert "work" in parse_server_timing(response.headers["server-timing"])
+        assert client.get("/double/x").status_code == 422
+
+
+class TestSampledProfiles:
+    """Tests for cProfile dumps of sampled requests."""
+
+    def test_profile_dump(self, timed_client, tmp_path, sample_items):
+        """Test that sampled requests write loadable pstats files."""
+        main.items_db.extend(sample_items)
+        client, middleware = timed_client(
+            mode=None, profile_rate=1.0, profile_dir=tmp_path
+        )
+        response = client.get("/items")
+        assert "server-timing" not in response.headers
+        profiles = list(tmp_path.glob("*.prof"))
+        assert middleware.dumps == len(profiles) == 1
+        assert "GET__items" in profiles[0].name
+        stats = pstats.Stats(str(profiles[0]))
+        functions = {name for _, _, name in stats.stats}
+        assert "get_randomized_items" in functions
+
+    def test_no_profile_by_default(self, timed_client, tmp_path):
+        """Test that nothing is written with a zero sample rate."""
+        client, middleware = timed_client(profile_dir=tmp_path)
+        client.get("/random/10")
+        assert middleware.dumps == 0
+        assert not list(tmp_path.iterdir())
+
+    def test_event_streams_are_not_profiled(self, tmp_path):
+        """Test that an event stream drops its profile once the response starts."""
+        app = FastAPI()
+        profiling = []
+
+        @app.get("/events")
+        async def get_events():
+            def events():
+                profiling.append(middleware._profiling)
+                time.sleep(0.01)
+                yield "event: ping\ndata: {}\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        @app.get("/ping")
+        async def ping():
+            return {}
+
+        middleware = ServerTimingMiddleware(app, profile_rate=1.0, profile_dir=tmp_path)
+        client = TestClient(middleware)
+        client.get("/events")
+        assert profiling == [False]
+        assert middleware.dumps == 0
+        client.get("/ping")
+        assert middleware.dumps == 1
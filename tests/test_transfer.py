@@ -0,0 +1,265 @@
+"""Tests for streaming import and export."""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+import main
+import transfer
+from main import items_db
+from transfer import (
+    choose_encoding,
+    compress_chunks,
+    encode_names,
+    iter_lines,
+    iter_name_batches,
+    parse_name,
+)
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+class TestStreamParsing:
+    """Tests for incremental line splitting and name parsing."""
+
+    def test_lines_split_across_chunks(self):
+        """Test that lines and multi-byte characters can span chunks."""
+        data = "Apple\r\nCafé\nCherry".encode()
+        split = data.index(b"\xc3") + 1  # inside the "é"
+        lines = asyncio.run(
+            _collect(iter_lines(_chunks(data[:3], data[3:split], data[split:])))
+        )
+        assert lines == ["Apple", "Café", "Cherry"]
+
+    def test_overlong_line(self, monkeypatch):
+        """Test that a runaway line is rejected instead of buffered."""
+        monkeypatch.setattr(transfer, "MAX_LINE_LENGTH", 10)
+        with pytest.raises(ValueError):
+            asyncio.run(_collect(iter_lines(_chunks(b"x" * 6, b"x" * 6))))
+
+    @pytest.mark.parametrize(
+        ("line", "format", "expected"),
+        [
+            ("  Apple ", "lines", "Apple"),
+            ('"Apple"', "ndjson", "Apple"),
+            ('{"name": "Apple", "extra": 1}', "ndjson", "Apple"),
+            ("[1, 2]", "ndjson", None),
+            ("not json", "ndjson", None),
+            ('"Apple, Inc.",42', "csv", "Apple, Inc."),
+            (",42", "csv", None),
+            ("x" * 101, "lines", None),
+        ],
+    )
+    def test_parse_name(self, line, format, expected):
+        """Test extracting a name from one line of each format."""
+        assert parse_name(line, format) == expected
+
+    def test_batches(self):
+        """Test batching, blank lines, and header skipping."""
+        body = b"name\nApple\n\nBanana\n,\nCherry\n"
+        batches = asyncio.run(
+            _collect(iter_name_batches(_chunks(body), "csv", 2, header=True))
+        )
+        assert [batch.names for batch in batches] == [["Apple", "Banana"], ["Cherry"]]
+        assert [batch.invalid for batch in batches] == [0, 1]
+        assert [batch.lines for batch in batches] == [2, 2]
+
+
+class TestImportEndpoint:
+    """Tests for POST /items/import."""
+
+    def test_import_lines(self, client):
+        """Test importing a plain newline-delimited body."""
+        response = client.post("/items/import", content=b"Apple\nBanana\nCherry\n")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count_added"] == 3
+        assert data["count"] == 3
+        assert items_db.to_list() == ["Apple", "Banana", "Cherry"]
+
+    def test_import_ndjson(self, client):
+        """Test importing NDJSON strings and objects."""
+        body = '"Apple"\n{"name": "Banana"}\n{"nope": 1}\n'
+        response = client.post("/items/import?format=ndjson", content=body)
+        data = response.json()
+        assert data["count_added"] == 2
+        assert data["count_skipped_invalid"] == 1
+
+    def test_import_csv_with_header(self, client):
+        """Test importing a CSV file with a header row."""
+        body = "name,color\nApple,red\nBanana,yellow\n"
+        response = client.post("/items/import?format=csv&header=true", content=body)
+        assert response.json()["count_added"] == 2
+        assert items_db.to_list() == ["Apple", "Banana"]
+
+    def test_duplicates_are_skipped(self, client, populated_db):
+        """Test deduplication against the store and within the upload."""
+        response = client.post("/items/import", content="Apple\nFig\nFig\nGrape\n")
+        data = response.json()
+        assert data["count_added"] == 2
+        assert data["count_skipped_duplicates"] == 2
+        assert items_db.to_list()[-2:] == ["Fig", "Grape"]
+
+    def test_streamed_upload_reports_chunks(self, client, monkeypatch):
+        """Test a chunked upload larger than one import batch."""
+        monkeypatch.setattr(main, "IMPORT_BATCH_SIZE", 100)
+
+        def body():
+            for start in range(0, 250, 50):
+                yield "".join(f"item-{i}\n" for i in range(start, start + 50)).encode()
+
+        response = client.post("/items/import", content=body())
+        data = response.json()
+        assert data["count_added"] == 250
+        assert [chunk["added"] for chunk in data["chunks"]] == [100, 100, 50]
+        assert [chunk["chunk"] for chunk in data["chunks"]] == [0, 1, 2]
+        assert len(items_db) == 250
+
+    def test_empty_upload(self, client):
+        """Test importing an empty body."""
+        response = client.post("/items/import", content=b"")
+        assert response.status_code == 200
+        assert response.json()["chunks"] == []
+
+    def test_overlong_line(self, client, monkeypatch):
+        """Test that a body without line breaks is rejected."""
+        monkeypatch.setattr(transfer, "MAX_LINE_LENGTH", 10)
+        response = client.post("/items/import", content=b"x" * 100)
+        assert response.status_code == 413
+
+    def test_invalid_format(self, client):
+        """Test that unknown formats are rejected."""
+        response = client.post("/items/import?format=xml", content=b"Apple")
+        assert response.status_code == 422
+
+    def test_import_is_journaled(self, client, monkeypatch):
+        """Test that each imported chunk is persisted."""
+        recorded = []
+
+        async def persist(op, version, **fields):
+            recorded.append((op, fields))
+
+        monkeypatch.setattr(main, "_record_change", persist)
+        client.post("/items/import", content=b"Apple\nBanana\n")
+        assert recorded == [("add", {"names": ["Apple", "Banana"]})]
+
+
+class TestExportFormats:
+    """Tests for export encoding and compression helpers."""
+
+    NAMES = ("Apple", 'Say "hi"', "Apple, Inc.")
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 10])
+    def test_json(self, chunk_size):
+        """Test that chunked JSON output is one valid array."""
+        output = "".join(encode_names(self.NAMES, "json", chunk_size))
+        assert json.loads(output) == list(self.NAMES)
+
+    def test_chunking(self):
+        """Test that output is produced chunk_size names at a time."""
+        assert len(list(encode_names(self.NAMES, "ndjson", 2))) == 2
+        assert len(list(encode_names(self.NAMES, "csv", 1))) == 3
+
+    def test_empty_json(self):
+        """Test exporting an empty list as JSON."""
+        assert "".join(encode_names([], "json", 10)) == "[]"
+
+    def test_ndjson_round_trip(self):
+        """Test that exported NDJSON parses back to the same names."""
+        lines = "".join(encode_names(self.NAMES, "ndjson", 2)).splitlines()
+        assert [parse_name(line, "ndjson") for line in lines] == list(self.NAMES)
+
+    def test_csv_round_trip(self):
+        """Test that exported CSV has a header and quotes where needed."""
+        output = "".join(encode_names(self.NAMES, "csv", 2))
+        rows = list(csv.reader(io.StringIO(output)))
+        assert rows == [["name"]] + [[name] for name in self.NAMES]
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            ("gzip, deflate", "gzip"),
+            ("br;q=1.0, gzip;q=0.5", "gzip"),
+            ("gzip;q=0", None),
+            ("identity", None),
+            ("", None),
+            ("*", "gzip"),
+        ],
+    )
+    def test_choose_encoding(self, header, expected, monkeypatch):
+        """Test Accept-Encoding negotiation."""
+        monkeypatch.setattr(transfer, "zstd", None)
+        assert choose_encoding(header) == expected
+
+    def test_gzip_stream(self):
+        """Test that compressed chunks form one gzip stream."""
+        chunks = [b"Apple\n", b"Banana\n", b""]
+        data = b"".join(compress_chunks(chunks, "gzip"))
+        assert gzip.decompress(data) == b"Apple\nBanana\n"
+
+    def test_unknown_encoding(self):
+        """Test that unsupported codings are rejected."""
+        with pytest.raises(ValueError):
+            list(compress_chunks([b"x"], "br"))
+
+
+class TestExportEndpoint:
+    """Tests for GET /items/export."""
+
+    def test_export_ndjson(self, client, populated_db):
+        """Test exporting the list as NDJSON in original order."""
+        response = client.get("/items/export", headers={"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert "items.ndjson" in response.headers["content-disposition"]
+        assert "content-encoding" not in response.headers
+        names = [json.loads(line)["name"] for line in response.text.splitlines()]
+        assert names == populated_db
+
+    def test_export_json_gzip(self, client, populated_db):
+        """Test a gzip-compressed JSON export."""
+        response = client.get(
+            "/items/export?format=json", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        # The test client decompresses the body transparently.
+        assert response.json() == populated_db
+
+    def test_export_csv_imports_back(self, client, populated_db):
+        """Test that a CSV export can be imported into an empty list."""
+        exported = client.get("/items/export?format=csv").content
+        client.delete("/items")
+        response = client.post("/items/import?format=csv&header=true", content=exported)
+        assert response.json()["count_added"] == len(populated_db)
+        assert items_db.to_list() == populated_db
+
+    def test_shuffled_export_is_reproducible(self, client, populated_db):
+        """Test that a shuffled export can be replayed with its seed."""
+        first = client.get("/items/export?format=json&order=shuffled")
+        seed = first.headers["x-shuffle-seed"]
+        second = client.get(f"/items/export?format=json&order=shuffled&seed={seed}")
+        assert sorted(first.json()) == sorted(populated_db)
+        assert first.json() == second.json()
+
+    def test_export_large_list(self, client, monkeypatch):
+        """Test exporting a list longer than one chunk."""
+        monkeypatch.setattr(main, "STREAM_CHUNK_SIZE", 10)
+        items_db.extend(f"item-{index}" for index in range(95))
+        response = client.get("/items/export?format=csv")
+        assert response.text.count("\n") == 96
+
+    def test_invalid_format(self, client):
+        """Test that unknown formats are rejected."""
+        assert client.get("/items/export?format=xml").status_code == 422
@@ -0,0 +1,145 @@
+"""Tests for weighted random selection."""
+
+import random
+from collections import Counter
+
+import pytest
+
+import main
+from compact_store import CompactItemStore
+from store import ItemStore
+from weights import AliasTable, ItemWeights
+
+
+class TestAliasTable:
+    """Tests for the Vose alias table."""
+
+    def test_draws_follow_weights(self):
+        """Test that draw frequencies match the weights."""
+        table = AliasTable([1, 2, 3, 4])
+        draws = Counter(table.sample(100_000, random.Random(7).random))
+        for index, weight in enumerate([1, 2, 3, 4]):
+            assert draws[index] / 100_000 == pytest.approx(weight / 10, abs=0.01)
+
+    def test_zero_weight_is_never_drawn(self):
+        """Test that items with weight zero are never picked."""
+        table = AliasTable([0, 5, 0, 1])
+        draws = set(table.sample(10_000, random.Random(1).random))
+        assert draws == {1, 3}
+
+    def test_single_weight(self):
+        """Test a table with one entry."""
+        table = AliasTable([0.5])
+        assert len(table) == 1
+        assert table.draw() == 0
+
+    @pytest.mark.parametrize("weights", [[], [0, 0], [1, -1]])
+    def test_invalid_weights(self, weights):
+        """Test that empty, all-zero, or negative weights are rejected."""
+        with pytest.raises(ValueError):
+            AliasTable(weights)
+
+
+class TestItemWeights:
+    """Tests for ItemWeights and its lazily rebuilt table."""
+
+    def test_table_is_reused_until_something_changes(self):
+        """Test that the alias table is only rebuilt after a change."""
+        store = ItemStore(["Apple", "Banana"])
+        weights = ItemWeights()
+        weights.pick(store, 5)
+        weights.pick(store, 5)
+        assert weights.rebuilds == 1
+
+        store.add("Cherry")
+        weights.pick(store, 5)
+        assert weights.rebuilds == 2
+
+        weights.set("Cherry", 3)
+        weights.pick(store, 5)
+        assert weights.rebuilds == 3
+
+    def test_rename_and_discard(self):
+        """Test that weights follow renames and are dropped on delete."""
+        weights = ItemWeights()
+        weights.set("Apple", 4)
+        weights.rename("Apple", "Avocado")
+        assert weights.get("Apple") == 1
+        assert weights.get("Avocado") == 4
+        weights.discard("Avocado")
+        assert weights.get("Avocado") == 1
+
+    def test_compact_store_draws_by_position(self, monkeypatch):
+        """Test that picks from a compact store never decode the whole list."""
+        store = CompactItemStore(["Apple", "Banana", "Cherry"])
+        weights = ItemWeights()
+        weights.set("Banana", 1000)
+        monkeypatch.setattr(store, "snapshot", None)
+        picks = weights.pick(store, 50)
+        assert Counter(picks)["Banana"] > 40
+        weights.pick(store, 5)
+        assert weights.rebuilds == 1
+
+        store.remove("Banana")
+        assert set(weights.pick(store, 20)) <= {"Apple", "Cherry"}
+        assert weights.rebuilds == 2
+
+    def test_empty_store(self):
+        """Test picking from an empty store."""
+        with pytest.raises(IndexError):
+            ItemWeights().pick(ItemStore(), 1)
+
+
+class TestWeightedPickEndpoint:
+    """Tests for GET /items/weighted-pick."""
+
+    def test_weighted_pick(self, client):
+        """Test that heavier items are picked more often."""
+        client.post("/items", json={"name": "Rare", "weight": 1})
+        client.post("/items", json={"name": "Common", "weight": 99})
+
+        response = client.get("/items/weighted-pick?k=1000")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        assert len(data["items"]) == 1000
+        assert Counter(data["items"])["Common"] > 900
+
+    def test_default_weight(self, client, populated_db):
+        """Test that items without a weight can still be picked."""
+        response = client.get("/items/weighted-pick")
+        assert response.status_code == 200
+        assert response.json()["items"][0] in populated_db
+
+    def test_update_changes_weight(self, client):
+        """Test that PUT can rename an item and set its weight."""
+        client.post("/items", json={"name": "Apple", "weight": 5})
+        client.put("/items/Apple", json={"name": "Avocado"})
+        assert main.item_weights.get("Avocado") == 5
+
+        client.put("/items/Avocado", json={"name": "Avocado", "weight": 2})
+        assert main.item_weights.get("Avocado") == 2
+
+    def test_delete_drops_weight(self, client):
+        """Test that deleted items don't keep their weight."""
+        client.post("/items", json={"name": "Apple", "weight": 5})
+        client.delete("/items/Apple")
+        client.post("/items", json={"name": "Apple"})
+        assert main.item_weights.get("Apple") == 1
+
+    def test_empty_list(self, client):
+        """Test weighted pick with no items."""
+        response = client.get("/items/weighted-pick")
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize("weight", [0, -1, 1_000_001])
+    def test_invalid_weight(self, client, weight):
+        """Test that weights must be positive and bounded."""
+        response = client.post("/items", json={"name": "Apple", "weight": weight})
+        assert response.status_code == 422
+
+    @pytest.mark.parametrize("k", [0, 10001])
+    def test_invalid_k(self, client, populated_db, k):
+        """Test that k is bounded."""
+        response = client.get(f"/items/weighted-pick?k={k}")
+        assert response.status_code == 422
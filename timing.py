@@ -0,0 +1,232 @@
+"""Per-request ``Server-Timing`` breakdowns and sampled cProfile dumps."""
+
+import cProfile
+import functools
+import inspect
+import os
+import random
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from fastapi.routing import APIRoute
+
+TIMING_HEADER = b"x-server-timing"
+
+
+class RequestTimer:
+    """Collects phase durations for one request.
+
+    The route handler's start and end split the request into validation
+    (body parsing and parameter checks before the handler runs), the
+    handler itself, and serialization (turning its return value into a
+    response). Named phases recorded inside the handler are subtracted from
+    its own time, which is reported as ``handler``.
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.handler_start: float | None = None
+        self.handler_end: float | None = None
+        self.phases: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def breakdown(self, now: float | None = None) -> dict[str, float]:
+        """Return phase durations in seconds, ending with ``total``."""
+        if now is None:
+            now = time.perf_counter()
+        result: dict[str, float] = {}
+        if self.handler_start is not None:
+            result["validation"] = self.handler_start - self.start
+            handler_end = self.handler_end if self.handler_end is not None else now
+            inside = sum(self.phases.values())
+            result.update(self.phases)
+            result["handler"] = max(handler_end - self.handler_start - inside, 0.0)
+            result["serialization"] = result.get("serialization", 0.0) + (
+                now - handler_end
+            )
+        result["total"] = now - self.start
+        return result
+
+    def header(self, now: float | None = None) -> str:
+        """Format :meth:`breakdown` as a ``Server-Timing`` header value."""
+        return ", ".join(
+            f"{name};dur={seconds * 1000:.3f}"
+            for name, seconds in self.breakdown(now).items()
+        )
+
+
+current_timer: ContextVar[RequestTimer | None] = ContextVar(
+    "current_timer", default=None
+)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as ``name`` if the request is being timed."""
+    timer = current_timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - start)
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    # functools.wraps keeps the signature FastAPI reads parameters from.
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            timer = current_timer.get()
+            if timer is None:
+                return await endpoint(*args, **kwargs)
+            timer.handler_start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timer.handler_end = time.perf_counter()
+
+        return wrapper
+
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args, **kwargs):
+        # Sync handlers run in a worker thread with a copy of the context,
+        # which still holds the same timer object.
+        timer = current_timer.get()
+        if timer is None:
+            return endpoint(*args, **kwargs)
+        timer.handler_start = time.perf_counter()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            timer.handler_end = time.perf_counter()
+
+    return sync_wrapper
+
+
+class TimedRoute(APIRoute):
+    """Route that marks when its handler starts and finishes.
+
+    Set as the router's ``route_class`` before routes are declared.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that adds ``Server-Timing`` and samples cProfile runs.
+
+    With ``mode`` ``"all"`` every response is timed; with ``"header"`` only
+    requests sending ``X-Server-Timing: 1`` are. Independently, a
+    ``profile_rate`` fraction of requests runs under cProfile and is dumped
+    to ``profile_dir`` as a ``.prof`` file for ``pstats`` or snakeviz. The
+    profiler sees everything the event loop thread does meanwhile, including
+    other requests, and only one request is profiled at a time; event
+    streams are never profiled, since they stay open indefinitely.
+    """
+
+    def __init__(
+        self,
+        app,
+        mode: str | None = None,
+        profile_rate: float = 0.0,
+        profile_dir: str | Path = "profiles",
+    ) -> None:
+        self.app = app
+        self.mode = mode
+        self.profile_rate = profile_rate
+        self.profile_dir = Path(profile_dir)
+        self._profiling = False
+        self.dumps = 0
+
+    def _wants_timing(self, scope) -> bool:
+        if self.mode == "all":
+            return True
+        if self.mode != "header":
+            return False
+        for key, value in scope["headers"]:
+            if key == TIMING_HEADER:
+                return value.strip() not in (b"", b"0", b"false")
+        return False
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timed = self._wants_timing(scope)
+        profile = (
+            self.profile_rate > 0
+            and not self._profiling
+            and random.random() < self.profile_rate
+        )
+        if not timed and not profile:
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        token = current_timer.set(timer)
+        profiler = None
+
+        async def send_wrapper(message) -> None:
+            nonlocal profiler
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                content_type = dict(headers).get(b"content-type", b"")
+                if profiler is not None and content_type.startswith(
+                    b"text/event-stream"
+                ):
+                    # An event stream stays open as long as its client does;
+                    # drop the profile rather than cover hours of other work.
+                    profiler.disable()
+                    profiler = None
+                    self._profiling = False
+                if timed:
+                    headers.append((b"server-timing", timer.header().encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        if profile:
+            self._profiling = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timer.reset(token)
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+                self._dump(profiler, scope)
+
+    def _dump(self, profiler: cProfile.Profile, scope) -> Path:
+        route = getattr(scope.get("route"), "path", "unmatched")
+        label = f"{scope['method']} {route}"
+        safe_label = "".join(c if c.isalnum() else "_" for c in label).strip("_")
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profile_dir / f"{time.time_ns()}-{safe_label}.prof"
+        profiler.dump_stats(path)
+        self.dumps += 1
+        return path
+
+
+def timing_mode() -> str | None:
+    """Read ``$RANDOMIZER_SERVER_TIMING``: off, ``"header"``, or ``"all"``."""
+    value = os.environ.get("RANDOMIZER_SERVER_TIMING", "").strip().lower()
+    if value in ("", "0", "false"):
+        return None
+    return "header" if value == "header" else "all"
+
+
+def profile_rate() -> float:
+    """Read ``$RANDOMIZER_PROFILE_SAMPLE_RATE``, the fraction of requests to profile."""
+    return float(os.environ.get("RANDOMIZER_PROFILE_SAMPLE_RATE", "0"))
@@ -0,0 +1,201 @@
+"""Streaming formats for importing and exporting item lists."""
+
+import codecs
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass, field
+
+try:
+    from compression import zstd
+except ImportError:  # pragma: no cover - zstd is in the stdlib from 3.14
+    zstd = None
+
+# Longest line accepted before the upload is rejected; item names are far
+# shorter, so anything this long is not a list of names.
+MAX_LINE_LENGTH = 64 * 1024
+
+MAX_NAME_LENGTH = 100
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines as they arrive.
+
+    Only the unfinished last line of each chunk is buffered. Raises
+    ``ValueError`` if a single line grows past :data:`MAX_LINE_LENGTH`.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+        if len(pending) > MAX_LINE_LENGTH:
+            raise ValueError(f"Line longer than {MAX_LINE_LENGTH} characters")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+def parse_name(line: str, format: str) -> str | None:
+    """Return the item name on ``line``, or ``None`` if it holds no valid name.
+
+    ``lines`` takes the whole line, ``csv`` the first column, and ``ndjson``
+    either a JSON string or an object with a ``name`` key.
+    """
+    if format == "ndjson":
+        try:
+            value = json.loads(line)
+        except ValueError:
+            return None
+        if isinstance(value, dict):
+            value = value.get("name")
+        if not isinstance(value, str):
+            return None
+    elif format == "csv":
+        row = next(csv.reader([line]), [])
+        value = row[0] if row else ""
+    elif format == "lines":
+        value = line
+    else:
+        raise ValueError(f"Unknown import format {format!r}")
+
+    name = value.strip()
+    if not 1 <= len(name) <= MAX_NAME_LENGTH:
+        return None
+    return name
+
+
+@dataclass
+class NameBatch:
+    lines: int = 0
+    names: list[str] = field(default_factory=list)
+    invalid: int = 0
+
+
+async def iter_name_batches(
+    chunks: AsyncIterable[bytes],
+    format: str,
+    batch_size: int,
+    header: bool = False,
+) -> AsyncIterator[NameBatch]:
+    """Parse an upload into batches of at most ``batch_size`` non-blank lines.
+
+    With ``header``, the first line is skipped.
+    """
+    batch = NameBatch()
+    async for line in iter_lines(chunks):
+        if header:
+            header = False
+            continue
+        if not line.strip():
+            continue
+        batch.lines += 1
+        name = parse_name(line, format)
+        if name is None:
+            batch.invalid += 1
+        else:
+            batch.names.append(name)
+        if batch.lines >= batch_size:
+            yield batch
+            batch = NameBatch()
+    if batch.lines:
+        yield batch
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "json": "application/json",
+}
+
+
+def encode_names(names: Iterable[str], format: str, chunk_size: int) -> Iterator[str]:
+    """Yield ``names`` in ``format``, ``chunk_size`` names per chunk.
+
+    NDJSON and CSV output can be read back by :func:`parse_name` (CSV with
+    its header row skipped).
+    """
+    if format == "json":
+        # Stream the array by hand so the whole list is never one string.
+        opening = "["
+        for chunk in _chunked(names, chunk_size):
+            yield opening + ",".join(json.dumps(name) for name in chunk)
+            opening = ","
+        yield "[]" if opening == "[" else "]"
+    elif format == "ndjson":
+        for chunk in _chunked(names, chunk_size):
+            yield "".join(json.dumps({"name": name}) + "\n" for name in chunk)
+    elif format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(["name"])
+        for chunk in _chunked(names, chunk_size):
+            writer.writerows([name] for name in chunk)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        raise ValueError(f"Unknown export format {format!r}")
+
+
+def _chunked(names: Iterable[str], size: int) -> Iterator[list[str]]:
+    chunk: list[str] = []
+    for name in names:
+        chunk.append(name)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Return the content codings :func:`compress_chunks` can produce, best first."""
+    return ("zstd", "gzip") if zstd is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Pick a content coding from an ``Accept-Encoding`` header, if any fits."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            accepted[coding.lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    qualities = {
+        coding: accepted.get(coding, wildcard) for coding in supported_encodings()
+    }
+    candidates = [coding for coding, quality in qualities.items() if quality > 0]
+    if not candidates:
+        return None
+    # Highest quality wins; ties go to the better compressor.
+    return max(candidates, key=qualities.__getitem__)
+
+
+def compress_chunks(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Compress ``chunks`` as one ``gzip`` or ``zstd`` stream, chunk by chunk."""
+    if encoding == "gzip":
+        compressor = zlib.compressobj(wbits=31)
+    elif encoding == "zstd" and zstd is not None:
+        compressor = zstd.ZstdCompressor()
+    else:
+        raise ValueError(f"Unsupported content encoding {encoding!r}")
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
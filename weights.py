@@ -0,0 +1,160 @@
+"""Weighted random selection with Walker/Vose alias tables."""
+
+import random
+import threading
+from array import array
+from collections.abc import Callable, Sequence
+
+from compact_store import CompactItemStore
+from store import ItemStorage
+
+
+class AliasTable:
+    """Draws indices in proportion to ``weights`` in O(1) per draw.
+
+    Built with Vose's method in O(n): every column holds a probability and
+    an alias, so a draw picks a column uniformly and then flips one biased
+    coin between the column's own index and its alias.
+    """
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        count = len(weights)
+        if not count:
+            raise ValueError("Cannot build an alias table without weights")
+        total = sum(weights)
+        if total <= 0 or any(weight < 0 for weight in weights):
+            raise ValueError("Weights must be non-negative with a positive total")
+
+        scaled = [weight * count / total for weight in weights]
+        # Flat arrays rather than lists of float and int objects
+        self._probability = array("d", [1.0]) * count
+        self._alias = array("I", range(count))
+        small = [index for index, value in enumerate(scaled) if value < 1]
+        large = [index for index, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probability[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] += scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
+        # Whatever is left is 1.0 up to rounding error and keeps its default.
+
+    def __len__(self) -> int:
+        return len(self._probability)
+
+    def draw(self, random_fn: Callable[[], float] = random.random) -> int:
+        """Return one index."""
+        column = int(random_fn() * len(self._probability))
+        if random_fn() < self._probability[column]:
+            return column
+        return self._alias[column]
+
+    def sample(
+        self, k: int, random_fn: Callable[[], float] = random.random
+    ) -> list[int]:
+        """Return ``k`` indices drawn independently (with replacement)."""
+        count = len(self._probability)
+        probability, alias = self._probability, self._alias
+        indices = []
+        for _ in range(k):
+            column = int(random_fn() * count)
+            indices.append(
+                column if random_fn() < probability[column] else alias[column]
+            )
+        return indices
+
+
+class ItemWeights:
+    """Per-item weights plus an alias table over the current list.
+
+    Only weights that differ from ``default`` are stored. The table is
+    built over list positions and rebuilt lazily: weight changes drop it,
+    and :meth:`pick` rebuilds it when the store's version has moved on, so
+    repeated picks against an unchanged list skip straight to the draws.
+    Drawn positions are turned into names through the snapshot the table
+    was built from, or, for :class:`compact_store.CompactItemStore`, by
+    decoding just those positions so no copy of the list is kept.
+    """
+
+    def __init__(self, default: float = 1.0) -> None:
+        self.default = default
+        self._weights: dict[str, float] = {}
+        self._store: ItemStorage | None = None
+        self._version = -1
+        self._names: tuple[str, ...] | None = None
+        self._table: AliasTable | None = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def get(self, name: str) -> float:
+        return self._weights.get(name, self.default)
+
+    def set(self, name: str, weight: float) -> None:
+        with self._lock:
+            if weight == self.default:
+                self._weights.pop(name, None)
+            else:
+                self._weights[name] = weight
+            self._table = None
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        self.rename_many([(old_name, new_name)])
+
+    def rename_many(self, renames: list[tuple[str, str]]) -> None:
+        with self._lock:
+            # Take every old weight before assigning any, so swaps work.
+            moved = [
+                (new_name, self._weights.pop(old_name, None))
+                for old_name, new_name in renames
+            ]
+            for new_name, weight in moved:
+                if weight is not None:
+                    self._weights[new_name] = weight
+            self._table = None
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            if self._weights.pop(name, None) is not None:
+                self._table = None
+
+    def discard_many(self, names: list[str]) -> None:
+        with self._lock:
+            for name in names:
+                self._weights.pop(name, None)
+            self._table = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._weights.clear()
+            self._store = self._names = None
+            self._table = None
+
+    def pick(
+        self,
+        store: ItemStorage,
+        k: int,
+        random_fn: Callable[[], float] = random.random,
+    ) -> list[str]:
+        """Return ``k`` names from ``store`` drawn in proportion to their weights."""
+        with self._lock:
+            version = store.version
+            table, names = self._table, self._names
+            if table is None or self._store is not store or self._version != version:
+                # Reading the version first means a concurrent write at worst
+                # triggers one extra rebuild on the next pick.
+                names = (
+                    None if isinstance(store, CompactItemStore) else store.snapshot()
+                )
+                weights = [
+                    self.get(name) for name in (store if names is None else names)
+                ]
+                if not weights:
+                    raise IndexError("Cannot choose from an empty store")
+                table = AliasTable(weights)
+                self._store, self._version = store, version
+                self._names, self._table = names, table
+                self.rebuilds += 1
+            indices = table.sample(k, random_fn)
+        if names is None:
+            return [store[index] for index in indices]
+        return [names[index] for index in indices]